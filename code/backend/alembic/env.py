@@ -15,6 +15,10 @@ from app.models import (  # noqa: F401
     deal_event,
     audit_event,
     app_control,
+    provider_cache,
+    populate_job,
+    campaign_stats,
+    export_artifact,
 )
 
 config = context.config
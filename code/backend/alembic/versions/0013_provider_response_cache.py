@@ -0,0 +1,35 @@
+"""provider response cache
+
+Revision ID: 0013_provider_response_cache
+Revises: e9b4ea997b68
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0013_provider_response_cache"
+down_revision = "e9b4ea997b68"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "provider_response_cache",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("provider", sa.String(length=32), nullable=False),
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("payload_json", sa.Text(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_provider_response_cache_provider", "provider_response_cache", ["provider"])
+    op.create_index("ix_provider_response_cache_cache_key", "provider_response_cache", ["cache_key"], unique=True)
+    op.create_index("ix_provider_response_cache_expires_at", "provider_response_cache", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_provider_response_cache_expires_at", table_name="provider_response_cache")
+    op.drop_index("ix_provider_response_cache_cache_key", table_name="provider_response_cache")
+    op.drop_index("ix_provider_response_cache_provider", table_name="provider_response_cache")
+    op.drop_table("provider_response_cache")
@@ -0,0 +1,46 @@
+"""populate jobs
+
+Revision ID: 0014_populate_jobs
+Revises: 0013_provider_response_cache
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0014_populate_jobs"
+down_revision = "0013_provider_response_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "populate_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("campaign_id", sa.Integer(), sa.ForeignKey("campaigns.id"), nullable=False),
+        sa.Column("requested_by_user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("provider", sa.String(length=32), nullable=False),
+        sa.Column("zipcode", sa.String(length=16), nullable=True),
+        sa.Column("lead_limit", sa.Integer(), nullable=False),
+        sa.Column("filter_spec_json", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("progress_current", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("progress_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_leads", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_page", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_populate_jobs_campaign_id", "populate_jobs", ["campaign_id"])
+    op.create_index("ix_populate_jobs_requested_by_user_id", "populate_jobs", ["requested_by_user_id"])
+    op.create_index("ix_populate_jobs_status", "populate_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_populate_jobs_status", table_name="populate_jobs")
+    op.drop_index("ix_populate_jobs_requested_by_user_id", table_name="populate_jobs")
+    op.drop_index("ix_populate_jobs_campaign_id", table_name="populate_jobs")
+    op.drop_table("populate_jobs")
@@ -0,0 +1,35 @@
+"""deal score materialization
+
+Revision ID: 0015_deal_score_materialization
+Revises: 0014_populate_jobs
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0015_deal_score_materialization"
+down_revision = "0014_populate_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deals", sa.Column("score_profile_version", sa.String(length=16), nullable=True))
+    op.add_column("deals", sa.Column("scored_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Matches ORDER BY deal_score DESC NULLS LAST, id DESC so the score listing
+    # is an index scan. SQLite can't put NULLS LAST in an index; plain columns there.
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index(
+            "ix_deals_user_deal_score",
+            "deals",
+            ["created_by_user_id", sa.text("deal_score DESC NULLS LAST"), sa.text("id DESC")],
+        )
+    else:
+        op.create_index("ix_deals_user_deal_score", "deals", ["created_by_user_id", "deal_score", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_deals_user_deal_score", table_name="deals")
+    op.drop_column("deals", "scored_at")
+    op.drop_column("deals", "score_profile_version")
@@ -0,0 +1,22 @@
+"""deal score inputs hash
+
+Revision ID: 0016_deal_score_inputs_hash
+Revises: 0015_deal_score_materialization
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0016_deal_score_inputs_hash"
+down_revision = "0015_deal_score_materialization"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL for existing rows: the rescorer treats them as stale and fills it in
+    op.add_column("deals", sa.Column("score_inputs_hash", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("deals", "score_inputs_hash")
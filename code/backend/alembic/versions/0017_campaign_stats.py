@@ -0,0 +1,33 @@
+"""campaign stats
+
+Revision ID: 0017_campaign_stats
+Revises: 0016_deal_score_inputs_hash
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0017_campaign_stats"
+down_revision = "0016_deal_score_inputs_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Starts empty: a campaign's row is built from its leads on first use
+    op.create_table(
+        "campaign_stats",
+        sa.Column("campaign_id", sa.Integer(), sa.ForeignKey("campaigns.id"), primary_key=True),
+        sa.Column("total_leads", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("leads_with_phone", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("leads_with_owner", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("distinct_zip_codes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("zip_counts_json", sa.Text(), nullable=False, server_default="{}"),
+        sa.Column("status_counts_json", sa.Text(), nullable=False, server_default="{}"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("reconciled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("campaign_stats")
@@ -0,0 +1,23 @@
+"""export job queue
+
+Revision ID: 0018_export_job_queue
+Revises: 0017_campaign_stats
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0018_export_job_queue"
+down_revision = "0017_campaign_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("export_jobs", sa.Column("worker_id", sa.String(length=64), nullable=True))
+    op.add_column("export_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("export_jobs", "heartbeat_at")
+    op.drop_column("export_jobs", "worker_id")
@@ -0,0 +1,25 @@
+"""export artifact cache
+
+Revision ID: 0019_export_artifact_cache
+Revises: 0018_export_job_queue
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0019_export_artifact_cache"
+down_revision = "0018_export_job_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("campaigns", sa.Column("leads_version", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("export_jobs", sa.Column("fingerprint", sa.String(length=16), nullable=True))
+    op.create_index("ix_export_jobs_artifact", "export_jobs", ["campaign_id", "job_type", "fingerprint"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_artifact", table_name="export_jobs")
+    op.drop_column("export_jobs", "fingerprint")
+    op.drop_column("campaigns", "leads_version")
@@ -0,0 +1,38 @@
+"""export artifacts
+
+Revision ID: 0020_export_artifacts
+Revises: 0019_export_artifact_cache
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0020_export_artifacts"
+down_revision = "0019_export_artifact_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing files are added by: python -m app.scripts.backfill_export_artifacts
+    op.create_table(
+        "export_artifacts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("owner_user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("campaign_id", sa.Integer(), nullable=True),
+        sa.Column("job_type", sa.String(length=64), nullable=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("checksum", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_export_artifacts_owner_created", "export_artifacts", ["owner_user_id", "created_at", "id"])
+    op.create_index("uq_export_artifacts_owner_filename", "export_artifacts", ["owner_user_id", "filename"], unique=True)
+    op.create_index("ix_export_artifacts_filename", "export_artifacts", ["filename"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_artifacts_filename", table_name="export_artifacts")
+    op.drop_index("uq_export_artifacts_owner_filename", table_name="export_artifacts")
+    op.drop_index("ix_export_artifacts_owner_created", table_name="export_artifacts")
+    op.drop_table("export_artifacts")
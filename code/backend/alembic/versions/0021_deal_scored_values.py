@@ -0,0 +1,26 @@
+"""deal scored arv / repair estimate
+
+Revision ID: 0021_deal_scored_values
+Revises: 0020_export_artifacts
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0021_deal_scored_values"
+down_revision = "0020_export_artifacts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Computed values move out of arv / repair_estimate, which stay user-entered.
+    # arv and repair_estimate join the score input fingerprint, so every deal
+    # is rescored (and these columns filled) on the next rescore run.
+    op.add_column("deals", sa.Column("scored_arv", sa.Float(), nullable=True))
+    op.add_column("deals", sa.Column("scored_repair_estimate", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("deals", "scored_repair_estimate")
+    op.drop_column("deals", "scored_arv")
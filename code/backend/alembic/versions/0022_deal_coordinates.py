@@ -0,0 +1,24 @@
+"""deal coordinates
+
+Revision ID: 0022_deal_coordinates
+Revises: 0021_deal_scored_values
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0022_deal_coordinates"
+down_revision = "0021_deal_scored_values"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored scores use the comps ARV too, which needs the property's location
+    op.add_column("deals", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("deals", sa.Column("longitude", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("deals", "longitude")
+    op.drop_column("deals", "latitude")
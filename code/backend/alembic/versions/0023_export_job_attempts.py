@@ -0,0 +1,22 @@
+"""export job attempts
+
+Revision ID: 0023_export_job_attempts
+Revises: 0022_deal_coordinates
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0023_export_job_attempts"
+down_revision = "0022_deal_coordinates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Claims per job, so a job whose worker keeps dying is failed instead of requeued forever
+    op.add_column("export_jobs", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("export_jobs", "attempts")
@@ -0,0 +1,31 @@
+"""export job subscribers
+
+Revision ID: 0024_export_job_subscribers
+Revises: 0023_export_job_attempts
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0024_export_job_subscribers"
+down_revision = "0023_export_job_attempts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Users who joined another user's identical in-flight export
+    op.create_table(
+        "export_job_subscribers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("export_jobs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("job_id", "user_id", name="uq_export_job_subscribers_job_user"),
+    )
+    op.create_index("ix_export_job_subscribers_user_id", "export_job_subscribers", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_job_subscribers_user_id", table_name="export_job_subscribers")
+    op.drop_table("export_job_subscribers")
@@ -0,0 +1,22 @@
+"""populate job worker
+
+Revision ID: 0025_populate_job_worker
+Revises: 0024_export_job_subscribers
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0025_populate_job_worker"
+down_revision = "0024_export_job_subscribers"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Run that owns a running job; checkpoints and the outcome are only written by it
+    op.add_column("populate_jobs", sa.Column("worker_id", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("populate_jobs", "worker_id")
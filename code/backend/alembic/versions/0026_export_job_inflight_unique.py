@@ -0,0 +1,50 @@
+"""export job inflight unique
+
+Revision ID: 0026_export_job_inflight_unique
+Revises: 0025_populate_job_worker
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0026_export_job_inflight_unique"
+down_revision = "0025_populate_job_worker"
+branch_labels = None
+depends_on = None
+
+INFLIGHT = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade() -> None:
+    # Duplicates queued by concurrent requests before this index: keep the oldest job per key
+    op.execute(
+        """
+        UPDATE export_jobs
+        SET status = 'failed',
+            error_message = 'Superseded by an identical export job',
+            finished_at = CURRENT_TIMESTAMP
+        WHERE status IN ('queued', 'running')
+          AND fingerprint IS NOT NULL
+          AND EXISTS (
+              SELECT 1 FROM export_jobs older
+              WHERE older.campaign_id = export_jobs.campaign_id
+                AND older.job_type = export_jobs.job_type
+                AND older.fingerprint = export_jobs.fingerprint
+                AND older.status IN ('queued', 'running')
+                AND older.id < export_jobs.id
+          )
+        """
+    )
+    # At most one queued/running job per export key; a concurrent identical request joins it
+    op.create_index(
+        "uq_export_jobs_inflight",
+        "export_jobs",
+        ["campaign_id", "job_type", "fingerprint"],
+        unique=True,
+        postgresql_where=INFLIGHT,
+        sqlite_where=INFLIGHT,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_export_jobs_inflight", table_name="export_jobs")
@@ -35,6 +35,17 @@ class Settings(BaseSettings):
 
     # Exports
     EXPORT_DIR: str = "./exports"
+    PDF_RENDER_WORKERS: int = 4  # processes rendering large lead PDFs
+    PDF_RENDER_CHUNK_PAGES: int = 50  # pages per process-pool task (smaller PDFs render in-process)
+
+    # Export jobs run in `python -m app.workers.exports`; set inline to run them in the API process instead
+    EXPORT_JOBS_INLINE: bool = False
+    EXPORT_WORKERS: int = 2  # worker processes started by the export worker
+    EXPORT_WORKER_POLL_SECONDS: float = 2.0  # idle wait between queue polls
+    EXPORT_JOB_HEARTBEAT_SECONDS: int = 30
+    EXPORT_JOB_STALE_SECONDS: int = 300  # running job with no heartbeat this long is requeued
+    EXPORT_JOB_MAX_ATTEMPTS: int = 3  # claims before a job whose worker keeps dying is failed
+    EXPORT_ARTIFACT_PRUNE_SECONDS: int = 3600  # drop manifest rows whose file is gone this often
 
     # Stripe (optional)
     STRIPE_SECRET_KEY: str | None = None
@@ -50,6 +61,53 @@ class Settings(BaseSettings):
     ATTOM_BASE_URL: str | None = None
     REPLIERS_BASE_URL: str | None = None
 
+    # Provider HTTP client (shared, pooled across all provider calls)
+    PROVIDER_HTTP_MAX_CONNECTIONS: int = 100
+    PROVIDER_HTTP_MAX_KEEPALIVE: int = 20
+    PROVIDER_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    PROVIDER_HTTP2: bool = False  # requires the optional "h2" package
+    PROVIDER_TIMEOUT_SECONDS: float = 30.0
+    ATTOM_TIMEOUT_SECONDS: float | None = None
+    REPLIERS_TIMEOUT_SECONDS: float | None = None
+
+    # Provider request scheduling (rate limit + retries)
+    PROVIDER_RATE_PER_SECOND: float = 5.0  # token bucket refill rate, per API key
+    PROVIDER_RATE_BURST: int = 10
+    PROVIDER_MAX_CONCURRENCY: int = 8
+    PROVIDER_MAX_RETRIES: int = 4
+    PROVIDER_BACKOFF_BASE_SECONDS: float = 0.5
+    PROVIDER_BACKOFF_MAX_SECONDS: float = 30.0
+    ATTOM_RATE_PER_SECOND: float | None = None
+    REPLIERS_RATE_PER_SECOND: float | None = None
+
+    # Provider response cache (in-process LRU + provider_response_cache table)
+    PROVIDER_CACHE_ENABLED: bool = True
+    PROVIDER_CACHE_TTL_SECONDS: int = 86400  # fresh for 1 day
+    PROVIDER_CACHE_STALE_SECONDS: int = 604800  # then served stale (refreshed in background) for 7 more
+    PROVIDER_CACHE_LRU_BYTES: int = 33554432  # compressed response bodies kept in memory (32 MiB)
+    PROVIDER_CACHE_PURGE_SECONDS: int = 3600  # delete rows past their stale window this often
+
+    # Provider payload decoding (orjson is used when installed)
+    PROVIDER_JSON_OFFLOAD_BYTES: int = 262144  # decode bodies this large in a worker thread
+    PROVIDER_PARSE_OFFLOAD_ROWS: int = 200  # parse pages with this many rows in a worker thread
+
+    # Keep each lead's raw provider payload (debugging only; multiplies memory per populate)
+    PROVIDER_KEEP_RAW_DATA: bool = False
+
+    # Provider pagination / populate
+    ATTOM_PAGE_CONCURRENCY: int = 4  # max ATTOM pages in flight per populate run
+    POPULATE_MAX_LEADS: int = 50000  # cap on `limit` for a single populate request
+    POPULATE_PROVIDER_DEADLINE_SECONDS: float = 120.0  # shared deadline for multi-provider populate
+    POPULATE_JOB_HEARTBEAT_SECONDS: int = 30  # how often a running job refreshes its heartbeat
+    POPULATE_JOB_STALE_SECONDS: int = 300  # running job with no heartbeat this long is resumable
+    POPULATE_JOB_SWEEP_SECONDS: int = 60  # how often queued/stale jobs are looked for
+
+    # Campaign stats: rebuild every counter row from the leads table this often (safety net)
+    CAMPAIGN_STATS_RECONCILE_SECONDS: int = 3600
+
+    # Periodic jobs run in the one API process holding this lease; a dead holder's lease lapses after this long
+    PERIODIC_JOBS_LEASE_SECONDS: int = 60
+
     # AI (optional)
     OPENAI_API_KEY: str | None = None
 
@@ -25,6 +25,10 @@ def init_db():
     from app.models import user, campaign, lead, subscription, deal, deal_event  # noqa: F401
     from app.models import audit_event  # noqa: F401
     from app.models import app_control  # noqa: F401
+    from app.models import provider_cache  # noqa: F401
+    from app.models import populate_job  # noqa: F401
+    from app.models import campaign_stats  # noqa: F401
+    from app.models import export_artifact  # noqa: F401
 
     # Use Alembic for migrations in production. create_all() is a fallback for dev/test.
     # Ignore "already exists" errors when Alembic has already created the schema.
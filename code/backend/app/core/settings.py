@@ -57,6 +57,21 @@ class Settings(BaseSettings):
     DEAL_SCORE_ARV_WEIGHT: float = 0.3  # Weight for ARV vs neighborhood comp
     DEAL_SCORE_EQUITY_WEIGHT: float = 0.2  # Weight for equity percentage
 
+    # Share of analyses whose scoring trace is logged (only when DEBUG logging is on)
+    SCORING_TRACE_SAMPLE_RATE: float = 0.01
+
+    # Deals loaded (and committed) per batch by the background rescorer
+    DEAL_RESCORE_BATCH_SIZE: int = 500
+    DEAL_RESCORE_LEASE_SECONDS: int = 600  # startup rescore lease; renewed after every batch
+
+    # Comparable-sales ARV (app/services/comps.py)
+    COMPS_SALES_FILE: str = ""  # CSV of past sales; empty = comps ARV disabled
+    COMPS_K: int = 6  # nearest sales used per estimate
+    COMPS_MIN_COUNT: int = 3  # fewer matching sales than this -> no comps ARV
+    COMPS_MAX_RADIUS_MILES: float = 1.0
+    COMPS_SIZE_BAND: float = 0.25  # comps within +/-25% of the subject's sqft
+    ARV_PREFER_COMPS: bool = False  # comps ARV ahead of the provider AVM when both exist
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -10,7 +10,14 @@ from app.core.roles import ROLE_ADMIN
 from app.models.user import User
 
 from app.models.app_control import AppControl
+from app.providers.cache import start_provider_cache_purger
+from app.providers.http import close_provider_client
 from app.services.audit import write_audit_event
+from app.services.populate_jobs import start_populate_job_sweeper
+from app.services.deal_scores import schedule_startup_rescore
+from app.services.campaign_stats import start_campaign_stats_reconciler
+from app.services.export_artifacts import start_export_artifact_pruner
+from app.services.periodic_jobs import start_periodic_leader_election
 
 from app.routers import auth, admin, billing, campaigns, leads, providers, campaign_populate, exports, deals
 from app.routers import dev_tools
@@ -119,6 +126,24 @@ def on_startup():
     _bootstrap_admin()
 
 
+@app.on_event("startup")
+async def on_startup_resume_jobs():
+    # Every worker process starts the periodic loops below; only the holder of the periodic jobs lease runs them
+    await start_periodic_leader_election()
+    # Populate jobs interrupted by a restart continue from their last checkpoint (swept periodically)
+    start_populate_job_sweeper()
+    # Stored deal scores catch up after a scoring change (one worker per scoring version)
+    schedule_startup_rescore()
+    start_campaign_stats_reconciler()
+    start_provider_cache_purger()
+    start_export_artifact_pruner()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_provider_client()
+
+
 def _get_app_control(db: Session, key: str) -> str | None:
     row = db.query(AppControl).filter(AppControl.key == key).first()
     return row.value if row else None
@@ -12,5 +12,8 @@ class Campaign(Base):
     # ✅ Saved campaign-level filters (JSON string)
     filter_spec_json = Column(Text, nullable=True)
 
+    # Bumped whenever leads are inserted or deleted (export artifact fingerprint)
+    leads_version = Column(Integer, nullable=False, server_default="0", default=0)
+
     created_by = relationship("User")
     leads = relationship("Lead", back_populates="campaign", cascade="all,delete-orphan")
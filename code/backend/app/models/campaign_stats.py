@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, func, Text
+
+from app.core.db import Base
+
+
+class CampaignStats(Base):
+    """
+    Incrementally maintained lead counters for one campaign (see
+    app/services/campaign_stats.py). Rows are rebuilt from the leads table
+    whenever they are missing and by the periodic reconciliation job.
+    """
+    __tablename__ = "campaign_stats"
+
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), primary_key=True)
+
+    total_leads = Column(Integer, nullable=False, server_default="0")
+    leads_with_phone = Column(Integer, nullable=False, server_default="0")
+    leads_with_owner = Column(Integer, nullable=False, server_default="0")
+    distinct_zip_codes = Column(Integer, nullable=False, server_default="0")
+
+    # JSON objects: {zip_code: lead count} (non-blank ZIPs only) and {status: lead count}
+    zip_counts_json = Column(Text, nullable=False, server_default="{}")
+    status_counts_json = Column(Text, nullable=False, server_default="{}")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    reconciled_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Float, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Float, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.core.db import Base
 
@@ -14,6 +14,8 @@ class Deal(Base):
     city = Column(String, nullable=True)
     state = Column(String, nullable=True)
     zip_code = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)  # for the comps ARV
+    longitude = Column(Float, nullable=True)
     
     # Property details
     bedrooms = Column(Integer, nullable=True)
@@ -34,10 +36,17 @@ class Deal(Base):
     last_sale_price = Column(Float, nullable=True)
     
     # Deal scoring fields
-    arv = Column(Float, nullable=True)  # After Repair Value
-    repair_estimate = Column(Float, nullable=True)  # Estimated repair costs
+    arv = Column(Float, nullable=True)  # After Repair Value (user-entered; overrides the computed one)
+    repair_estimate = Column(Float, nullable=True)  # Estimated repair costs (user-entered)
+    scored_arv = Column(Float, nullable=True)  # ARV the stored mao/score were computed from
+    scored_repair_estimate = Column(Float, nullable=True)  # Repairs the stored mao/score were computed from
     mao = Column(Float, nullable=True)  # Maximum Allowable Offer
     deal_score = Column(Float, nullable=True)  # 0-100 score
+
+    # Materialized scoring: profile version and input fingerprint the score was computed from, and when
+    score_profile_version = Column(String(16), nullable=True)
+    score_inputs_hash = Column(String(16), nullable=True)
+    scored_at = Column(DateTime(timezone=True), nullable=True)
     
     # Owner/equity info
     equity_percent = Column(Float, nullable=True)
@@ -57,3 +66,14 @@ class Deal(Base):
     created_by = relationship("User")
     campaign = relationship("Campaign")
     events = relationship("DealEvent", back_populates="deal", cascade="all,delete-orphan")
+
+    # GET /deals/?order=score: on Postgres the index matches ORDER BY deal_score DESC NULLS LAST, id DESC (0015)
+    __table_args__ = (
+        Index(
+            "ix_deals_user_deal_score",
+            "created_by_user_id",
+            "deal_score",
+            "id",
+            postgresql_ops={"deal_score": "DESC NULLS LAST", "id": "DESC"},
+        ),
+    )
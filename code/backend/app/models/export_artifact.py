@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, func
+
+from app.core.db import Base
+
+
+class ExportArtifact(Base):
+    """
+    Manifest row for a generated file in EXPORT_DIR, per owner. Listing
+    exports reads this table instead of walking the directory.
+    """
+    __tablename__ = "export_artifacts"
+
+    id = Column(Integer, primary_key=True)
+
+    filename = Column(String(255), nullable=False)
+    owner_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Informational only (no FK): artifacts outlive their campaign
+    campaign_id = Column(Integer, nullable=True)
+    job_type = Column(String(64), nullable=True)
+
+    size_bytes = Column(BigInteger, nullable=False)
+    checksum = Column(String(64), nullable=False)  # sha256 hex of the file
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_export_artifacts_owner_created", "owner_user_id", "created_at", "id"),
+        Index("uq_export_artifacts_owner_filename", "owner_user_id", "filename", unique=True),
+        Index("ix_export_artifacts_filename", "filename"),
+    )
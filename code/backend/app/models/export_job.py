@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Text, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -19,11 +19,50 @@ class ExportJob(Base):
     progress_total = Column(Integer, nullable=False, server_default="0")
 
     result_filename = Column(String(255), nullable=True)  # file name in EXPORT_DIR
+    # Campaign content fingerprint (services/export_artifacts); same key, same file
+    fingerprint = Column(String(16), nullable=True)
     error_message = Column(Text, nullable=True)
 
+    # Queue ownership: the export worker that claimed the job and its liveness
+    worker_id = Column(String(64), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, server_default="0")  # times claimed; capped by EXPORT_JOB_MAX_ATTEMPTS
+
     started_at = Column(DateTime(timezone=True), nullable=True)
     finished_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     campaign = relationship("Campaign")
     requested_by = relationship("User")
+
+    __table_args__ = (
+        Index("ix_export_jobs_artifact", "campaign_id", "job_type", "fingerprint"),
+        # At most one queued/running job per export key; identical requests join it
+        Index(
+            "uq_export_jobs_inflight",
+            "campaign_id",
+            "job_type",
+            "fingerprint",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+
+class ExportJobSubscriber(Base):
+    """
+    A user who asked for an export that another user's queued/running job was
+    already producing. They wait on that job, and get an export_artifacts row
+    for its file when it finishes.
+    """
+    __tablename__ = "export_job_subscribers"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("export_jobs.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "user_id", name="uq_export_job_subscribers_job_user"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from app.core.db import Base
 
@@ -25,3 +25,8 @@ class Lead(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     campaign = relationship("Campaign", back_populates="leads")
+
+    # Same index as migration 0009 (dedupe target for bulk populate)
+    __table_args__ = (
+        Index("uq_leads_campaign_address_zip", "campaign_id", "address", "zip_code", unique=True),
+    )
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Text
+from sqlalchemy.orm import relationship
+
+from app.core.db import Base
+
+
+class PopulateJob(Base):
+    __tablename__ = "populate_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False, index=True)
+    requested_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Request (frozen at create time so a resume replays the same search)
+    provider = Column(String(32), nullable=False)
+    zipcode = Column(String(16), nullable=True)
+    lead_limit = Column(Integer, nullable=False)
+    filter_spec_json = Column(Text, nullable=True)
+
+    status = Column(String(16), nullable=False, server_default="queued", index=True)  # queued/running/done/failed
+
+    progress_current = Column(Integer, nullable=False, server_default="0")  # leads received from provider
+    progress_total = Column(Integer, nullable=False, server_default="0")  # leads requested
+    created_leads = Column(Integer, nullable=False, server_default="0")
+
+    # Checkpoint: every page <= last_page is stored; a resume starts at last_page + 1
+    last_page = Column(Integer, nullable=False, server_default="0")
+
+    error_message = Column(Text, nullable=True)
+
+    # Run that owns the job while it is running (services/populate_jobs.new_worker_id)
+    worker_id = Column(String(64), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    campaign = relationship("Campaign")
+    requested_by = relationship("User")
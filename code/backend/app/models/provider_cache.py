@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, func
+
+from app.core.db import Base
+
+
+class ProviderCacheEntry(Base):
+    """
+    Persistent tier of the provider response cache (app/providers/cache.py).
+    One row per provider + normalized request (filters, zip, page).
+    """
+    __tablename__ = "provider_response_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    provider = Column(String(32), nullable=False, index=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)  # sha256 of provider + request
+
+    payload_json = Column(Text, nullable=False)
+
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # end of stale window; safe to purge after
@@ -1,16 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+import math
+from typing import Any, AsyncIterator
 
 import httpx
 
 from app.core.config import settings
-from app.providers.base import LeadProvider, ProviderLead
+from app.providers.base import LeadProvider, ProviderError, ProviderLead, ProviderLeadBatch, keep_raw
+from app.providers.http import get_provider_client, provider_timeout
+from app.providers.json_codec import decode_response, parse_rows
+from app.providers.scheduler import get_scheduler
 from app.schemas.filters import FilterSpec
 
 logger = logging.getLogger(__name__)
 
+# Shared fallback for missing nested objects (never mutated)
+_EMPTY: dict[str, Any] = {}
+
+# ATTOM rejects pageSize above this
+ATTOM_MAX_PAGE_SIZE = 500
+
 
 def _clean(s: str | None) -> str | None:
     """Clean and normalize string values"""
@@ -34,7 +45,12 @@ def _safe_float(val: Any) -> float | None:
         return None
 
 
-def _attom_params_from_filters(zipcode: str | None, limit: int, filters: FilterSpec | None) -> dict[str, Any]:
+def _attom_params_from_filters(
+    zipcode: str | None,
+    limit: int,
+    filters: FilterSpec | None,
+    page: int = 1,
+) -> dict[str, Any]:
     """
     Translate our unified FilterSpec into ATTOM query params.
     ATTOM Property API Search documentation:
@@ -115,8 +131,8 @@ def _attom_params_from_filters(zipcode: str | None, limit: int, filters: FilterS
             params["propertyIndicator"] = ",".join(type_codes)
 
     # Pagination
-    params["pageSize"] = max(1, min(int(limit), 500))
-    params["page"] = 1
+    params["pageSize"] = max(1, min(int(limit), ATTOM_MAX_PAGE_SIZE))
+    params["page"] = max(1, int(page))
 
     return params
 
@@ -135,7 +151,7 @@ def _parse_attom_property(prop_data: dict[str, Any]) -> ProviderLead | None:
     """
     try:
         # Extract address
-        address_data = prop_data.get("address", {})
+        address_data = prop_data.get("address") or _EMPTY
         full_address = address_data.get("oneLine", "")
         if not full_address:
             # Build from components
@@ -148,49 +164,54 @@ def _parse_attom_property(prop_data: dict[str, Any]) -> ProviderLead | None:
         zip_code = address_data.get("postal1", "")
 
         # Extract property details
-        building_data = prop_data.get("building", {}) or {}
-        size_data = building_data.get("size", {}) or {}
-        rooms_data = building_data.get("rooms", {}) or {}
+        building_data = prop_data.get("building") or _EMPTY
+        size_data = building_data.get("size") or _EMPTY
+        rooms_data = building_data.get("rooms") or _EMPTY
 
         bedrooms = _safe_int(rooms_data.get("beds"))
         bathrooms = _safe_float(rooms_data.get("bathstotal"))
         sqft = _safe_int(size_data.get("universalsize"))
 
         # Lot information
-        lot_data = prop_data.get("lot", {}) or {}
+        lot_data = prop_data.get("lot") or _EMPTY
         lot_size = _safe_int(lot_data.get("lotsize2"))  # sqft
         year_built = _safe_int(lot_data.get("yearbuilt"))
 
+        # Coordinates
+        location_data = prop_data.get("location") or _EMPTY
+        latitude = _safe_float(location_data.get("latitude"))
+        longitude = _safe_float(location_data.get("longitude"))
+
         # Property type
-        summary_data = prop_data.get("summary", {}) or {}
+        summary_data = prop_data.get("summary") or _EMPTY
         property_type = summary_data.get("proptype", "")
 
         # Financial data - Assessment
-        assessment_data = prop_data.get("assessment", {}) or {}
-        assessed_value = _safe_float(assessment_data.get("assessed", {}).get("assdttlvalue"))
+        assessment_data = prop_data.get("assessment") or _EMPTY
+        assessed_value = _safe_float((assessment_data.get("assessed") or _EMPTY).get("assdttlvalue"))
 
         # AVM (Automated Valuation Model) - estimated market value
-        avm_data = prop_data.get("avm", {}) or {}
-        estimated_value = _safe_float(avm_data.get("amount", {}).get("value"))
+        avm_data = prop_data.get("avm") or _EMPTY
+        estimated_value = _safe_float((avm_data.get("amount") or _EMPTY).get("value"))
 
         # If no AVM, use assessed value as estimate
         if not estimated_value and assessed_value:
             estimated_value = assessed_value * 1.1  # Rough market estimate
 
         # Sale information
-        sale_data = prop_data.get("sale", {}) or {}
-        last_sale_amount = sale_data.get("amount", {}) or {}
+        sale_data = prop_data.get("sale") or _EMPTY
+        last_sale_amount = sale_data.get("amount") or _EMPTY
         last_sale_price = _safe_float(last_sale_amount.get("saleamt"))
         last_sale_date = sale_data.get("saleTransDate", "")
 
         # Owner information
-        owner_data = prop_data.get("owner", {}) or {}
-        owner_name = owner_data.get("owner1", {}).get("fullName", "")
+        owner_data = prop_data.get("owner") or _EMPTY
+        owner_name = (owner_data.get("owner1") or _EMPTY).get("fullName", "")
         owner_occupied = owner_data.get("owneroccupied") == "Y"
         absentee_owner = owner_data.get("absenteeowner") == "Y"
 
         # Mortgage/equity calculation
-        mortgage_data = prop_data.get("mortgage", {}) or {}
+        mortgage_data = prop_data.get("mortgage") or _EMPTY
         mortgage_amount = _safe_float(mortgage_data.get("amount"))
 
         equity_percent = None
@@ -199,7 +220,7 @@ def _parse_attom_property(prop_data: dict[str, Any]) -> ProviderLead | None:
             equity_percent = (equity / estimated_value) * 100 if estimated_value > 0 else 0
 
         # Provider ID
-        identifier = prop_data.get("identifier", {}) or {}
+        identifier = prop_data.get("identifier") or _EMPTY
         provider_id = identifier.get("Id") or identifier.get("attomId") or ""
 
         return ProviderLead(
@@ -214,6 +235,8 @@ def _parse_attom_property(prop_data: dict[str, Any]) -> ProviderLead | None:
             lot_size=lot_size,
             year_built=year_built,
             property_type=property_type or None,
+            latitude=latitude,
+            longitude=longitude,
             estimated_value=estimated_value,
             assessed_value=assessed_value,
             last_sale_price=last_sale_price,
@@ -223,13 +246,22 @@ def _parse_attom_property(prop_data: dict[str, Any]) -> ProviderLead | None:
             equity_percent=equity_percent,
             mortgage_amount=mortgage_amount,
             provider_id=provider_id or None,
-            raw_data=prop_data,  # Store raw for debugging
+            raw_data=keep_raw(prop_data),
         )
     except Exception as e:
         logger.error(f"Error parsing ATTOM property: {e}")
         return None
 
 
+def _parse_attom_properties(properties: list[dict[str, Any]]) -> list[ProviderLead]:
+    leads: list[ProviderLead] = []
+    for prop in properties:
+        lead = _parse_attom_property(prop)
+        if lead:
+            leads.append(lead)
+    return leads
+
+
 class AttomProvider(LeadProvider):
     """
     ATTOM Data Property API Provider
@@ -240,6 +272,7 @@ class AttomProvider(LeadProvider):
     def __init__(self):
         self.api_key = settings.ATTOM_API_KEY
         self.base_url = settings.ATTOM_BASE_URL
+        self.cache = None  # ProviderResponseCache, attached by registry.get_provider
 
     def configured(self) -> tuple[bool, list[str]]:
         """Check if ATTOM provider is properly configured"""
@@ -255,19 +288,144 @@ class AttomProvider(LeadProvider):
         zipcode: str | None,
         limit: int,
         filters: FilterSpec | None = None,
-    ) -> list[ProviderLead]:
+    ) -> ProviderLeadBatch:
         """
         Fetch property leads from ATTOM API based on search criteria.
         Uses the property/snapshot endpoint for basic property search.
+        Limits above one page are fetched with iter_pages and collected into a
+        columnar ProviderLeadBatch, so per-lead objects only live for one page.
+        """
+        leads = ProviderLeadBatch()
+        async for _page, page_leads in self.iter_pages(zipcode=zipcode, limit=limit, filters=filters):
+            leads.extend(page_leads)
+        return leads
+
+    async def iter_leads(
+        self,
+        zipcode: str | None,
+        limit: int,
+        filters: FilterSpec | None = None,
+    ) -> AsyncIterator[ProviderLead]:
+        """Stream leads one by one as their pages arrive."""
+        async for _page, page_leads in self.iter_pages(zipcode=zipcode, limit=limit, filters=filters):
+            for lead in page_leads:
+                yield lead
+
+    async def iter_pages(
+        self,
+        zipcode: str | None,
+        limit: int,
+        filters: FilterSpec | None = None,
+        start_page: int = 1,
+    ) -> AsyncIterator[tuple[int, list[ProviderLead]]]:
+        """
+        Walk property/snapshot pages and yield (page_number, leads) as each page completes.
+
+        The first page is fetched alone to learn the result total; the remaining
+        pages are fetched concurrently (at most ATTOM_PAGE_CONCURRENCY in flight)
+        and yielded in completion order, so callers can start storing leads
+        while later pages are still downloading.
+
+        `limit` is the total across all pages; `start_page` lets a caller resume
+        a partially completed walk.
         """
         ok, missing = self.configured()
         if not ok:
             logger.warning(f"ATTOM provider not configured. Missing: {missing}")
-            return []
-
+            return
+
+        limit = max(1, int(limit))
+        page_size = min(limit, ATTOM_MAX_PAGE_SIZE)
+        last_page = math.ceil(limit / page_size)
+        start_page = max(1, int(start_page))
+        if start_page > last_page:
+            return
+
+        remaining = limit - (start_page - 1) * page_size
+
+        leads, total = await self._fetch_page(zipcode, page_size, filters, start_page)
+        leads = leads[:remaining]
+        remaining -= len(leads)
+        yield start_page, leads
+
+        if not leads or remaining <= 0:
+            return
+
+        if total is None:
+            # Total unknown: keep walking one page at a time until a short page
+            page = start_page
+            while remaining > 0 and len(leads) >= page_size and page < last_page:
+                page += 1
+                leads, _total = await self._fetch_page(zipcode, page_size, filters, page)
+                leads = leads[:remaining]
+                remaining -= len(leads)
+                yield page, leads
+            return
+
+        last_page = min(last_page, math.ceil(total / page_size))
+        if last_page <= start_page:
+            return
+
+        semaphore = asyncio.Semaphore(max(1, int(settings.ATTOM_PAGE_CONCURRENCY)))
+
+        async def _bounded(page: int) -> tuple[int, list[ProviderLead]]:
+            async with semaphore:
+                page_leads, _total = await self._fetch_page(zipcode, page_size, filters, page)
+                return page, page_leads
+
+        tasks = [asyncio.create_task(_bounded(p)) for p in range(start_page + 1, last_page + 1)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                page, page_leads = await fut
+                page_leads = page_leads[:remaining]
+                remaining -= len(page_leads)
+                yield page, page_leads
+                if remaining <= 0:
+                    break
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    async def _fetch_page(
+        self,
+        zipcode: str | None,
+        page_size: int,
+        filters: FilterSpec | None,
+        page: int,
+    ) -> tuple[list[ProviderLead], int | None]:
+        """
+        Fetch a single property/snapshot page (through the response cache when attached).
+        Returns (leads, total_results); total is None when ATTOM doesn't report it.
+        A failed request raises ProviderError: the page is never reported as empty.
+        """
         # Build query parameters
-        params = _attom_params_from_filters(zipcode=zipcode, limit=limit, filters=filters)
+        params = _attom_params_from_filters(zipcode=zipcode, limit=page_size, filters=filters, page=page)
 
+        if self.cache is not None:
+            key = self.cache.key(filters=filters, zipcode=zipcode, page=page, page_size=page_size)
+            data = await self.cache.get_or_fetch(key, lambda: self._request_page(params))
+        else:
+            data = await self._request_page(params)
+
+        # ATTOM reports the full result count in status.total
+        status = data.get("status", {}) or {}
+        total = _safe_int(status.get("total")) if isinstance(status, dict) else None
+
+        # ATTOM typically returns results in a 'property' array
+        properties = data.get("property", [])
+        if not properties:
+            logger.info("No properties returned from ATTOM")
+            return [], total
+
+        # Parse each property into ProviderLead (off the event loop for big pages)
+        leads = await parse_rows(_parse_attom_properties, properties)
+
+        logger.info(f"Successfully parsed {len(leads)} properties from ATTOM (page {page})")
+        return leads, total
+
+    async def _request_page(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Call property/snapshot and return the decoded payload. Raises ProviderError on any failure."""
         # Use property/snapshot endpoint for basic property search
         # Alternative endpoints: property/detail (more detailed), property/basicprofile
         url = f"{self.base_url.rstrip('/')}/property/snapshot"
@@ -280,55 +438,45 @@ class AttomProvider(LeadProvider):
         try:
             logger.info(f"Fetching ATTOM properties with params: {params}")
 
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.get(url, headers=headers, params=params)
-
-                if response.status_code == 401:
-                    logger.error("ATTOM API authentication failed - check API key")
-                    return []
-                elif response.status_code == 429:
-                    logger.error("ATTOM API rate limit exceeded - consider implementing retry logic with exponential backoff")
-                    return []
-                elif response.status_code == 404:
-                    logger.warning(f"ATTOM API endpoint not found: {url}")
-                    return []
-                elif response.status_code >= 500:
-                    logger.error(f"ATTOM API server error: {response.status_code}")
-                    return []
-                elif response.status_code >= 400:
-                    logger.error(f"ATTOM API client error: {response.status_code} - {response.text[:500]}")
-                    return []
-
-                # Parse JSON response with error handling
-                try:
-                    data = response.json()
-                except ValueError as e:
-                    logger.error(f"Invalid JSON response from ATTOM API: {e}")
-                    return []
-
-                if not isinstance(data, dict):
-                    logger.error("ATTOM API returned non-dict response")
-                    return []
-
-                # ATTOM typically returns results in a 'property' array
-                properties = data.get("property", [])
-                if not properties:
-                    logger.info("No properties returned from ATTOM")
-                    return []
-
-                # Parse each property into ProviderLead
-                leads: list[ProviderLead] = []
-                for prop in properties:
-                    lead = _parse_attom_property(prop)
-                    if lead:
-                        leads.append(lead)
-
-                logger.info(f"Successfully parsed {len(leads)} properties from ATTOM")
-                return leads
-
-        except httpx.TimeoutException:
+            client = get_provider_client()
+            timeout = provider_timeout(self.name)
+            response = await get_scheduler(self.name).run(
+                lambda: client.get(url, headers=headers, params=params, timeout=timeout),
+                api_key=self.api_key,
+            )
+        except httpx.TimeoutException as e:
             logger.error("ATTOM API request timed out")
-            return []
+            raise ProviderError(self.name, "request timed out") from e
         except Exception as e:
             logger.error(f"Error fetching ATTOM leads: {e}")
-            return []
+            raise ProviderError(self.name, f"request failed: {e}") from e
+
+        status = response.status_code
+        if status == 401:
+            logger.error("ATTOM API authentication failed - check API key")
+            raise ProviderError(self.name, "authentication failed", status)
+        elif status == 429:
+            logger.error("ATTOM API rate limit exceeded - retries exhausted")
+            raise ProviderError(self.name, "rate limit exceeded, retries exhausted", status)
+        elif status == 404:
+            logger.warning(f"ATTOM API endpoint not found: {url}")
+            raise ProviderError(self.name, "endpoint not found", status)
+        elif status >= 500:
+            logger.error(f"ATTOM API server error: {status}")
+            raise ProviderError(self.name, "server error", status)
+        elif status >= 400:
+            logger.error(f"ATTOM API client error: {status} - {response.text[:500]}")
+            raise ProviderError(self.name, "client error", status)
+
+        # Parse JSON response with error handling
+        try:
+            data = await decode_response(response)
+        except ValueError as e:
+            logger.error(f"Invalid JSON response from ATTOM API: {e}")
+            raise ProviderError(self.name, "invalid JSON response", status) from e
+
+        if not isinstance(data, dict):
+            logger.error("ATTOM API returned non-dict response")
+            raise ProviderError(self.name, "unexpected response shape", status)
+
+        return data
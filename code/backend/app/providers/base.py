@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Protocol
+import json
+import math
+import zlib
+from array import array
+from dataclasses import dataclass, fields
+from typing import Any, Iterable, Iterator, Protocol
 
+from app.core.config import settings
 from app.schemas.filters import FilterSpec
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderLead:
     # Basic info
     address: str | None = None
@@ -23,6 +28,10 @@ class ProviderLead:
     lot_size: int | None = None
     year_built: int | None = None
     property_type: str | None = None
+
+    # Location (comps lookups)
+    latitude: float | None = None
+    longitude: float | None = None
     
     # Financial data
     estimated_value: float | None = None  # AVM/estimated market value
@@ -38,7 +47,146 @@ class ProviderLead:
     
     # Provider metadata
     provider_id: str | None = None  # Unique ID from provider
-    raw_data: dict | None = None  # Store raw response for debugging
+    raw_data: dict | None = None  # Raw provider payload, only kept when PROVIDER_KEEP_RAW_DATA is on
+
+
+class ProviderError(Exception):
+    """
+    A provider request failed for good (auth, exhausted retries, server error,
+    bad payload). Raised instead of returning an empty page so callers can fail
+    the page or job rather than store a silent gap.
+    """
+
+    def __init__(self, provider: str, message: str, status_code: int | None = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status_code = status_code
+
+
+def keep_raw(payload: dict[str, Any]) -> dict[str, Any] | None:
+    """raw_data for a parsed lead: the payload when retention is enabled, else None."""
+    return payload if settings.PROVIDER_KEEP_RAW_DATA else None
+
+
+# Column storage per ProviderLead field. Missing values use a sentinel so the
+# numeric columns stay flat machine arrays instead of lists of boxed objects.
+_INT_FIELDS = ("bedrooms", "sqft", "lot_size", "year_built")
+_FLOAT_FIELDS = (
+    "bathrooms",
+    "latitude",
+    "longitude",
+    "estimated_value",
+    "assessed_value",
+    "last_sale_price",
+    "equity_percent",
+    "mortgage_amount",
+)
+_BOOL_FIELDS = ("owner_occupied", "absentee_owner")
+_STR_FIELDS = tuple(
+    f.name
+    for f in fields(ProviderLead)
+    if f.name not in _INT_FIELDS + _FLOAT_FIELDS + _BOOL_FIELDS and f.name != "raw_data"
+)
+
+_INT_NONE = -(2**63)
+_FLOAT_NONE = math.nan
+_BOOL_NONE = -1
+
+
+class ProviderLeadBatch:
+    """
+    Columnar, append-only batch of ProviderLeads.
+
+    Numeric and boolean fields live in typed `array` columns and strings in
+    plain lists, so a batch of N leads holds ~24 containers instead of N
+    objects with N nested payload dicts. Iterating or indexing materializes
+    ProviderLead rows on demand, so the batch can be handed to anything that
+    expects a list of leads (_store_leads, merge, scoring).
+
+    raw_data is dropped unless `keep_raw` is set (defaults to
+    PROVIDER_KEEP_RAW_DATA); kept payloads are stored zlib-compressed.
+    """
+
+    __slots__ = ("_len", "_str", "_int", "_float", "_bool", "_raw")
+
+    def __init__(self, leads: Iterable[ProviderLead] = (), keep_raw: bool | None = None):
+        self._len = 0
+        self._str: dict[str, list[str | None]] = {name: [] for name in _STR_FIELDS}
+        self._int: dict[str, array] = {name: array("q") for name in _INT_FIELDS}
+        self._float: dict[str, array] = {name: array("d") for name in _FLOAT_FIELDS}
+        self._bool: dict[str, array] = {name: array("b") for name in _BOOL_FIELDS}
+        self._raw: list[bytes | None] | None = (
+            [] if (settings.PROVIDER_KEEP_RAW_DATA if keep_raw is None else keep_raw) else None
+        )
+        self.extend(leads)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, lead: ProviderLead) -> None:
+        for name, col in self._str.items():
+            col.append(getattr(lead, name))
+        for name, col in self._int.items():
+            v = getattr(lead, name)
+            col.append(_INT_NONE if v is None else int(v))
+        for name, col in self._float.items():
+            v = getattr(lead, name)
+            col.append(_FLOAT_NONE if v is None else float(v))
+        for name, col in self._bool.items():
+            v = getattr(lead, name)
+            col.append(_BOOL_NONE if v is None else int(bool(v)))
+        if self._raw is not None:
+            raw = lead.raw_data
+            self._raw.append(None if raw is None else zlib.compress(json.dumps(raw).encode("utf-8")))
+        self._len += 1
+
+    def extend(self, leads: Iterable[ProviderLead]) -> None:
+        for lead in leads:
+            self.append(lead)
+
+    def column(self, name: str) -> list:
+        """One field for every row, with None for missing values."""
+        if name in self._str:
+            return list(self._str[name])
+        if name in self._int:
+            return [None if v == _INT_NONE else v for v in self._int[name]]
+        if name in self._float:
+            return [None if math.isnan(v) else v for v in self._float[name]]
+        if name in self._bool:
+            return [None if v == _BOOL_NONE else bool(v) for v in self._bool[name]]
+        raise KeyError(name)
+
+    def raw_data(self, i: int) -> dict | None:
+        if self._raw is None or self._raw[i] is None:
+            return None
+        return json.loads(zlib.decompress(self._raw[i]))
+
+    def _row(self, i: int) -> ProviderLead:
+        values: dict[str, Any] = {name: col[i] for name, col in self._str.items()}
+        for name, col in self._int.items():
+            v = col[i]
+            values[name] = None if v == _INT_NONE else v
+        for name, col in self._float.items():
+            v = col[i]
+            values[name] = None if math.isnan(v) else v
+        for name, col in self._bool.items():
+            v = col[i]
+            values[name] = None if v == _BOOL_NONE else bool(v)
+        values["raw_data"] = self.raw_data(i)
+        return ProviderLead(**values)
+
+    def __getitem__(self, i: int | slice):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("ProviderLeadBatch index out of range")
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[ProviderLead]:
+        for i in range(self._len):
+            yield self._row(i)
 
 
 class LeadProvider(Protocol):
@@ -51,4 +199,4 @@ class LeadProvider(Protocol):
         zipcode: str | None,
         limit: int,
         filters: FilterSpec | None = None,
-    ) -> list[ProviderLead]: ...
+    ) -> list[ProviderLead] | ProviderLeadBatch: ...
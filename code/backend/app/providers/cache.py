@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.provider_cache import ProviderCacheEntry
+from app.providers import json_codec
+from app.schemas.filters import FilterSpec
+from app.services.periodic_jobs import is_periodic_leader
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical_filters(filters: FilterSpec | None, zipcode: str | None) -> dict[str, Any]:
+    """
+    Normalize a FilterSpec so equivalent searches hash the same:
+    zip arg folded into zip_codes, lists sorted/deduped, text trimmed + lowercased.
+    """
+    data = filters.model_dump(exclude_none=True) if filters else {}
+
+    zips = {(z or "").strip() for z in (data.pop("zip_codes", None) or [])}
+    if zipcode:
+        zips.add(zipcode.strip())
+    zips.discard("")
+    if zips:
+        data["zip_codes"] = sorted(zips)
+
+    if data.get("property_types"):
+        types = {(p or "").strip().lower() for p in data["property_types"]}
+        types.discard("")
+        data["property_types"] = sorted(types)
+
+    for k in ("city", "state", "q"):
+        if isinstance(data.get(k), str):
+            data[k] = data[k].strip().lower()
+
+    return data
+
+
+def cache_key(provider: str, filters: FilterSpec | None, zipcode: str | None, page: int, page_size: int) -> str:
+    raw = json.dumps(
+        {
+            "provider": provider,
+            "filters": _canonical_filters(filters, zipcode),
+            "page": int(page),
+            "page_size": int(page_size),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _pack(body: str) -> bytes:
+    # Fast compression: JSON pages shrink several-fold, and the LRU budget counts these bytes
+    return zlib.compress(body.encode("utf-8"), 1)
+
+
+def _unpack(blob: bytes) -> Any:
+    return json_codec.loads(zlib.decompress(blob))
+
+
+class _ByteLRU:
+    """Compressed response bodies by key, evicted oldest first past a byte budget."""
+
+    def __init__(self) -> None:
+        self.entries: "OrderedDict[str, tuple[bytes, datetime]]" = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()  # used from worker threads
+
+    def get(self, key: str) -> tuple[bytes, datetime] | None:
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit is not None:
+                self.entries.move_to_end(key)
+            return hit
+
+    def put(self, key: str, blob: bytes, fetched_at: datetime, max_bytes: int) -> None:
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old[0])
+            if len(blob) > max_bytes:
+                return  # larger than the whole budget: DB tier only
+            self.entries[key] = (blob, fetched_at)
+            self.nbytes += len(blob)
+            while self.nbytes > max_bytes:
+                _key, (evicted, _at) = self.entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+
+# In-process LRU shared by all provider instances. Holds compressed JSON, not
+# decoded pages: a decoded ATTOM page is many times its encoded size.
+_lru = _ByteLRU()
+
+_purger_task: asyncio.Task | None = None
+
+# One fetch per key at a time: concurrent misses (and background refreshes) share it
+_inflight: dict[str, asyncio.Future] = {}
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+class ProviderResponseCache:
+    """
+    Two-tier cache for provider responses:
+    in-process LRU (compressed, bounded by PROVIDER_CACHE_LRU_BYTES) first,
+    then the provider_response_cache table. Every hit decodes a fresh copy.
+
+    - fresh (age < ttl): served, no API call
+    - stale (age < ttl + stale window): served, refreshed in the background
+    - older / missing: fetched inline and stored; concurrent callers missing
+      the same key wait for that one fetch
+
+    DB errors never fail a populate: the DB tier is best-effort.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        ttl_seconds: int | None = None,
+        stale_seconds: int | None = None,
+        lru_bytes: int | None = None,
+    ):
+        self.provider = provider
+        self.ttl = timedelta(seconds=ttl_seconds if ttl_seconds is not None else settings.PROVIDER_CACHE_TTL_SECONDS)
+        self.stale = timedelta(
+            seconds=stale_seconds if stale_seconds is not None else settings.PROVIDER_CACHE_STALE_SECONDS
+        )
+        self.lru_bytes = lru_bytes if lru_bytes is not None else settings.PROVIDER_CACHE_LRU_BYTES
+
+    def key(self, filters: FilterSpec | None, zipcode: str | None, page: int, page_size: int) -> str:
+        return cache_key(self.provider, filters, zipcode, page, page_size)
+
+    # ---- tiers (bodies are encoded JSON text) ----
+
+    def _lru_put(self, key: str, body: str, fetched_at: datetime) -> None:
+        _lru.put(key, _pack(body), fetched_at, max(0, self.lru_bytes))
+
+    def _db_get(self, key: str) -> tuple[str, datetime] | None:
+        db = SessionLocal()
+        try:
+            row = db.query(ProviderCacheEntry).filter(ProviderCacheEntry.cache_key == key).first()
+            if not row:
+                return None
+            return row.payload_json, _as_utc(row.fetched_at)
+        except Exception as e:
+            logger.debug(f"Provider cache read skipped: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _db_put(self, key: str, body: str, fetched_at: datetime) -> None:
+        db = SessionLocal()
+        try:
+            row = db.query(ProviderCacheEntry).filter(ProviderCacheEntry.cache_key == key).first()
+            if row is None:
+                row = ProviderCacheEntry(provider=self.provider, cache_key=key)
+                db.add(row)
+            row.payload_json = body
+            row.fetched_at = fetched_at
+            row.expires_at = fetched_at + self.ttl + self.stale
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.debug(f"Provider cache write skipped: {e}")
+        finally:
+            db.close()
+
+    # ---- public API ----
+
+    def get(self, key: str) -> tuple[Any, datetime] | None:
+        hit = _lru.get(key)
+        if hit is not None:
+            blob, fetched_at = hit
+            return _unpack(blob), fetched_at
+        row = self._db_get(key)
+        if row is None:
+            return None
+        body, fetched_at = row
+        try:
+            payload = json_codec.loads(body)
+        except ValueError as e:
+            logger.debug(f"Provider cache row unreadable: {e}")
+            return None
+        self._lru_put(key, body, fetched_at)
+        return payload, fetched_at
+
+    def put(self, key: str, payload: Any) -> None:
+        fetched_at = datetime.now(timezone.utc)
+        body = json_codec.dumps(payload)
+        self._lru_put(key, body, fetched_at)
+        self._db_put(key, body, fetched_at)
+
+    # Async variants: decoding, compression and the DB tier all run in a worker thread
+
+    async def _aget(self, key: str) -> tuple[Any, datetime] | None:
+        return await asyncio.to_thread(self.get, key)
+
+    async def _aput(self, key: str, payload: Any) -> None:
+        await asyncio.to_thread(self.put, key, payload)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any | None]]) -> Any | None:
+        """
+        Return a cached payload or call `fetch`.
+        `fetch` raises (ProviderError) on failure; failures are never cached.
+        """
+        hit = await self._aget(key)
+        if hit is not None:
+            payload, fetched_at = hit
+            age = datetime.now(timezone.utc) - fetched_at
+            if age < self.ttl:
+                return payload
+            if age < self.ttl + self.stale:
+                self._schedule_refresh(key, fetch)
+                return payload
+
+        return await self._fetch_once(key, fetch)
+
+    async def _fetch_once(self, key: str, fetch: Callable[[], Awaitable[Any | None]]) -> Any | None:
+        """Fetch and store `key`, or wait for the fetch of it already in flight."""
+        while (pending := _inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this caller was cancelled
+                # The fetching caller was cancelled: fetch here instead
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark failures retrieved even when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        _inflight[key] = future
+        try:
+            payload = await fetch()
+            if payload is not None:
+                await self._aput(key, payload)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(payload)
+            return payload
+        finally:
+            if _inflight.get(key) is future:
+                del _inflight[key]
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Awaitable[Any | None]]) -> None:
+        if key in _inflight:
+            return
+
+        async def _refresh() -> None:
+            try:
+                await self._fetch_once(key, fetch)
+            except Exception as e:
+                logger.warning(f"{self.provider} cache refresh failed: {e}")
+
+        task = asyncio.create_task(_refresh())
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+
+
+def purge_expired_provider_cache() -> int:
+    """Delete DB cache rows past their stale window. Returns rows deleted."""
+    db = SessionLocal()
+    try:
+        n = (
+            db.query(ProviderCacheEntry)
+            .filter(ProviderCacheEntry.expires_at < datetime.now(timezone.utc))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return n
+    finally:
+        db.close()
+
+
+async def _purge_loop() -> None:
+    while True:
+        if is_periodic_leader():
+            try:
+                n = await asyncio.to_thread(purge_expired_provider_cache)
+                if n:
+                    logger.info(f"Purged {n} expired provider cache rows")
+            except Exception:
+                logger.exception("Provider cache purge failed")
+        await asyncio.sleep(settings.PROVIDER_CACHE_PURGE_SECONDS)
+
+
+def start_provider_cache_purger() -> None:
+    """Start the periodic purge of expired cache rows (once per process; runs while it holds the periodic jobs lease)."""
+    global _purger_task
+    if _purger_task is None or _purger_task.done():
+        _purger_task = asyncio.get_running_loop().create_task(_purge_loop())
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One pooled client per event loop: connections are bound to the loop that opened them
+_clients: dict[asyncio.AbstractEventLoop | None, httpx.AsyncClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 is opt-in and needs the optional "h2" package."""
+    if not settings.PROVIDER_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("PROVIDER_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.PROVIDER_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(settings.PROVIDER_TIMEOUT_SECONDS),
+        http2=_http2_enabled(),
+    )
+
+
+def provider_timeout(provider_name: str) -> httpx.Timeout:
+    """
+    Per-provider timeout, e.g. ATTOM_TIMEOUT_SECONDS.
+    Falls back to PROVIDER_TIMEOUT_SECONDS.
+    """
+    seconds = getattr(settings, f"{provider_name.upper()}_TIMEOUT_SECONDS", None)
+    return httpx.Timeout(seconds or settings.PROVIDER_TIMEOUT_SECONDS)
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def get_provider_client() -> httpx.AsyncClient:
+    """
+    Process-wide pooled client shared by all providers in app/providers/*.
+
+    Connections are bound to the event loop that opened them, so each loop
+    (tests, scripts) gets its own client; close_provider_client closes them
+    all. Clients of loops that have since closed are dropped here: nothing
+    can await their close any more.
+    """
+    loop = _running_loop()
+    with _clients_lock:
+        for other in [l for l in _clients if l is not None and l.is_closed()]:
+            del _clients[other]
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = _clients[loop] = _build_client()
+    return client
+
+
+async def close_provider_client() -> None:
+    """
+    Close every shared client (called on app shutdown): this loop's directly,
+    any other still-running loop's on that loop.
+    """
+    with _clients_lock:
+        clients = list(_clients.items())
+        _clients.clear()
+
+    current = _running_loop()
+    for loop, client in clients:
+        if client.is_closed:
+            continue
+        if loop is None or loop is current:
+            await client.aclose()
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
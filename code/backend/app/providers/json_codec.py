@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Callable, TypeVar
+
+import httpx
+
+from app.core.config import settings
+
+# orjson is optional: several times faster than the stdlib for large provider pages
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the install
+    orjson = None
+
+T = TypeVar("T")
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON with orjson when installed. Invalid input raises ValueError either way."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text (no whitespace between separators)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
+async def decode_response(response: httpx.Response) -> Any:
+    """
+    Decode a provider response body.
+    Bodies of PROVIDER_JSON_OFFLOAD_BYTES or more are decoded in a worker thread
+    so a big page doesn't stall the event loop.
+    """
+    body = response.content
+    if len(body) >= settings.PROVIDER_JSON_OFFLOAD_BYTES:
+        return await asyncio.to_thread(loads, body)
+    return loads(body)
+
+
+async def parse_rows(parse: Callable[[list], list[T]], rows: list) -> list[T]:
+    """Run a page parser, in a worker thread once the page has PROVIDER_PARSE_OFFLOAD_ROWS rows."""
+    if len(rows) >= settings.PROVIDER_PARSE_OFFLOAD_ROWS:
+        return await asyncio.to_thread(parse, rows)
+    return parse(rows)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import re
+from dataclasses import fields
+
+from app.providers.base import ProviderLead
+
+_WS = re.compile(r"\s+")
+
+_LEAD_FIELDS = [f.name for f in fields(ProviderLead)]
+
+# Identity fields stay as the highest-priority provider spelled them
+_KEY_FIELDS = {"address", "zip_code"}
+
+
+def merge_key(lead: ProviderLead) -> tuple[str, str] | None:
+    """Cross-provider identity: case/whitespace-insensitive address + 5-digit zip."""
+    address = _WS.sub(" ", (lead.address or "").strip()).casefold()
+    if not address:
+        return None
+    zip_code = (lead.zip_code or "").strip()[:5]
+    return address, zip_code
+
+
+def _richer(current, candidate):
+    if candidate is None or candidate == "":
+        return current
+    if current is None or current == "":
+        return candidate
+    # Longer text carries more detail ("123 Main St Apt 4" over "123 Main St")
+    if isinstance(current, str) and isinstance(candidate, str) and len(candidate) > len(current):
+        return candidate
+    return current
+
+
+def merge_provider_leads(batches: list[list[ProviderLead]]) -> list[ProviderLead]:
+    """
+    Merge leads from several providers into one list keyed by merge_key.
+
+    Batches are given in provider priority order. For each field the first
+    non-empty value wins, except strings, where the longest value wins;
+    address and zip_code always come from the first provider that had the lead.
+    Leads without an address are dropped.
+    """
+    merged: dict[tuple[str, str], ProviderLead] = {}
+
+    for batch in batches:
+        for lead in batch:
+            key = merge_key(lead)
+            if key is None:
+                continue
+
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = ProviderLead(**{name: getattr(lead, name) for name in _LEAD_FIELDS})
+                continue
+
+            for name in _LEAD_FIELDS:
+                if name in _KEY_FIELDS:
+                    continue
+                setattr(existing, name, _richer(getattr(existing, name), getattr(lead, name)))
+
+    return list(merged.values())
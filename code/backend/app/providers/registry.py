@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+from app.core.config import settings
 from app.providers.attom import AttomProvider
+from app.providers.cache import ProviderResponseCache
 from app.providers.repliers import RepliersProvider
 
 
-def get_provider(name: str):
+def get_provider(name: str, use_cache: bool = True):
     key = (name or "").strip().lower()
 
     if key == "attom":
-        return AttomProvider()
-    if key == "repliers":
-        return RepliersProvider()
+        provider = AttomProvider()
+    elif key == "repliers":
+        provider = RepliersProvider()
+    else:
+        raise ValueError("Unknown provider")
 
-    raise ValueError("Unknown provider")
+    # Response cache sits under every provider handed out here
+    if use_cache and settings.PROVIDER_CACHE_ENABLED:
+        provider.cache = ProviderResponseCache(key)
+
+    return provider
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from typing import Any
 
-import httpx
-
 from app.core.config import settings
-from app.providers.base import LeadProvider, ProviderLead
+from app.providers.base import LeadProvider, ProviderLead, keep_raw
+from app.providers.http import get_provider_client, provider_timeout
+from app.providers.json_codec import decode_response, parse_rows
+from app.providers.scheduler import get_scheduler
 from app.schemas.filters import FilterSpec
 
 
@@ -120,6 +121,10 @@ def _normalize_repliers_items(data: Any) -> list[dict[str, Any]]:
     return []
 
 
+def _map_items(items: list[dict[str, Any]]) -> list[ProviderLead]:
+    return [_map_item_to_provider_lead(it) for it in items]
+
+
 def _map_item_to_provider_lead(item: dict[str, Any]) -> ProviderLead:
     # Address fields (some APIs split, some are combined)
     street = _pick(item, "address", "streetAddress", "street_address", "street")
@@ -175,7 +180,7 @@ def _map_item_to_provider_lead(item: dict[str, Any]) -> ProviderLead:
         equity_percent=equity_percent,
         mortgage_amount=mortgage_amount,
         provider_id=_clean(str(provider_id)) if provider_id is not None else None,
-        raw_data=item,
+        raw_data=keep_raw(item),
     )
 
 
@@ -185,6 +190,7 @@ class RepliersProvider(LeadProvider):
     def __init__(self):
         self.api_key = settings.REPLIERS_API_KEY
         self.base_url = settings.REPLIERS_BASE_URL or "PUT_URL_HERE"
+        self.cache = None  # ProviderResponseCache, attached by registry.get_provider
 
     def configured(self) -> tuple[bool, list[str]]:
         missing: list[str] = []
@@ -206,6 +212,20 @@ class RepliersProvider(LeadProvider):
 
         params = _repliers_params_from_filters(zipcode=zipcode, limit=limit, filters=filters)
 
+        if self.cache is not None:
+            key = self.cache.key(filters=filters, zipcode=zipcode, page=1, page_size=params["limit"])
+            data = await self.cache.get_or_fetch(key, lambda: self._request(params))
+        else:
+            data = await self._request(params)
+
+        if data is None:
+            return []
+
+        items = _normalize_repliers_items(data)
+        return await parse_rows(_map_items, items)
+
+    async def _request(self, params: dict[str, Any]) -> Any | None:
+        """Call Repliers and return the decoded payload, or None on any failure."""
         # Set real endpoint when you choose which Repliers dataset you're using
         url = f"{self.base_url.rstrip('/')}/PUT_ENDPOINT_PATH_HERE"
 
@@ -215,14 +235,16 @@ class RepliersProvider(LeadProvider):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                r = await client.get(url, headers=headers, params=params)
-                if r.status_code >= 400:
-                    return []
+            client = get_provider_client()
+            timeout = provider_timeout(self.name)
+            r = await get_scheduler(self.name).run(
+                lambda: client.get(url, headers=headers, params=params, timeout=timeout),
+                api_key=self.api_key,
+            )
+            if r.status_code >= 400:
+                return None
 
-                data = r.json()
-                items = _normalize_repliers_items(data)
-                return [_map_item_to_provider_lead(it) for it in items]
+            return await decode_response(r)
 
         except Exception:
-            return []
\ No newline at end of file
+            return None
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limited or a transient upstream failure
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+async def _sleep(seconds: float) -> None:
+    await asyncio.sleep(seconds)
+
+
+def _parse_retry_after(value) -> float | None:
+    """Retry-After is either delta-seconds or an HTTP-date."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Token bucket with reservations: `rate` tokens/second, up to `capacity` banked.
+
+    A caller takes its token immediately (the balance may go negative) and then
+    sleeps until that token would have been refilled, so waiters are served in
+    arrival order. No lock needed: the bookkeeping never awaits.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = max(float(rate), 0.001)
+        self.capacity = max(float(capacity), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        # `updated` may sit in the future while paused
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller sharing this bucket (server told us to back off)."""
+        resume_at = time.monotonic() + seconds
+        if resume_at > self.updated:
+            self.updated = resume_at
+            self.tokens = min(self.tokens, 0.0)
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1.0
+        wait = max(0.0, self.updated - now) + max(0.0, -self.tokens) / self.rate
+        if wait > 0:
+            await _sleep(wait)
+
+
+class ProviderRequestScheduler:
+    """
+    Shared request scheduler for one provider:
+    - per-API-key token bucket (stay under the provider quota)
+    - concurrency cap across all in-flight calls
+    - retries on 429/5xx/transport errors with jittered exponential backoff,
+      honoring Retry-After when the provider sends it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: int,
+        max_concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+    ):
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._buckets: dict[str, TokenBucket] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    def _bucket(self, api_key: str | None) -> TokenBucket:
+        # Never keep raw keys around as dict keys
+        key = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_second, self.burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _concurrency(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to the loop that first waits on them
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def run(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        api_key: str | None = None,
+    ) -> httpx.Response:
+        """
+        Execute `send` under the rate limit and concurrency cap, retrying as needed.
+        Returns the last response (callers still handle non-2xx);
+        re-raises the last transport error if every attempt failed.
+        """
+        bucket = self._bucket(api_key)
+        semaphore = self._concurrency()
+
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            try:
+                async with semaphore:
+                    response = await send()
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    "%s request failed (%s); retry %d/%d in %.2fs",
+                    self.name, type(e).__name__, attempt + 1, self.max_retries, delay,
+                )
+                attempt += 1
+                await _sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = min(retry_after, self.backoff_max) + random.uniform(0, self.backoff_base)
+                if response.status_code == 429:
+                    bucket.pause(delay)
+            else:
+                delay = self._backoff(attempt)
+
+            logger.warning(
+                "%s returned %d; retry %d/%d in %.2fs",
+                self.name, response.status_code, attempt + 1, self.max_retries, delay,
+            )
+            attempt += 1
+            await _sleep(delay)
+
+
+_schedulers: dict[str, ProviderRequestScheduler] = {}
+
+
+def _provider_setting(provider_name: str, suffix: str, default):
+    value = getattr(settings, f"{provider_name.upper()}_{suffix}", None)
+    return default if value is None else value
+
+
+def get_scheduler(provider_name: str) -> ProviderRequestScheduler:
+    """
+    Process-wide scheduler per provider.
+    Per-provider overrides (e.g. ATTOM_RATE_PER_SECOND) fall back to PROVIDER_*.
+    """
+    key = (provider_name or "").strip().lower()
+    scheduler = _schedulers.get(key)
+    if scheduler is None:
+        scheduler = ProviderRequestScheduler(
+            name=key,
+            rate_per_second=_provider_setting(key, "RATE_PER_SECOND", settings.PROVIDER_RATE_PER_SECOND),
+            burst=_provider_setting(key, "RATE_BURST", settings.PROVIDER_RATE_BURST),
+            max_concurrency=_provider_setting(key, "MAX_CONCURRENCY", settings.PROVIDER_MAX_CONCURRENCY),
+            max_retries=settings.PROVIDER_MAX_RETRIES,
+            backoff_base=settings.PROVIDER_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.PROVIDER_BACKOFF_MAX_SECONDS,
+        )
+        _schedulers[key] = scheduler
+    return scheduler
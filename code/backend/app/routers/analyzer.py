@@ -15,7 +15,8 @@ from app.schemas.analyzer import (
     LeadScoreResponse,
     LeadScoreRow,
 )
-from app.services.analyzer_engine import campaign_summary, campaign_zip_breakdown, score_lead
+from app.services.analyzer_engine import campaign_zip_breakdown, top_scored_leads
+from app.services.campaign_stats import cached_campaign_summary
 
 router = APIRouter()
 
@@ -34,7 +35,7 @@ def get_campaign_summary(
     db: Session = Depends(get_db),
 ):
     _ensure_campaign_owned(db, current_user.id, campaign_id)
-    return AnalyzerCampaignSummary(**campaign_summary(db, campaign_id))
+    return AnalyzerCampaignSummary(**cached_campaign_summary(db, campaign_id))
 
 
 @router.get("/campaign/{campaign_id}/zip-breakdown", response_model=AnalyzerZipBreakdown)
@@ -47,36 +48,52 @@ def get_campaign_zip_breakdown(
     return AnalyzerZipBreakdown(**campaign_zip_breakdown(db, campaign_id))
 
 
+def _parse_cursor(cursor: str | None) -> tuple[int, int] | None:
+    """Keyset cursor "score:lead_id" of the last row of the previous page."""
+    if not cursor:
+        return None
+    try:
+        score, lead_id = cursor.split(":")
+        return int(score), int(lead_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.post("/score-leads", response_model=LeadScoreResponse)
 def score_leads(
     payload: LeadScoreInput,
     current_user: User = Depends(require_active_subscription),
     db: Session = Depends(get_db),
 ):
-    # If campaign_id is provided, we score all leads in that campaign.
-    leads = []
+    # If campaign_id is provided, we score all leads in that campaign, a page at a time.
+    limit, after = payload.limit, _parse_cursor(payload.cursor)
     if payload.campaign_id is not None:
         _ensure_campaign_owned(db, current_user.id, payload.campaign_id)
-        leads = db.query(Lead).filter(Lead.campaign_id == payload.campaign_id).all()
+        criteria = [Lead.campaign_id == payload.campaign_id]
     else:
         if not payload.lead_ids:
             raise HTTPException(status_code=400, detail="Provide campaign_id or lead_ids")
-        # Ensure every lead belongs to campaigns owned by this user.
-        leads = db.query(Lead).filter(Lead.id.in_(payload.lead_ids)).all()
-        if len(leads) != len(set(payload.lead_ids)):
+        # Ensure every lead belongs to campaigns owned by this user (one join).
+        wanted = set(payload.lead_ids)
+        owners = dict(
+            db.query(Lead.id, Campaign.created_by_user_id)
+            .join(Campaign, Campaign.id == Lead.campaign_id)
+            .filter(Lead.id.in_(wanted))
+            .all()
+        )
+        if len(owners) != len(wanted):
             raise HTTPException(status_code=404, detail="One or more leads not found")
-        owned_campaign_ids = {
-            c.id for c in db.query(Campaign).filter(Campaign.created_by_user_id == current_user.id).all()
-        }
-        for l in leads:
-            if l.campaign_id not in owned_campaign_ids:
-                raise HTTPException(status_code=403, detail="Not enough permissions")
+        if any(owner != current_user.id for owner in owners.values()):
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        criteria = [Lead.id.in_(wanted)]
+        # Explicit ids are all scored in one response, however many there are
+        limit, after = len(wanted), None
 
-    results = []
-    for l in leads:
-        s = score_lead(l)
-        results.append(LeadScoreRow(lead_id=s.lead_id, score=s.score, reasons=s.reasons, metadata=s.metadata))
+    # Best score first; ranking and paging happen in SQL
+    scored = top_scored_leads(db, *criteria, limit=limit, after=after)
+    results = [LeadScoreRow(lead_id=s.lead_id, score=s.score, reasons=s.reasons, metadata=s.metadata) for s in scored]
 
-    # Sort by best score first
-    results.sort(key=lambda r: r.score, reverse=True)
-    return LeadScoreResponse(results=results)
+    next_cursor = None
+    if payload.campaign_id is not None and len(scored) == limit:
+        next_cursor = f"{scored[-1].score}:{scored[-1].lead_id}"
+    return LeadScoreResponse(results=results, next_cursor=next_cursor)
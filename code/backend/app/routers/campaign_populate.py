@@ -1,38 +1,53 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import SessionLocal, get_db
 from app.core.deps import require_active_subscription
 from app.models.campaign import Campaign
+from app.models.populate_job import PopulateJob
 from app.models.user import User
+from app.providers.base import ProviderError
 
 from app.schemas.providers import PopulateIn
-from app.schemas.populate import PopulateResultOut
+from app.schemas.populate import PopulateJobOut, PopulateResultOut
 from app.schemas.filters import FilterSpec
+from app.services.audit import write_audit_event
 from app.services.filters_store import parse_filter_spec
 
-from app.services.populate import populate_campaign_from_provider
+from app.services.populate import populate_campaign_from_provider, populate_campaign_from_providers
+from app.services.populate_jobs import create_populate_job, is_stale_running, schedule_populate_job
 
 router = APIRouter()
 
-@router.post("/{campaign_id}/populate", response_model=PopulateResultOut)
-async def populate_campaign(
-    campaign_id: int,
-    payload: PopulateIn,
-    current_user: User = Depends(require_active_subscription),
-    db: Session = Depends(get_db),
-):
-    c = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.created_by_user_id == current_user.id).first()
+ALLOWED_PROVIDERS = ("attom", "repliers")
+
+# Seconds between progress events on the populate job stream
+JOB_STREAM_INTERVAL = 1.0
+
+
+def _get_campaign(db: Session, campaign_id: int, user: User) -> Campaign:
+    c = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.created_by_user_id == user.id).first()
     if not c:
         raise HTTPException(status_code=404, detail="Campaign not found")
+    return c
+
 
-    provider = payload.provider.strip().lower()
+def _normalize_provider(name: str | None) -> str:
+    provider = (name or "").strip().lower()
 
     # ✅ DealMachine removed
-    if provider not in ("attom", "repliers"):
+    if provider not in ALLOWED_PROVIDERS:
         raise HTTPException(status_code=400, detail="Invalid provider")
+    return provider
 
+
+def _run_filters(c: Campaign, payload: PopulateIn) -> FilterSpec:
     # ✅ use campaign saved filters (front-end can edit these)
     campaign_filters: FilterSpec = parse_filter_spec(c.filter_spec_json)
 
@@ -44,17 +59,234 @@ async def populate_campaign(
         if payload.zipcode not in run_filters.zip_codes:
             run_filters.zip_codes.append(payload.zipcode)
 
-    created = await populate_campaign_from_provider(
-        db=db,
-        campaign_id=c.id,
-        provider_name=provider,
-        zipcode=payload.zipcode,
-        limit=max(1, min(payload.limit, 500)),
-        filters=run_filters,  # ✅ NEW (needs populate service update below)
+    return run_filters
+
+
+def _run_params(c: Campaign, payload: PopulateIn) -> tuple[str, FilterSpec]:
+    return _normalize_provider(payload.provider), _run_filters(c, payload)
+
+
+def _job_to_out(j: PopulateJob) -> PopulateJobOut:
+    return PopulateJobOut(
+        id=j.id,
+        campaign_id=j.campaign_id,
+        requested_by_user_id=j.requested_by_user_id,
+        provider=j.provider,
+        zipcode=j.zipcode,
+        lead_limit=j.lead_limit,
+        status=j.status,
+        progress_current=j.progress_current or 0,
+        progress_total=j.progress_total or 0,
+        created_leads=j.created_leads or 0,
+        last_page=j.last_page or 0,
+        error_message=j.error_message,
+        heartbeat_at=j.heartbeat_at,
+        started_at=j.started_at,
+        finished_at=j.finished_at,
+        created_at=j.created_at,
     )
 
+
+def _get_job(db: Session, job_id: int, user: User) -> PopulateJob:
+    job = (
+        db.query(PopulateJob)
+        .filter(PopulateJob.id == job_id, PopulateJob.requested_by_user_id == user.id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{campaign_id}/populate", response_model=PopulateResultOut)
+async def populate_campaign(
+    campaign_id: int,
+    payload: PopulateIn,
+    current_user: User = Depends(require_active_subscription),
+    db: Session = Depends(get_db),
+):
+    """Synchronous populate (kept). Large runs should use /{campaign_id}/populate-jobs."""
+    c = _get_campaign(db, campaign_id, current_user)
+    limit = max(1, min(payload.limit, settings.POPULATE_MAX_LEADS))
+
+    if payload.providers:
+        # ✅ multi-provider: concurrent fan-out, merged by address + zip
+        names = list(dict.fromkeys(_normalize_provider(p) for p in payload.providers))
+        created, used, failed = await populate_campaign_from_providers(
+            db=db,
+            campaign_id=c.id,
+            provider_names=names,
+            zipcode=payload.zipcode,
+            limit=limit,
+            filters=_run_filters(c, payload),
+        )
+        return PopulateResultOut(
+            created_leads=created,
+            provider=",".join(used),
+            note=f"Merged leads from {len(used)} of {len(names)} providers.",
+            providers=used,
+            failed_providers=failed,
+        )
+
+    provider, run_filters = _run_params(c, payload)
+
+    try:
+        created = await populate_campaign_from_provider(
+            db=db,
+            campaign_id=c.id,
+            provider_name=provider,
+            zipcode=payload.zipcode,
+            limit=limit,
+            filters=run_filters,  # ✅ NEW (needs populate service update below)
+        )
+    except ProviderError as e:
+        # Pages stored before the failure are kept; re-running skips them as duplicates
+        raise HTTPException(status_code=502, detail=f"Provider request failed: {e}")
+
     return PopulateResultOut(
         created_leads=created,
         provider=provider,
         note="Provider is stubbed for now. Filters are saved + passed correctly; implement provider fetch/translate next."
     )
+
+
+# -----------------------------
+# ✅ BACKGROUND POPULATE JOBS
+# -----------------------------
+
+@router.post("/{campaign_id}/populate-jobs", response_model=PopulateJobOut)
+async def create_populate_job_endpoint(
+    campaign_id: int,
+    payload: PopulateIn,
+    request: Request,
+    current_user: User = Depends(require_active_subscription),
+    db: Session = Depends(get_db),
+):
+    c = _get_campaign(db, campaign_id, current_user)
+    if payload.providers:
+        # Jobs checkpoint one provider's pages; merged fan-out is synchronous only
+        names = list(dict.fromkeys(_normalize_provider(p) for p in payload.providers))
+        if len(names) > 1:
+            raise HTTPException(
+                status_code=400,
+                detail="Populate jobs run a single provider; use /populate for multi-provider runs",
+            )
+        payload = payload.model_copy(update={"provider": names[0], "providers": None})
+    provider, run_filters = _run_params(c, payload)
+
+    job = create_populate_job(
+        db=db,
+        campaign_id=c.id,
+        user_id=current_user.id,
+        provider=provider,
+        zipcode=payload.zipcode,
+        limit=max(1, min(payload.limit, settings.POPULATE_MAX_LEADS)),
+        filters=run_filters,
+    )
+
+    write_audit_event(
+        db,
+        action="populate.job.create",
+        status_code=200,
+        method=request.method,
+        path=request.url.path,
+        actor_user_id=getattr(current_user, "id", None),
+        actor_email=getattr(current_user, "email", None),
+        actor_role=getattr(current_user, "role", None),
+        entity_type="populate_job",
+        entity_id=str(job.id),
+        meta={"provider": provider, "campaign_id": c.id, "limit": job.lead_limit},
+    )
+    db.commit()
+
+    schedule_populate_job(job.id)
+    return _job_to_out(job)
+
+
+@router.get("/{campaign_id}/populate-jobs", response_model=list[PopulateJobOut])
+def list_populate_jobs(
+    campaign_id: int,
+    current_user: User = Depends(require_active_subscription),
+    db: Session = Depends(get_db),
+):
+    jobs = (
+        db.query(PopulateJob)
+        .filter(PopulateJob.campaign_id == campaign_id, PopulateJob.requested_by_user_id == current_user.id)
+        .order_by(PopulateJob.id.desc())
+        .limit(200)
+        .all()
+    )
+    return [_job_to_out(j) for j in jobs]
+
+
+@router.get("/populate-jobs/{job_id}", response_model=PopulateJobOut)
+def get_populate_job(
+    job_id: int,
+    current_user: User = Depends(require_active_subscription),
+    db: Session = Depends(get_db),
+):
+    return _job_to_out(_get_job(db, job_id, current_user))
+
+
+@router.post("/populate-jobs/{job_id}/resume", response_model=PopulateJobOut)
+async def resume_populate_job(
+    job_id: int,
+    current_user: User = Depends(require_active_subscription),
+    db: Session = Depends(get_db),
+):
+    """
+    Re-queue a failed job, or take over a running job whose worker stopped
+    heartbeating; it continues from its last checkpointed page.
+    """
+    job = _get_job(db, job_id, current_user)
+    if job.status == "failed":
+        job.status = "queued"
+        job.finished_at = None
+        db.commit()
+        db.refresh(job)
+    elif not is_stale_running(job):
+        raise HTTPException(status_code=409, detail="Only failed or stalled jobs can be resumed")
+
+    schedule_populate_job(job.id)
+    return _job_to_out(job)
+
+
+@router.get("/populate-jobs/{job_id}/events")
+async def stream_populate_job(
+    job_id: int,
+    current_user: User = Depends(require_active_subscription),
+    db: Session = Depends(get_db),
+):
+    """
+    Server-sent events: one `progress` event whenever the job row changes,
+    closing after the job reaches done/failed.
+    """
+    _get_job(db, job_id, current_user)
+    user_id = current_user.id
+
+    async def _events():
+        last = None
+        while True:
+            # Short-lived session per tick so an idle stream holds no connection
+            s = SessionLocal()
+            try:
+                job = (
+                    s.query(PopulateJob)
+                    .filter(PopulateJob.id == job_id, PopulateJob.requested_by_user_id == user_id)
+                    .first()
+                )
+                data = _job_to_out(job).model_dump_json() if job else None
+                status = job.status if job else None
+            finally:
+                s.close()
+
+            if data is None:
+                return
+            if data != last:
+                last = data
+                yield f"event: progress\ndata: {data}\n\n"
+            if status in ("done", "failed"):
+                return
+            await asyncio.sleep(JOB_STREAM_INTERVAL)
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
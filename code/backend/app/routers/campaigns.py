@@ -6,6 +6,7 @@ from app.core.deps import require_active_subscription
 from app.models.campaign import Campaign
 from app.models.user import User
 from app.schemas.campaigns import CampaignCreate, CampaignOut, CampaignUpdate
+from app.services.campaign_stats import delete_campaign_stats
 
 router = APIRouter()
 
@@ -41,5 +42,6 @@ def delete_campaign(campaign_id: int, current_user: User = Depends(require_activ
     c = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.created_by_user_id == current_user.id).first()
     if not c:
         raise HTTPException(status_code=404, detail="Campaign not found")
+    delete_campaign_stats(db, c.id)
     db.delete(c); db.commit()
     return {"deleted": True, "campaign_id": campaign_id}
@@ -1,6 +1,9 @@
 from __future__ import annotations
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Iterator
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
@@ -11,14 +14,32 @@ from app.models.deal import Deal
 from app.models.deal_event import DealEvent
 from app.schemas.deals import (
     DealCreate, DealOut, DealUpdate, DealEventCreate, DealEventOut,
-    PropertyDataForAnalysis, DealAnalysisOut
+    PropertyDataForAnalysis, DealAnalysisOut, DealAnalysisBatchIn, DealAnalysisBatchItemOut
 )
+from app.services.comps import get_comps_index
 from app.services.deal_scoring import analyze_deal
+from app.services.deal_scores import run_rescore_deals, score_deal
 from app.providers.base import ProviderLead
 
 router = APIRouter()
 
 VALID_STATUSES = {"lead", "under_contract", "closed", "dead"}
+VALID_ORDERS = {"recent", "score"}
+
+# Editable on create/update; arv / repair_estimate are the user's overrides, and
+# scored_arv, scored_repair_estimate, mao and deal_score are filled in by score_deal
+DEAL_INPUT_FIELDS = [
+    "address", "city", "state", "zip_code", "latitude", "longitude",
+    "bedrooms", "bathrooms", "sqft", "lot_size", "year_built", "property_type",
+    "purchase_price", "list_price", "estimated_value", "assessed_value", "last_sale_price",
+    "arv", "repair_estimate",
+    "equity_percent", "mortgage_amount", "owner_occupied", "absentee_owner",
+    "notes", "provider_name", "provider_id",
+]
+
+# Batch analysis limits: rows per request, and rows per streamed chunk
+ANALYZE_BATCH_MAX = 5000
+ANALYZE_BATCH_CHUNK = 100
 
 def _ensure_campaign_owned(db: Session, user_id: int, campaign_id: int) -> Campaign:
     c = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.created_by_user_id == user_id).first()
@@ -42,6 +63,8 @@ def _deal_to_out(d: Deal) -> DealOut:
         city=d.city,
         state=d.state,
         zip_code=d.zip_code,
+        latitude=d.latitude,
+        longitude=d.longitude,
         bedrooms=d.bedrooms,
         bathrooms=d.bathrooms,
         sqft=d.sqft,
@@ -56,8 +79,11 @@ def _deal_to_out(d: Deal) -> DealOut:
         last_sale_price=d.last_sale_price,
         arv=d.arv,
         repair_estimate=d.repair_estimate,
+        scored_arv=d.scored_arv,
+        scored_repair_estimate=d.scored_repair_estimate,
         mao=d.mao,
         deal_score=d.deal_score,
+        scored_at=d.scored_at,
         equity_percent=d.equity_percent,
         mortgage_amount=d.mortgage_amount,
         owner_occupied=d.owner_occupied,
@@ -73,9 +99,13 @@ def _deal_to_out(d: Deal) -> DealOut:
 def list_deals(
     campaign_id: int | None = None,
     status: str | None = None,
+    order: str = "recent",
     current_user: User = Depends(require_active_subscription),
     db: Session = Depends(get_db),
 ):
+    if order not in VALID_ORDERS:
+        raise HTTPException(status_code=400, detail="Invalid order")
+
     q = db.query(Deal).filter(Deal.created_by_user_id == current_user.id)
 
     if campaign_id is not None:
@@ -87,7 +117,11 @@ def list_deals(
             raise HTTPException(status_code=400, detail="Invalid status")
         q = q.filter(Deal.status == status)
 
-    q = q.order_by(Deal.id.desc())
+    if order == "score":
+        # Served by ix_deals_user_deal_score; unscored deals last
+        q = q.order_by(Deal.deal_score.desc().nulls_last(), Deal.id.desc())
+    else:
+        q = q.order_by(Deal.id.desc())
     deals = q.all()
     return [_deal_to_out(d) for d in deals]
 
@@ -106,16 +140,10 @@ def create_deal(
     d = Deal(
         created_by_user_id=current_user.id,
         campaign_id=payload.campaign_id,
-        address=payload.address,
-        city=payload.city,
-        state=payload.state,
-        zip_code=payload.zip_code,
         status=(payload.status or "lead"),
-        purchase_price=payload.purchase_price,
-        arv=payload.arv,
-        repair_estimate=payload.repair_estimate,
-        notes=payload.notes,
+        **{field: getattr(payload, field) for field in DEAL_INPUT_FIELDS},
     )
+    score_deal(d)
     db.add(d)
     db.commit()
     db.refresh(d)
@@ -127,6 +155,20 @@ def create_deal(
 
     return _deal_to_out(d)
 
+@router.post("/rescore")
+def rescore_deals_endpoint(
+    background: BackgroundTasks,
+    current_user: User = Depends(require_active_subscription),
+):
+    """
+    Recompute stored scores for this user's deals in the background.
+
+    Only deals whose scoring inputs or scoring profile version changed since
+    they were last scored are recomputed.
+    """
+    background.add_task(run_rescore_deals, current_user.id)
+    return {"queued": True}
+
 @router.get("/{deal_id}", response_model=DealOut)
 def get_deal(
     deal_id: int,
@@ -152,12 +194,15 @@ def update_deal(
         _ensure_campaign_owned(db, current_user.id, payload.campaign_id)
         d.campaign_id = payload.campaign_id
 
-    # patch fields
-    for field in ["address","city","state","zip_code","notes","purchase_price","arv","repair_estimate","status"]:
-        val = getattr(payload, field)
-        if val is not None:
-            setattr(d, field, val)
+    # patch fields: only those sent; an explicit null clears one (e.g. the entered ARV, back to the computed one)
+    sent = payload.model_dump(exclude_unset=True)
+    for field in DEAL_INPUT_FIELDS:
+        if field in sent:
+            setattr(d, field, sent[field])
+    if payload.status is not None:
+        d.status = payload.status
 
+    score_deal(d)
     db.add(d)
     db.commit()
     db.refresh(d)
@@ -232,6 +277,75 @@ def create_deal_event(
     )
 
 
+def _lead_from_payload(payload: PropertyDataForAnalysis) -> ProviderLead:
+    """Convert an analysis request to ProviderLead format"""
+    return ProviderLead(
+        address=payload.address,
+        city=payload.city,
+        state=payload.state,
+        zip_code=payload.zip_code,
+        bedrooms=payload.bedrooms,
+        bathrooms=payload.bathrooms,
+        sqft=payload.sqft,
+        lot_size=payload.lot_size,
+        year_built=payload.year_built,
+        property_type=payload.property_type,
+        latitude=payload.latitude,
+        longitude=payload.longitude,
+        estimated_value=payload.estimated_value,
+        assessed_value=payload.assessed_value,
+        last_sale_price=payload.last_sale_price,
+        last_sale_date=payload.last_sale_date,
+        owner_name=payload.owner_name,
+        owner_occupied=payload.owner_occupied,
+        absentee_owner=payload.absentee_owner,
+        equity_percent=payload.equity_percent,
+        mortgage_amount=payload.mortgage_amount,
+    )
+
+
+def _analyze_payload(payload: PropertyDataForAnalysis) -> DealAnalysisOut:
+    """Run deal analysis for one request row. Raises ValueError when it can't be scored."""
+    analysis = analyze_deal(
+        lead=_lead_from_payload(payload),
+        asking_price=payload.asking_price,
+        condition_override=payload.condition_override,
+        trace=payload.include_trace,
+        comps=get_comps_index(),
+    )
+    return DealAnalysisOut(
+        arv=analysis.arv,
+        repair_estimate=analysis.repair_estimate,
+        mao=analysis.mao,
+        deal_score=analysis.deal_score,
+        estimated_value=analysis.estimated_value,
+        spread=analysis.spread,
+        spread_percent=analysis.spread_percent,
+        score_breakdown=analysis.score_breakdown,
+        recommendation=analysis.recommendation,
+        notes=analysis.notes,
+    )
+
+
+def _analyze_batch_lines(rows: list[dict[str, Any]]) -> Iterator[str]:
+    """NDJSON lines, one per row in input order, flushed every ANALYZE_BATCH_CHUNK rows."""
+    chunk: list[str] = []
+    for i, row in enumerate(rows):
+        try:
+            item = DealAnalysisBatchItemOut(index=i, ok=True, result=_analyze_payload(PropertyDataForAnalysis.model_validate(row)))
+        except ValidationError as e:
+            item = DealAnalysisBatchItemOut(index=i, ok=False, error=f"Invalid property: {e.errors(include_url=False)}")
+        except Exception as e:
+            item = DealAnalysisBatchItemOut(index=i, ok=False, error=str(e))
+
+        chunk.append(item.model_dump_json() + "\n")
+        if len(chunk) >= ANALYZE_BATCH_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
 @router.post("/analyze", response_model=DealAnalysisOut)
 def analyze_property_deal(
     payload: PropertyDataForAnalysis,
@@ -258,48 +372,27 @@ def analyze_property_deal(
             "asking_price": 280000
         }
     """
-    # Convert request to ProviderLead format
-    lead = ProviderLead(
-        address=payload.address,
-        city=payload.city,
-        state=payload.state,
-        zip_code=payload.zip_code,
-        bedrooms=payload.bedrooms,
-        bathrooms=payload.bathrooms,
-        sqft=payload.sqft,
-        lot_size=payload.lot_size,
-        year_built=payload.year_built,
-        property_type=payload.property_type,
-        estimated_value=payload.estimated_value,
-        assessed_value=payload.assessed_value,
-        last_sale_price=payload.last_sale_price,
-        last_sale_date=payload.last_sale_date,
-        owner_name=payload.owner_name,
-        owner_occupied=payload.owner_occupied,
-        absentee_owner=payload.absentee_owner,
-        equity_percent=payload.equity_percent,
-        mortgage_amount=payload.mortgage_amount,
-    )
-    
     try:
-        # Run deal analysis
-        analysis = analyze_deal(
-            lead=lead,
-            asking_price=payload.asking_price,
-            condition_override=payload.condition_override,
-        )
-        
-        return DealAnalysisOut(
-            arv=analysis.arv,
-            repair_estimate=analysis.repair_estimate,
-            mao=analysis.mao,
-            deal_score=analysis.deal_score,
-            estimated_value=analysis.estimated_value,
-            spread=analysis.spread,
-            spread_percent=analysis.spread_percent,
-            score_breakdown=analysis.score_breakdown,
-            recommendation=analysis.recommendation,
-            notes=analysis.notes,
-        )
+        return _analyze_payload(payload)
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/analyze/batch")
+def analyze_property_deals_batch(
+    payload: DealAnalysisBatchIn,
+    current_user: User = Depends(require_active_subscription),
+):
+    """
+    Analyze many properties in one request (up to ANALYZE_BATCH_MAX).
+
+    Streams NDJSON (application/x-ndjson): one DealAnalysisBatchItemOut per
+    input row, in input order, as rows are scored. A row that fails validation
+    or can't be scored comes back with ok=false and an error; the rest of the
+    batch is unaffected. Nothing is saved.
+    """
+    if len(payload.properties) > ANALYZE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {ANALYZE_BATCH_MAX} properties per batch")
+
+    # Sync generator: Starlette iterates it in a worker thread, off the event loop
+    return StreamingResponse(_analyze_batch_lines(payload.properties), media_type="application/x-ndjson")
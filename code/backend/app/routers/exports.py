@@ -1,21 +1,23 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.db import get_db
 from app.core.deps import require_active_subscription
 from app.models.campaign import Campaign
 from app.models.user import User
-from app.models.export_job import ExportJob
+from app.models.export_artifact import ExportArtifact
+from app.models.export_job import ExportJob, ExportJobSubscriber
 
 from app.schemas.exports import ExportMetaOut
 from app.schemas.export_jobs import ExportJobCreateIn, ExportJobOut
 
 from app.services.audit import write_audit_event
-from app.services.exports import export_leads_by_zip, ensure_export_dir
+from app.services.export_artifacts import forget_export_file, record_export_artifact
+from app.services.exports import export_leads_by_zip, ensure_export_dir, export_variant_dir
 from app.services.pdf_reports import (
     build_campaign_summary_pdf,
     build_campaign_leads_pdf,
@@ -25,11 +27,23 @@ from app.services.export_jobs import (
     create_export_job,
     run_export_job,
     ALLOWED_JOB_TYPES,
+    JOB_LEADS_BY_ZIP,
+    JOB_LEADS_PDF,
+    JOB_SUMMARY_PDF,
 )
+from app.utils.file_responses import file_response, precompressed
 
 router = APIRouter()
 
 
+def _visible_to(user_id: int):
+    """Jobs the user requested or joined (subscribed to)."""
+    return or_(
+        ExportJob.requested_by_user_id == user_id,
+        ExportJob.id.in_(select(ExportJobSubscriber.job_id).where(ExportJobSubscriber.user_id == user_id)),
+    )
+
+
 def _job_to_out(j: ExportJob) -> ExportJobOut:
     download_url = f"/exports/{j.result_filename}" if j.result_filename else None
     return ExportJobOut(
@@ -40,6 +54,7 @@ def _job_to_out(j: ExportJob) -> ExportJobOut:
         status=j.status,
         progress_current=j.progress_current or 0,
         progress_total=j.progress_total or 0,
+        attempts=j.attempts or 0,
         result_filename=j.result_filename,
         download_url=download_url,
         error_message=j.error_message,
@@ -50,46 +65,57 @@ def _job_to_out(j: ExportJob) -> ExportJobOut:
 
 
 @router.get("/", response_model=list[ExportMetaOut])
-def list_exports(current_user: User = Depends(require_active_subscription)):
-    """List exports generated (directory scan)."""
-    export_dir = ensure_export_dir()
-    items: list[ExportMetaOut] = []
-    for p in sorted(export_dir.glob("*"), key=lambda x: x.stat().st_mtime, reverse=True):
-        if not p.is_file():
-            continue
-        stat = p.stat()
-        items.append(
-            ExportMetaOut(
-                filename=p.name,
-                size_bytes=stat.st_size,
-                created_at=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
-                download_url=f"/exports/{p.name}",
-            )
+def list_exports(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(require_active_subscription),
+    db: Session = Depends(get_db),
+):
+    """List the caller's exports, newest first (export_artifacts manifest)."""
+    rows = (
+        db.query(ExportArtifact)
+        .filter(ExportArtifact.owner_user_id == current_user.id)
+        .order_by(ExportArtifact.created_at.desc(), ExportArtifact.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return [
+        ExportMetaOut(
+            filename=a.filename,
+            size_bytes=a.size_bytes,
+            checksum=a.checksum,
+            campaign_id=a.campaign_id,
+            job_type=a.job_type,
+            created_at=a.created_at,
+            download_url=f"/exports/{a.filename}",
         )
-    return items
+        for a in rows
+    ]
 
 
 @router.get("/{filename}")
 def download_export(filename: str, request: Request, current_user: User = Depends(require_active_subscription), db: Session = Depends(get_db)):
-    p = ensure_export_dir() / filename
-    if not p.exists() or not p.is_file():
+    """
+    Download one of the caller's exports (listed in their export_artifacts
+    manifest). Supports conditional GET (ETag from the artifact checksum) and
+    resumable single-range requests; CSVs are sent gzip/br encoded when the
+    client accepts it.
+    """
+    artifact = (
+        db.query(ExportArtifact)
+        .filter(ExportArtifact.filename == filename, ExportArtifact.owner_user_id == current_user.id)
+        .first()
+    )
+    if artifact is None:
         raise HTTPException(status_code=404, detail="Export not found")
 
-    # audit download
-    write_audit_event(
-        db,
-        action="export.download",
-        status_code=200,
-        method=request.method,
-        path=request.url.path,
-        actor_user_id=getattr(current_user, "id", None),
-        actor_email=getattr(current_user, "email", None),
-        actor_role=getattr(current_user, "role", None),
-        entity_type="export",
-        entity_id=filename,
-        meta={"filename": filename},
-    )
-    db.commit()
+    p = ensure_export_dir() / filename
+    if not p.is_file():
+        # The file was removed: drop its manifest rows so it stops being listed
+        forget_export_file(db, filename)
+        db.commit()
+        raise HTTPException(status_code=404, detail="Export not found")
 
     media_type = "application/octet-stream"
     if p.suffix.lower() == ".zip":
@@ -99,7 +125,37 @@ def download_export(filename: str, request: Request, current_user: User = Depend
     elif p.suffix.lower() == ".pdf":
         media_type = "application/pdf"
 
-    return FileResponse(path=str(p), media_type=media_type, filename=p.name)
+    etag = f'"{artifact.checksum}"'
+
+    served, headers = p, {"cache-control": "private, no-cache"}
+    if media_type == "text/csv":
+        headers["vary"] = "Accept-Encoding"
+        variant = precompressed(p, request.headers.get("accept-encoding"), export_variant_dir())
+        if variant is not None:
+            served, encoding = variant
+            headers["content-encoding"] = encoding
+            etag = f'{etag[:-1]}-{encoding}"'
+
+    response = file_response(request, served, etag=etag, media_type=media_type, filename=p.name, headers=headers)
+
+    # One audit row per download: not for revalidations (304) or resumed ranges
+    if response.status_code == 200 or (response.status_code == 206 and response.start == 0):
+        write_audit_event(
+            db,
+            action="export.download",
+            status_code=response.status_code,
+            method=request.method,
+            path=request.url.path,
+            actor_user_id=getattr(current_user, "id", None),
+            actor_email=getattr(current_user, "email", None),
+            actor_role=getattr(current_user, "role", None),
+            entity_type="export",
+            entity_id=filename,
+            meta={"filename": filename},
+        )
+        db.commit()
+
+    return response
 
 
 # -----------------------------
@@ -140,11 +196,13 @@ def create_job(
         actor_role=getattr(current_user, "role", None),
         entity_type="export_job",
         entity_id=str(job.id),
-        meta={"job_type": job_type, "campaign_id": c.id},
+        meta={"job_type": job_type, "campaign_id": c.id, "status": job.status},
     )
     db.commit()
 
-    background.add_task(run_export_job, job.id)
+    # Otherwise the queued row is picked up by the export worker (app.workers.exports)
+    if settings.EXPORT_JOBS_INLINE and job.status == "queued":
+        background.add_task(run_export_job, job.id)
     return _job_to_out(job)
 
 
@@ -156,7 +214,7 @@ def get_job(
 ):
     job = (
         db.query(ExportJob)
-        .filter(ExportJob.id == job_id, ExportJob.requested_by_user_id == current_user.id)
+        .filter(ExportJob.id == job_id, _visible_to(current_user.id))
         .first()
     )
     if not job:
@@ -170,7 +228,7 @@ def list_jobs(
     current_user: User = Depends(require_active_subscription),
     db: Session = Depends(get_db),
 ):
-    q = db.query(ExportJob).filter(ExportJob.requested_by_user_id == current_user.id)
+    q = db.query(ExportJob).filter(_visible_to(current_user.id))
     if campaign_id is not None:
         q = q.filter(ExportJob.campaign_id == campaign_id)
     jobs = q.order_by(ExportJob.id.desc()).limit(200).all()
@@ -197,6 +255,7 @@ def export_campaign_leads_by_zip(
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     zip_path, total = export_leads_by_zip(db=db, campaign_id=c.id, campaign_name=c.name)
+    record_export_artifact(db, zip_path, current_user.id, c.id, JOB_LEADS_BY_ZIP)
 
     write_audit_event(
         db,
@@ -232,6 +291,7 @@ def export_campaign_summary_pdf(
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     pdf_path = build_campaign_summary_pdf(db=db, campaign=c)
+    record_export_artifact(db, pdf_path, current_user.id, c.id, JOB_SUMMARY_PDF)
 
     write_audit_event(
         db,
@@ -267,6 +327,7 @@ def export_campaign_leads_pdf(
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     pdf_path = build_campaign_leads_pdf(db=db, campaign=c)
+    record_export_artifact(db, pdf_path, current_user.id, c.id, JOB_LEADS_PDF)
 
     write_audit_event(
         db,
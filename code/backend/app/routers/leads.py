@@ -10,6 +10,8 @@ from app.models.campaign import Campaign
 from app.models.lead import Lead
 from app.models.user import User
 from app.schemas.leads import LeadCreate, LeadOut, LeadPatch
+from app.services.campaign_stats import apply_lead_changes, lead_facts
+from app.services.export_artifacts import bump_leads_version
 
 router = APIRouter()
 
@@ -130,12 +132,16 @@ def create_lead(
 
     db.add(l)
     try:
-        db.commit()
+        db.flush()
     except Exception:
         db.rollback()
         # likely unique index hit
         raise HTTPException(status_code=409, detail="Duplicate lead (same campaign, address, zip)")
 
+    apply_lead_changes(db, campaign_id, added=[l])
+    bump_leads_version(db, campaign_id)
+    db.commit()
+
     db.refresh(l)
     return _to_out(l)
 
@@ -154,6 +160,8 @@ def update_lead(
     if not l:
         raise HTTPException(status_code=404, detail="Lead not found")
 
+    before = lead_facts(l)
+
     if payload.status is not None:
         l.status = _norm(payload.status) or "new"
     if payload.dnc is not None:
@@ -163,6 +171,8 @@ def update_lead(
     if payload.last_contacted_at is not None:
         l.last_contacted_at = payload.last_contacted_at
 
+    if lead_facts(l) != before:
+        apply_lead_changes(db, campaign_id, added=[l], removed=[before])
     db.commit()
     db.refresh(l)
     return _to_out(l)
@@ -181,6 +191,9 @@ def delete_lead(
     if not l:
         raise HTTPException(status_code=404, detail="Lead not found")
 
+    facts = lead_facts(l)
     db.delete(l)
+    apply_lead_changes(db, campaign_id, removed=[facts])
+    bump_leads_version(db, campaign_id)
     db.commit()
     return {"deleted": True, "lead_id": lead_id}
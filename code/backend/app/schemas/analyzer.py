@@ -13,6 +13,7 @@ class AnalyzerCampaignSummary(BaseModel):
     leads_with_owner: int
     leads_missing_owner: int
     distinct_zip_codes: int
+    status_counts: Dict[str, int] = Field(default_factory=dict)
 
 
 class ZipBreakdownRow(BaseModel):
@@ -33,6 +34,11 @@ class LeadScoreInput(BaseModel):
     lead_ids: List[int] = Field(default_factory=list)
     campaign_id: Optional[int] = None
 
+    # Top-N page size, and next_cursor from the previous page to continue (campaign_id only;
+    # explicit lead_ids are returned in full)
+    limit: int = Field(default=100, ge=1, le=1000)
+    cursor: Optional[str] = None
+
 
 class LeadScoreRow(BaseModel):
     lead_id: int
@@ -43,3 +49,4 @@ class LeadScoreRow(BaseModel):
 
 class LeadScoreResponse(BaseModel):
     results: List[LeadScoreRow]
+    next_cursor: Optional[str] = None  # None when this is the last page
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from datetime import datetime
+from typing import Any
 from pydantic import BaseModel
 
 class DealBase(BaseModel):
@@ -8,6 +9,8 @@ class DealBase(BaseModel):
     city: str | None = None
     state: str | None = None
     zip_code: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
     
     # Property details
     bedrooms: int | None = None
@@ -59,6 +62,8 @@ class DealOut(BaseModel):
     city: str | None
     state: str | None
     zip_code: str | None
+    latitude: float | None = None
+    longitude: float | None = None
     
     # Property details
     bedrooms: int | None
@@ -80,8 +85,11 @@ class DealOut(BaseModel):
     # Deal scoring
     arv: float | None
     repair_estimate: float | None
+    scored_arv: float | None = None
+    scored_repair_estimate: float | None = None
     mao: float | None
     deal_score: float | None
+    scored_at: datetime | None = None
     
     # Owner/equity
     equity_percent: float | None
@@ -114,6 +122,10 @@ class PropertyDataForAnalysis(BaseModel):
     lot_size: int | None = None
     year_built: int | None = None
     property_type: str | None = None
+
+    # Location (enables the comparable-sales ARV when COMPS_SALES_FILE is set)
+    latitude: float | None = None
+    longitude: float | None = None
     
     # Financial data (from ATTOM or other source)
     estimated_value: float | None = None
@@ -134,6 +146,9 @@ class PropertyDataForAnalysis(BaseModel):
     # Optional overrides
     condition_override: str | None = None  # "excellent", "good", "average", "fair", "poor"
 
+    # Debugging: append the step-by-step scoring trace to notes
+    include_trace: bool = False
+
 
 class DealAnalysisOut(BaseModel):
     """Result of deal analysis"""
@@ -153,6 +168,19 @@ class DealAnalysisOut(BaseModel):
     recommendation: str
     notes: list[str]
 
+
+class DealAnalysisBatchIn(BaseModel):
+    """Input for batch deal analysis; rows are validated one by one so a bad row only fails itself"""
+    properties: list[dict[str, Any]]
+
+
+class DealAnalysisBatchItemOut(BaseModel):
+    """One NDJSON line of a batch analysis stream"""
+    index: int  # position in DealAnalysisBatchIn.properties
+    ok: bool
+    result: DealAnalysisOut | None = None
+    error: str | None = None
+
 class DealEventCreate(BaseModel):
     event_type: str
     message: str | None = None
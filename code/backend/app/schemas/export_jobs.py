@@ -17,6 +17,7 @@ class ExportJobOut(BaseModel):
 
     progress_current: int
     progress_total: int
+    attempts: int = 0
 
     result_filename: str | None = None
     download_url: str | None = None
@@ -1,5 +1,13 @@
+from datetime import datetime
+
 from pydantic import BaseModel
+
+
 class ExportMetaOut(BaseModel):
     filename: str
-    bytes: int
-    created_at: str
+    size_bytes: int
+    checksum: str
+    campaign_id: int | None = None
+    job_type: str | None = None
+    created_at: datetime
+    download_url: str
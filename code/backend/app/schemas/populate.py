@@ -1,5 +1,31 @@
+from datetime import datetime
 from pydantic import BaseModel
 class PopulateResultOut(BaseModel):
     created_leads: int
     provider: str
     note: str
+    providers: list[str] = []  # multi-provider mode: providers whose leads were merged
+    failed_providers: list[str] = []  # skipped (unconfigured), errored or past the deadline
+
+
+class PopulateJobOut(BaseModel):
+    id: int
+    campaign_id: int
+    requested_by_user_id: int
+
+    provider: str
+    zipcode: str | None = None
+    lead_limit: int
+    status: str
+
+    progress_current: int
+    progress_total: int
+    created_leads: int
+    last_page: int
+
+    error_message: str | None = None
+
+    heartbeat_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    created_at: datetime
@@ -9,6 +9,8 @@ class ProviderStatusOut(BaseModel):
 
 class PopulateIn(BaseModel):
     # expected: "attom" or "repliers"
-    provider: str
+    provider: str | None = None
+    # multi-provider mode: query all of these concurrently and merge (overrides `provider`)
+    providers: list[str] | None = None
     zipcode: str | None = None
     limit: int = 50
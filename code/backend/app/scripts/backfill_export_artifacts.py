@@ -0,0 +1,48 @@
+"""
+Add export_artifacts manifest rows for files produced before the table existed.
+
+Usage:
+    python -m app.scripts.backfill_export_artifacts
+
+Owners come from finished export jobs; files in EXPORT_DIR that no job
+produced (older synchronous exports) have no known owner and are skipped.
+Safe to re-run.
+"""
+from sqlalchemy.orm import Session
+
+from app.core.db import engine
+from app.models.export_artifact import ExportArtifact
+from app.models.export_job import ExportJob
+from app.services.export_artifacts import record_export_artifact
+from app.services.exports import ensure_export_dir
+
+
+def backfill_export_artifacts() -> int:
+    export_dir = ensure_export_dir()
+    recorded = 0
+
+    with Session(engine) as db:
+        existing = set(db.query(ExportArtifact.owner_user_id, ExportArtifact.filename).all())
+        jobs = (
+            db.query(ExportJob)
+            .filter(ExportJob.status == "done", ExportJob.result_filename.isnot(None))
+            .order_by(ExportJob.id.asc())
+            .all()
+        )
+        for job in jobs:
+            key = (job.requested_by_user_id, job.result_filename)
+            path = export_dir / job.result_filename
+            if key in existing or not path.is_file():
+                continue
+            artifact = record_export_artifact(db, path, job.requested_by_user_id, job.campaign_id, job.job_type)
+            artifact.created_at = job.finished_at or job.created_at
+            existing.add(key)
+            recorded += 1
+        db.commit()
+
+    print(f"Recorded {recorded} export artifact(s)")
+    return recorded
+
+
+if __name__ == "__main__":
+    backfill_export_artifacts()
@@ -0,0 +1,25 @@
+"""
+Recompute stale stored deal scores for every user.
+
+Usage:
+    python -m app.scripts.rescore_deals
+
+The API does this once per scoring version at startup; run this by hand to
+catch up deals edited outside the API. Only stale rows are rescored, so it
+is safe to re-run.
+"""
+from sqlalchemy.orm import Session
+
+from app.core.db import engine
+from app.services.deal_scores import rescore_deals
+
+
+def main() -> int:
+    with Session(engine) as db:
+        n = rescore_deals(db)
+    print(f"Rescored {n} deal(s)")
+    return n
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from collections import Counter, defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Dict, List, Tuple
 
+from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
 
 from app.models.lead import Lead
+from app.utils.text import sql_strip_blank, strip_blank
 
 
 @dataclass(frozen=True)
@@ -18,7 +19,7 @@ class LeadScore:
 
 
 def _truthy(s: str | None) -> bool:
-    return bool(s and str(s).strip())
+    return bool(strip_blank(s))
 
 
 def score_lead(lead: Lead) -> LeadScore:
@@ -48,7 +49,7 @@ def score_lead(lead: Lead) -> LeadScore:
     if _truthy(lead.zip_code):
         score += 5
         reasons.append("Has ZIP")
-        meta["zip"] = str(lead.zip_code).strip()
+        meta["zip"] = strip_blank(lead.zip_code)
     else:
         reasons.append("Missing ZIP")
 
@@ -57,12 +58,60 @@ def score_lead(lead: Lead) -> LeadScore:
     return LeadScore(lead_id=lead.id, score=score, reasons=reasons, metadata=meta)
 
 
+def _present(col):
+    """SQL version of _truthy: not NULL and not blank (same characters stripped)."""
+    return func.coalesce(sql_strip_blank(col), "") != ""
+
+
+def _count_if(cond):
+    return func.coalesce(func.sum(case((cond, 1), else_=0)), 0)
+
+
+def lead_score_expr():
+    """score_lead's score as a SQL expression, for ranking leads in the database."""
+    return (
+        case((_present(Lead.phone), 40), else_=0)
+        + case((_present(Lead.owner_name), 20), else_=0)
+        + case((_present(Lead.address), 10), else_=0)
+        + case((_present(Lead.zip_code), 5), else_=0)
+    )
+
+
+def top_scored_leads(
+    db: Session,
+    *criteria,
+    limit: int,
+    after: Tuple[int, int] | None = None,
+) -> List[LeadScore]:
+    """
+    Highest scoring leads matching `criteria`, ordered by (score DESC, id ASC).
+
+    Ranking, LIMIT and the keyset `after=(score, lead_id)` of the previous
+    page's last row all run in SQL; only the returned page is scored in Python
+    (for its reasons and metadata).
+    """
+    score = lead_score_expr().label("score")
+    q = db.query(Lead.id, Lead.phone, Lead.owner_name, Lead.address, Lead.zip_code, score).filter(*criteria)
+    if after is not None:
+        after_score, after_id = after
+        q = q.filter(or_(score < after_score, and_(score == after_score, Lead.id > after_id)))
+    rows = q.order_by(score.desc(), Lead.id.asc()).limit(limit).all()
+
+    return [replace(score_lead(row), score=row.score) for row in rows]
+
+
 def campaign_summary(db: Session, campaign_id: int) -> dict:
-    leads = db.query(Lead).filter(Lead.campaign_id == campaign_id).all()
-    total = len(leads)
-    with_phone = sum(1 for l in leads if _truthy(l.phone))
-    with_owner = sum(1 for l in leads if _truthy(l.owner_name))
-    zips = {str(l.zip_code).strip() for l in leads if _truthy(l.zip_code)}
+    # One aggregate row; nothing is loaded per lead
+    total, with_phone, with_owner, zips = (
+        db.query(
+            func.count(Lead.id),
+            _count_if(_present(Lead.phone)),
+            _count_if(_present(Lead.owner_name)),
+            func.count(func.distinct(case((_present(Lead.zip_code), sql_strip_blank(Lead.zip_code)), else_=None))),
+        )
+        .filter(Lead.campaign_id == campaign_id)
+        .one()
+    )
     return {
         "campaign_id": campaign_id,
         "total_leads": total,
@@ -70,25 +119,30 @@ def campaign_summary(db: Session, campaign_id: int) -> dict:
         "leads_missing_phone": total - with_phone,
         "leads_with_owner": with_owner,
         "leads_missing_owner": total - with_owner,
-        "distinct_zip_codes": len(zips),
+        "distinct_zip_codes": zips,
     }
 
 
 def campaign_zip_breakdown(db: Session, campaign_id: int) -> dict:
-    leads = db.query(Lead).filter(Lead.campaign_id == campaign_id).all()
-    by_zip: Dict[str, List[Lead]] = defaultdict(list)
-    for l in leads:
-        z = (l.zip_code or "").strip() or "UNKNOWN"
-        by_zip[z].append(l)
+    # Blank/NULL ZIPs group together (as None) and sort last
+    zip_key = func.nullif(sql_strip_blank(func.coalesce(Lead.zip_code, "")), "")
+    q = (
+        db.query(
+            zip_key.label("zip_code"),
+            func.count(Lead.id),
+            _count_if(_present(Lead.phone)),
+            _count_if(_present(Lead.owner_name)),
+        )
+        .filter(Lead.campaign_id == campaign_id)
+        .group_by(zip_key)
+        .order_by(zip_key.is_(None), zip_key)
+    )
 
     rows = []
-    for z, zleads in sorted(by_zip.items(), key=lambda kv: (kv[0] == "UNKNOWN", kv[0])):
-        total = len(zleads)
-        with_phone = sum(1 for l in zleads if _truthy(l.phone))
-        with_owner = sum(1 for l in zleads if _truthy(l.owner_name))
+    for z, total, with_phone, with_owner in q.all():
         rows.append(
             {
-                "zip_code": None if z == "UNKNOWN" else z,
+                "zip_code": z,
                 "total_leads": total,
                 "leads_with_phone": with_phone,
                 "leads_missing_phone": total - with_phone,
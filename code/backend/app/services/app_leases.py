@@ -0,0 +1,76 @@
+"""
+Expiring leases stored in app_control rows.
+
+A lease row's value is "<expires iso> <owner>". Taking a lease is a
+compare-and-swap on that value (or the insert that wins the unique key), so
+at most one owner holds a live lease at a time. A holder that crashes stops
+renewing and its lease lapses after `seconds`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.app_control import AppControl
+
+
+def control_value(db: Session, key: str) -> str | None:
+    return db.query(AppControl.value).filter(AppControl.key == key).scalar()
+
+
+def _lease_value(owner: str, seconds: int) -> str:
+    expires = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+    return f"{expires.isoformat()} {owner}"
+
+
+def _lease_live(value: str) -> bool:
+    expires, _, _owner = value.partition(" ")
+    try:
+        return datetime.fromisoformat(expires) > datetime.now(timezone.utc)
+    except ValueError:
+        return False
+
+
+def held_by(key: str, owner: str):
+    """WHERE clause matching the lease row `key` while `owner` holds it."""
+    return (AppControl.key == key) & AppControl.value.endswith(f" {owner}")
+
+
+def acquire_lease(db: Session, key: str, owner: str, seconds: int) -> bool:
+    """Take (or extend) the lease for `owner`. False while another owner holds a live one. Commits."""
+    current = control_value(db, key)
+    if current is None:
+        try:
+            db.add(AppControl(key=key, value=_lease_value(owner, seconds)))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        return True
+
+    if _lease_live(current) and not current.endswith(f" {owner}"):
+        return False
+    result = db.execute(
+        update(AppControl)
+        .where(AppControl.key == key, AppControl.value == current)
+        .values(value=_lease_value(owner, seconds))
+    )
+    db.commit()
+    return bool(result.rowcount)
+
+
+def renew_lease(db: Session, key: str, owner: str, seconds: int) -> bool:
+    """Extend `owner`'s lease. False when it no longer holds it. Commits."""
+    result = db.execute(update(AppControl).where(held_by(key, owner)).values(value=_lease_value(owner, seconds)))
+    db.commit()
+    return bool(result.rowcount)
+
+
+def release_lease(db: Session, key: str, owner: str) -> None:
+    """Drop `owner`'s lease so another owner can take it right away. Commits."""
+    db.execute(delete(AppControl).where(held_by(key, owner)))
+    db.commit()
@@ -0,0 +1,237 @@
+"""
+Cached campaign statistics.
+
+One campaign_stats row per campaign holds the analyzer summary counters,
+plus per-ZIP and per-status lead counts (the per-ZIP counts make
+distinct_zip_codes maintainable under deletes). Every code path that
+writes leads (populate, the leads router) applies its change as a delta in
+the same transaction, so GET /analyzer/campaign/{id}/summary is a primary
+key lookup.
+
+A missing row is built from the leads table on the first summary read
+(writers never create rows, so concurrent imports can't collide on it), and
+reconcile_campaign_stats() periodically rebuilds every row as a safety net
+against writers that bypass these hooks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.campaign_stats import CampaignStats
+from app.models.lead import Lead
+from app.services.analyzer_engine import _present, _truthy, campaign_summary
+from app.services.periodic_jobs import is_periodic_leader
+from app.utils.text import sql_strip_blank, strip_blank
+
+logger = logging.getLogger(__name__)
+
+# (has_phone, has_owner, zip_code or None, status): all a lead contributes to the stats
+LeadFacts = tuple[bool, bool, Optional[str], str]
+
+# Strong ref so the reconciler task is not garbage collected
+_reconciler_task: asyncio.Task | None = None
+
+
+def lead_facts(lead: Any) -> LeadFacts:
+    """Stats contribution of a Lead, a result row, or a lead insert dict."""
+    if isinstance(lead, dict):
+        get = lead.get
+    else:
+        def get(name):
+            return getattr(lead, name, None)
+
+    zip_code = strip_blank(get("zip_code")) or None
+    return _truthy(get("phone")), _truthy(get("owner_name")), zip_code, get("status") or "new"
+
+
+def _locked_row(db: Session, campaign_id: int) -> CampaignStats | None:
+    """The campaign's stats row, locked (and reloaded) until the transaction ends."""
+    return (
+        db.query(CampaignStats)
+        .filter(CampaignStats.campaign_id == campaign_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+
+
+def rebuild_campaign_stats(db: Session, campaign_id: int) -> CampaignStats:
+    """
+    Recompute a campaign's row from the leads table with grouped queries (no
+    commit). The row is locked before the aggregates are read, so a lead write
+    applying its delta either commits before the rebuild reads the leads or
+    waits and applies on top of the rebuilt row.
+    """
+    row = _locked_row(db, campaign_id)
+    if row is None:
+        row = CampaignStats(campaign_id=campaign_id)
+        db.add(row)
+        db.flush()
+
+    summary = campaign_summary(db, campaign_id)
+
+    zip_key = sql_strip_blank(Lead.zip_code)
+    zip_counts = dict(
+        db.query(zip_key, func.count(Lead.id))
+        .filter(Lead.campaign_id == campaign_id, _present(Lead.zip_code))
+        .group_by(zip_key)
+        .all()
+    )
+    status_counts = dict(
+        db.query(Lead.status, func.count(Lead.id))
+        .filter(Lead.campaign_id == campaign_id)
+        .group_by(Lead.status)
+        .all()
+    )
+
+    row.total_leads = summary["total_leads"]
+    row.leads_with_phone = summary["leads_with_phone"]
+    row.leads_with_owner = summary["leads_with_owner"]
+    row.distinct_zip_codes = len(zip_counts)
+    row.zip_counts_json = json.dumps(zip_counts, sort_keys=True)
+    row.status_counts_json = json.dumps(status_counts, sort_keys=True)
+    row.reconciled_at = datetime.now(timezone.utc)
+    db.flush()
+    return row
+
+
+def _bump(counts: dict[str, int], key: str, delta: int) -> None:
+    n = counts.get(key, 0) + delta
+    if n > 0:
+        counts[key] = n
+    else:
+        counts.pop(key, None)
+
+
+def apply_lead_changes(
+    db: Session,
+    campaign_id: int,
+    added: Iterable[Any] = (),
+    removed: Iterable[LeadFacts] = (),
+) -> None:
+    """
+    Apply lead inserts (`added`: leads/rows/dicts) and deletes (`removed`:
+    lead_facts taken before the delete) to the campaign's stats row. An update
+    is a remove of the old facts plus an add of the new lead.
+
+    Call in the transaction that changes the leads, before the commit. No-op
+    for a campaign without a stats row: it is built on the next summary read.
+    """
+    changes = [(lead_facts(lead), 1) for lead in added] + [(facts, -1) for facts in removed]
+    if not changes:
+        return
+
+    row = _locked_row(db, campaign_id)
+    if row is None:
+        return
+
+    zip_counts: dict[str, int] = json.loads(row.zip_counts_json or "{}")
+    status_counts: dict[str, int] = json.loads(row.status_counts_json or "{}")
+
+    for (has_phone, has_owner, zip_code, status), sign in changes:
+        row.total_leads += sign
+        row.leads_with_phone += sign if has_phone else 0
+        row.leads_with_owner += sign if has_owner else 0
+        if zip_code is not None:
+            _bump(zip_counts, zip_code, sign)
+        _bump(status_counts, status, sign)
+
+    row.distinct_zip_codes = len(zip_counts)
+    row.zip_counts_json = json.dumps(zip_counts, sort_keys=True)
+    row.status_counts_json = json.dumps(status_counts, sort_keys=True)
+
+
+def delete_campaign_stats(db: Session, campaign_id: int) -> None:
+    db.query(CampaignStats).filter(CampaignStats.campaign_id == campaign_id).delete(synchronize_session=False)
+
+
+def cached_campaign_summary(db: Session, campaign_id: int) -> dict:
+    """campaign_summary() plus status_counts, read from the stats row."""
+    row = db.get(CampaignStats, campaign_id)
+    if row is None:
+        try:
+            rebuild_campaign_stats(db, campaign_id)
+            db.commit()
+        except IntegrityError:
+            # A concurrent read built it first
+            db.rollback()
+        row = db.get(CampaignStats, campaign_id)
+
+    return {
+        "campaign_id": campaign_id,
+        "total_leads": row.total_leads,
+        "leads_with_phone": row.leads_with_phone,
+        "leads_missing_phone": row.total_leads - row.leads_with_phone,
+        "leads_with_owner": row.leads_with_owner,
+        "leads_missing_owner": row.total_leads - row.leads_with_owner,
+        "distinct_zip_codes": row.distinct_zip_codes,
+        "status_counts": json.loads(row.status_counts_json or "{}"),
+    }
+
+
+def _snapshot(row: CampaignStats) -> tuple:
+    return (
+        row.total_leads,
+        row.leads_with_phone,
+        row.leads_with_owner,
+        row.distinct_zip_codes,
+        json.loads(row.zip_counts_json or "{}"),
+        json.loads(row.status_counts_json or "{}"),
+    )
+
+
+def reconcile_campaign_stats(db: Session) -> int:
+    """Rebuild every stats row from the leads table. Returns how many had drifted."""
+    drifted = 0
+    campaign_ids = [cid for (cid,) in db.query(CampaignStats.campaign_id).order_by(CampaignStats.campaign_id).all()]
+    for campaign_id in campaign_ids:
+        row = _locked_row(db, campaign_id)
+        if row is None:
+            continue
+        before = _snapshot(row)
+        rebuild_campaign_stats(db, campaign_id)
+        if _snapshot(row) != before:
+            drifted += 1
+            logger.warning("Campaign stats drift corrected for campaign %s", campaign_id)
+        db.commit()
+    return drifted
+
+
+async def _reconcile_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.CAMPAIGN_STATS_RECONCILE_SECONDS)
+        if not is_periodic_leader():
+            continue
+        try:
+            await asyncio.to_thread(_reconcile_once)
+        except Exception:
+            logger.exception("Campaign stats reconciliation failed")
+
+
+def _reconcile_once() -> None:
+    db = SessionLocal()
+    try:
+        reconcile_campaign_stats(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def start_campaign_stats_reconciler() -> None:
+    """Start the periodic reconciliation task (once per process; runs while it holds the periodic jobs lease)."""
+    global _reconciler_task
+    if _reconciler_task is None or _reconciler_task.done():
+        _reconciler_task = asyncio.get_running_loop().create_task(_reconcile_loop())
@@ -0,0 +1,253 @@
+"""
+Comparable-sales ARV.
+
+A CompsIndex holds past sales (from an imported CSV, COMPS_SALES_FILE) in a
+lat/lon grid: sales are sorted by grid cell, and each cell maps to a slice of
+flat NumPy columns. A query only touches the cells within the search radius,
+then filters by size band and takes the k nearest with argpartition, so an
+estimate costs tens of microseconds instead of an external comps API call.
+
+ARV = median $/sqft of the k nearest comps within COMPS_SIZE_BAND of the
+subject's size, times the subject's sqft (median sale price when the subject
+sqft is unknown).
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.core.settings import get_settings
+
+MILES_PER_DEGREE_LAT = 69.0
+
+
+@dataclass(slots=True)
+class CompSale:
+    """One past sale"""
+    latitude: float
+    longitude: float
+    price: float
+    sqft: int | None = None
+    sale_date: str | None = None
+    key: str | None = None  # address; lets a property be excluded from its own comps
+
+
+@dataclass
+class CompsEstimate:
+    arv: float
+    comp_count: int
+    price_per_sqft: float | None  # median of the comps used
+    radius_miles: float  # distance to the farthest comp used
+
+
+def _opt_float(val: str | None) -> float | None:
+    try:
+        return float(val) if val not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def load_comp_sales_csv(path: str | Path) -> list[CompSale]:
+    """
+    Sales from an imported CSV with columns latitude, longitude, sale_price and
+    optionally sqft, sale_date, address. Rows missing coordinates or price are skipped.
+    """
+    sales: list[CompSale] = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            lat = _opt_float(row.get("latitude"))
+            lon = _opt_float(row.get("longitude"))
+            price = _opt_float(row.get("sale_price"))
+            if lat is None or lon is None or not price:
+                continue
+            sqft = _opt_float(row.get("sqft"))
+            sales.append(
+                CompSale(
+                    latitude=lat,
+                    longitude=lon,
+                    price=price,
+                    sqft=int(sqft) if sqft else None,
+                    sale_date=row.get("sale_date") or None,
+                    key=row.get("address") or None,
+                )
+            )
+    return sales
+
+
+class CompsIndex:
+    """
+    Grid index over past sales for k-nearest-comps queries.
+
+    The grid cell is radius_miles tall, so a query reads one row of cells above
+    and below the subject and as many columns as the radius spans at its latitude.
+    """
+
+    def __init__(
+        self,
+        sales: Iterable[CompSale],
+        k: int | None = None,
+        min_comps: int | None = None,
+        radius_miles: float | None = None,
+        size_band: float | None = None,
+        source: str = "",
+    ):
+        s = get_settings()
+        self.source = source  # identifies the sales data (comps_fingerprint)
+        self.k = k or s.COMPS_K
+        self.min_comps = min_comps or s.COMPS_MIN_COUNT
+        self.radius_miles = radius_miles or s.COMPS_MAX_RADIUS_MILES
+        self.size_band = s.COMPS_SIZE_BAND if size_band is None else size_band
+        self.cell_degrees = self.radius_miles / MILES_PER_DEGREE_LAT
+
+        sales = list(sales)
+        lat = np.array([c.latitude for c in sales], dtype=float)
+        lon = np.array([c.longitude for c in sales], dtype=float)
+        cy = np.floor(lat / self.cell_degrees).astype(np.int64)
+        cx = np.floor(lon / self.cell_degrees).astype(np.int64)
+        order = np.lexsort((cx, cy))
+
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.price = np.array([sales[i].price for i in order], dtype=float)
+        self.sqft = np.array([sales[i].sqft or np.nan for i in order], dtype=float)
+        self.keys = [sales[i].key for i in order]
+
+        # cell -> (start, stop) into the sorted columns
+        self._cells: dict[tuple[int, int], tuple[int, int]] = {}
+        cy, cx = cy[order], cx[order]
+        start = 0
+        for i in range(1, len(order) + 1):
+            if i == len(order) or cy[i] != cy[start] or cx[i] != cx[start]:
+                self._cells[(int(cy[start]), int(cx[start]))] = (start, i)
+                start = i
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def _candidates(self, lat: float, lon: float) -> np.ndarray:
+        cy = math.floor(lat / self.cell_degrees)
+        cx = math.floor(lon / self.cell_degrees)
+        # A degree of longitude shrinks with cos(lat): widen the column span to cover the radius
+        span_x = math.ceil(1 / max(math.cos(math.radians(lat)), 0.01))
+        slices = [
+            self._cells[cell]
+            for cell in ((cy + dy, cx + dx) for dy in (-1, 0, 1) for dx in range(-span_x, span_x + 1))
+            if cell in self._cells
+        ]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(a, b) for a, b in slices])
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        sqft: float | None = None,
+        k: int | None = None,
+        exclude_key: str | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Up to k nearest sales within radius_miles (and the size band when sqft
+        is given), nearest first. Returns (indices, distances in miles).
+        """
+        k = k or self.k
+        idx = self._candidates(latitude, longitude)
+        if idx.size == 0:
+            return idx, np.empty(0)
+
+        # Equirectangular distance: accurate to well under 1% at comps radii
+        dy = (self.lat[idx] - latitude) * MILES_PER_DEGREE_LAT
+        dx = (self.lon[idx] - longitude) * MILES_PER_DEGREE_LAT * math.cos(math.radians(latitude))
+        dist = np.hypot(dx, dy)
+
+        keep = dist <= self.radius_miles
+        if sqft:
+            keep &= np.abs(self.sqft[idx] - sqft) <= sqft * self.size_band
+        if exclude_key is not None:
+            keep &= np.array([self.keys[i] != exclude_key for i in idx], dtype=bool)
+        idx, dist = idx[keep], dist[keep]
+
+        if idx.size > k:
+            part = np.argpartition(dist, k - 1)[:k]
+            idx, dist = idx[part], dist[part]
+        order = np.argsort(dist, kind="stable")
+        return idx[order], dist[order]
+
+    def estimate(
+        self,
+        latitude: float | None,
+        longitude: float | None,
+        sqft: float | None = None,
+        exclude_key: str | None = None,
+    ) -> Optional[CompsEstimate]:
+        """Comps ARV for one property, or None without coordinates or enough comps."""
+        if latitude is None or longitude is None or len(self) == 0:
+            return None
+        idx, dist = self.nearest(latitude, longitude, sqft, exclude_key=exclude_key)
+        if idx.size < self.min_comps:
+            return None
+
+        if sqft:
+            ppsf = float(np.median(self.price[idx] / self.sqft[idx]))
+            arv = ppsf * sqft
+        else:
+            ppsf = None
+            arv = float(np.median(self.price[idx]))
+        return CompsEstimate(arv=arv, comp_count=int(idx.size), price_per_sqft=ppsf, radius_miles=float(dist[-1]))
+
+    def estimate_many(
+        self,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        sqft: np.ndarray | None = None,
+        exclude_keys: list[str | None] | None = None,
+    ) -> np.ndarray:
+        """Comps ARV per row (NaN = no estimate), e.g. the comps_arv of analyze_deals_batch."""
+        latitude = np.asarray(latitude, dtype=float)
+        longitude = np.asarray(longitude, dtype=float)
+        sqft = np.full(len(latitude), np.nan) if sqft is None else np.asarray(sqft, dtype=float)
+
+        out = np.full(len(latitude), np.nan)
+        for i in range(len(latitude)):
+            if np.isnan(latitude[i]) or np.isnan(longitude[i]):
+                continue
+            est = self.estimate(
+                float(latitude[i]),
+                float(longitude[i]),
+                None if np.isnan(sqft[i]) else float(sqft[i]),
+                exclude_key=exclude_keys[i] if exclude_keys is not None else None,
+            )
+            if est is not None:
+                out[i] = est.arv
+        return out
+
+
+@lru_cache
+def get_comps_index() -> Optional[CompsIndex]:
+    """Process-wide index over COMPS_SALES_FILE, built on first use (None when unset)."""
+    path = get_settings().COMPS_SALES_FILE
+    if not path:
+        return None
+    mtime = os.stat(path).st_mtime_ns
+    sales = load_comp_sales_csv(path)
+    return CompsIndex(sales, source=f"{Path(path).resolve()}:{mtime}:{len(sales)}")
+
+
+def comps_fingerprint() -> str:
+    """
+    Identity of the comps data ARVs come from: file path, mtime and row
+    count ("" when comps are off). Stored scores are stale when it changes.
+    """
+    index = get_comps_index()
+    if index is None:
+        return ""
+    return hashlib.sha256(index.source.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,335 @@
+"""
+Materialized deal scores.
+
+analyze_deal() results are stored on the Deal row (scored_arv,
+scored_repair_estimate, mao, deal_score) so list views can read and sort by
+score instead of re-running the analysis. arv and repair_estimate are the
+user's own numbers: they are never overwritten, and when set they are used
+in place of the computed ARV / repair estimate. Scoring uses the same comps
+index as /deals/analyze, so a stored score matches a fresh analysis.
+
+Each row also records its score version (the scoring profile version, folded
+with the comps data fingerprint when comps are on) and a fingerprint of its
+scoring inputs; a stored score is stale when either one no longer matches,
+and only stale rows are recomputed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import numpy as np
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.core.settings import get_settings
+from app.models.app_control import AppControl
+from app.models.deal import Deal
+from app.providers.base import ProviderLead
+from app.services.app_leases import acquire_lease, control_value, held_by, release_lease, renew_lease
+from app.services.comps import comps_fingerprint, get_comps_index
+from app.services.deal_scoring import analyze_deal
+from app.services.deal_scoring_batch import LEAD_COLUMNS, analyze_deals_batch
+from app.services.scoring_profile import ScoringProfile, default_scoring_profile
+
+logger = logging.getLogger(__name__)
+
+# Every Deal column the stored score depends on (arv / repair_estimate as user overrides,
+# address and coordinates for the comps ARV)
+SCORE_INPUT_FIELDS = LEAD_COLUMNS + (
+    "list_price",
+    "purchase_price",
+    "arv",
+    "repair_estimate",
+    "address",
+    "latitude",
+    "longitude",
+)
+
+# AppControl keys: scoring version the startup rescore last completed, and the
+# lease ("<expires iso> <owner>") of the process running it
+RESCORE_CONTROL_KEY = "deal_rescore_version"
+RESCORE_LEASE_KEY = "deal_rescore_lease"
+
+# Strong refs so scheduled rescores are not garbage collected mid-run
+_rescore_tasks: set[asyncio.Task] = set()
+
+
+def deal_lead(d: Deal) -> ProviderLead:
+    """The scoring inputs of a deal, as a ProviderLead"""
+    return ProviderLead(
+        address=d.address,
+        city=d.city,
+        state=d.state,
+        zip_code=d.zip_code,
+        latitude=d.latitude,
+        longitude=d.longitude,
+        bedrooms=d.bedrooms,
+        bathrooms=d.bathrooms,
+        sqft=d.sqft,
+        lot_size=d.lot_size,
+        year_built=d.year_built,
+        property_type=d.property_type,
+        estimated_value=d.estimated_value,
+        assessed_value=d.assessed_value,
+        last_sale_price=d.last_sale_price,
+        owner_occupied=d.owner_occupied,
+        absentee_owner=d.absentee_owner,
+        equity_percent=d.equity_percent,
+        mortgage_amount=d.mortgage_amount,
+    )
+
+
+def deal_asking_price(d: Deal) -> float | None:
+    """List price when known, else our purchase price"""
+    return d.list_price or d.purchase_price
+
+
+def score_inputs_hash(d: Deal) -> str:
+    """Short fingerprint of the deal's scoring inputs (SCORE_INPUT_FIELDS)"""
+    values = [getattr(d, name) for name in SCORE_INPUT_FIELDS]
+    # Normalize numerics so 1500 and 1500.0 (int vs float column round trips) hash the same
+    values = [float(v) if isinstance(v, (int, float)) else v for v in values]
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()[:16]
+
+
+def score_version(profile: ScoringProfile) -> str:
+    """Version stamped on stored scores: the profile version, plus the comps data when comps are on."""
+    comps = comps_fingerprint()
+    if not comps:
+        return profile.version
+    return hashlib.sha256(f"{profile.version}:{comps}".encode("utf-8")).hexdigest()[:16]
+
+
+def needs_rescore(d: Deal, profile: ScoringProfile, version: str | None = None) -> bool:
+    if version is None:
+        version = score_version(profile)
+    return d.score_profile_version != version or d.score_inputs_hash != score_inputs_hash(d)
+
+
+def _mark_scored(d: Deal, profile: ScoringProfile, now: datetime) -> None:
+    d.score_profile_version = score_version(profile)
+    d.score_inputs_hash = score_inputs_hash(d)
+    d.scored_at = now
+
+
+def score_deal(d: Deal, profile: Optional[ScoringProfile] = None) -> bool:
+    """
+    Run analyze_deal on a deal and store the results on it (no commit).
+
+    The user's arv and repair_estimate (when set) override the computed
+    ones and are never written. Returns False when there isn't enough data to
+    score: the scored_* values, mao and deal_score are cleared.
+    """
+    if profile is None:
+        profile = default_scoring_profile()
+
+    try:
+        analysis = analyze_deal(
+            lead=deal_lead(d),
+            asking_price=deal_asking_price(d),
+            profile=profile,
+            comps=get_comps_index(),
+            arv_override=d.arv,
+            repair_override=d.repair_estimate,
+        )
+    except ValueError:
+        d.scored_arv = None
+        d.scored_repair_estimate = None
+        d.mao = None
+        d.deal_score = None
+        scored = False
+    else:
+        d.scored_arv = analysis.arv
+        d.scored_repair_estimate = analysis.repair_estimate
+        d.mao = analysis.mao
+        d.deal_score = analysis.deal_score
+        scored = True
+
+    _mark_scored(d, profile, datetime.now(timezone.utc))
+    return scored
+
+
+def _rescore_batch(deals: list[Deal], profile: ScoringProfile) -> None:
+    """Score deals with analyze_deals_batch and store the results (no commit)."""
+    columns = {name: np.array([getattr(d, name) for d in deals], dtype=float) for name in LEAD_COLUMNS}
+    asking = np.array([deal_asking_price(d) for d in deals], dtype=float)
+    comps = get_comps_index()
+    comps_arv = None
+    if comps is not None:
+        comps_arv = comps.estimate_many(
+            np.array([d.latitude for d in deals], dtype=float),
+            np.array([d.longitude for d in deals], dtype=float),
+            columns["sqft"],
+            exclude_keys=[d.address for d in deals],
+        )
+    result = analyze_deals_batch(
+        **columns,
+        asking_price=asking,
+        profile=profile,
+        comps_arv=comps_arv,
+        arv_override=np.array([d.arv for d in deals], dtype=float),
+        repair_override=np.array([d.repair_estimate for d in deals], dtype=float),
+    )
+
+    now = datetime.now(timezone.utc)
+    for i, d in enumerate(deals):
+        if result.valid[i]:
+            d.scored_arv = float(result.arv[i])
+            d.scored_repair_estimate = float(result.repair_estimate[i])
+            d.mao = float(result.mao[i])
+            d.deal_score = float(result.deal_score[i])
+        else:
+            d.scored_arv = None
+            d.scored_repair_estimate = None
+            d.mao = None
+            d.deal_score = None
+        _mark_scored(d, profile, now)
+
+
+def rescore_deals(
+    db: Session,
+    user_id: int | None = None,
+    profile: Optional[ScoringProfile] = None,
+    batch_size: int | None = None,
+    on_batch: Optional[Callable[[], None]] = None,
+) -> int:
+    """
+    Recompute stored scores whose score version or input fingerprint is stale.
+
+    Walks deals by id in batches of batch_size (default DEAL_RESCORE_BATCH_SIZE),
+    rescoring only the stale rows of each batch and committing per batch, so an
+    interrupted run keeps its progress; `on_batch` is called after each batch.
+    Returns the number of deals rescored.
+    """
+    if profile is None:
+        profile = default_scoring_profile()
+    if batch_size is None:
+        batch_size = get_settings().DEAL_RESCORE_BATCH_SIZE
+
+    q = db.query(Deal)
+    if user_id is not None:
+        q = q.filter(Deal.created_by_user_id == user_id)
+
+    version = score_version(profile)
+    rescored = 0
+    last_id = 0
+    while True:
+        batch = q.filter(Deal.id > last_id).order_by(Deal.id.asc()).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        stale = [d for d in batch if needs_rescore(d, profile, version)]
+        if stale:
+            _rescore_batch(stale, profile)
+            db.commit()
+            rescored += len(stale)
+        if on_batch is not None:
+            on_batch()
+
+    return rescored
+
+
+def run_rescore_deals(user_id: int | None = None) -> None:
+    """Runs in a background task. Uses its own DB session."""
+    db = SessionLocal()
+    try:
+        n = rescore_deals(db, user_id=user_id)
+        logger.info("Rescored %s deals (user_id=%s)", n, user_id)
+    except Exception:
+        db.rollback()
+        logger.exception("Deal rescore failed (user_id=%s)", user_id)
+    finally:
+        db.close()
+
+
+def scoring_version(profile: ScoringProfile) -> str:
+    """Changes whenever every stored score may be stale: new profile, new comps data or new score inputs."""
+    key = f"{score_version(profile)}:{','.join(SCORE_INPUT_FIELDS)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def claim_startup_rescore(db: Session, version: str, owner: str) -> bool:
+    """
+    Take the startup rescore lease for `version`. True for the one process
+    that should run the rescore: the version is not recorded as done yet and
+    no other process holds a live lease. A lease whose holder crashed expires
+    after DEAL_RESCORE_LEASE_SECONDS.
+    """
+    if control_value(db, RESCORE_CONTROL_KEY) == version:
+        return False
+    if not acquire_lease(db, RESCORE_LEASE_KEY, owner, get_settings().DEAL_RESCORE_LEASE_SECONDS):
+        return False
+
+    # The previous holder may have finished this version just before its lease lapsed
+    if control_value(db, RESCORE_CONTROL_KEY) == version:
+        release_startup_rescore(db, owner)
+        return False
+    return True
+
+
+def renew_startup_rescore(db: Session, owner: str) -> bool:
+    """Extend `owner`'s lease. False when it no longer holds it."""
+    return renew_lease(db, RESCORE_LEASE_KEY, owner, get_settings().DEAL_RESCORE_LEASE_SECONDS)
+
+
+def release_startup_rescore(db: Session, owner: str) -> None:
+    """Drop `owner`'s lease so the next startup can retry right away."""
+    release_lease(db, RESCORE_LEASE_KEY, owner)
+
+
+def complete_startup_rescore(db: Session, version: str, owner: str) -> None:
+    """Record `version` as rescored and release the lease, in one commit."""
+    result = db.execute(
+        update(AppControl).where(AppControl.key == RESCORE_CONTROL_KEY).values(value=version)
+    )
+    if not result.rowcount:
+        db.add(AppControl(key=RESCORE_CONTROL_KEY, value=version))
+    db.execute(delete(AppControl).where(held_by(RESCORE_LEASE_KEY, owner)))
+    db.commit()
+
+
+def run_startup_rescore() -> None:
+    """
+    Rescore every user's stale deals, if no process has completed this scoring
+    version yet. The version is only recorded once the rescore has finished:
+    a run that crashes or raises leaves it for the next startup (or, after the
+    lease expires, for another process).
+    """
+    owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+    db = SessionLocal()
+    try:
+        profile = default_scoring_profile()
+        version = scoring_version(profile)
+        if not claim_startup_rescore(db, version, owner):
+            logger.info("Deal scores already rescored (or being rescored) for scoring version %s", version)
+            return
+        try:
+            n = rescore_deals(db, profile=profile, on_batch=lambda: renew_startup_rescore(db, owner))
+        except Exception:
+            db.rollback()
+            release_startup_rescore(db, owner)
+            raise
+        complete_startup_rescore(db, version, owner)
+        logger.info("Rescored %s deals for scoring version %s", n, version)
+    except Exception:
+        db.rollback()
+        logger.exception("Startup deal rescore failed")
+    finally:
+        db.close()
+
+
+def schedule_startup_rescore() -> None:
+    """Run run_startup_rescore in a worker thread without blocking the event loop."""
+    task = asyncio.get_running_loop().create_task(asyncio.to_thread(run_startup_rescore))
+    _rescore_tasks.add(task)
+    task.add_done_callback(_rescore_tasks.discard)
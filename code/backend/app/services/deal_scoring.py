@@ -8,13 +8,18 @@ It calculates ARV, repair estimates, MAO, and overall deal scores based on prope
 from __future__ import annotations
 
 import logging
+import random
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from app.core.settings import get_settings
 
 settings = get_settings()
 from app.providers.base import ProviderLead
+from app.services.scoring_profile import ScoringProfile, default_scoring_profile
+
+if TYPE_CHECKING:
+    from app.services.comps import CompsIndex
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +45,44 @@ class DealAnalysis:
     recommendation: str  # "Strong", "Good", "Fair", "Poor"
     notes: list[str]  # Explanation of score factors
 
+    # Structured scoring trace (only when requested with analyze_deal(trace=True))
+    trace: list[dict[str, Any]] | None = None
+
+
+class ScoringTrace:
+    """
+    Structured record of one analysis: one event per scoring step with its inputs
+    and outputs. Replaces per-step log lines; values are only formatted if the
+    trace is actually logged or returned.
+    """
+    __slots__ = ("events",)
+
+    def __init__(self):
+        self.events: list[dict[str, Any]] = []
+
+    def add(self, step: str, **fields: Any) -> None:
+        self.events.append({"step": step, **fields})
+
+    def lines(self) -> list[str]:
+        """Human-readable form, one line per step (appended to notes on request)."""
+        out = []
+        for event in self.events:
+            fields = ", ".join(
+                f"{k}={v:,.2f}" if isinstance(v, float) else f"{k}={v}"
+                for k, v in event.items()
+                if k != "step"
+            )
+            out.append(f"Trace {event['step']}: {fields}")
+        return out
+
+
+def _sample_trace() -> bool:
+    """Log a trace for this analysis? DEBUG must be on, then SCORING_TRACE_SAMPLE_RATE applies."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    rate = settings.SCORING_TRACE_SAMPLE_RATE
+    return rate >= 1.0 or random.random() < rate
+
 
 class PropertyCondition:
     """Property condition classifications for repair estimates"""
@@ -81,6 +124,8 @@ def estimate_property_condition(lead: ProviderLead) -> str:
 def calculate_repair_estimate(
     lead: ProviderLead,
     condition: Optional[str] = None,
+    trace: Optional[ScoringTrace] = None,
+    profile: Optional[ScoringProfile] = None,
 ) -> tuple[float, str]:
     """
     Calculate estimated repair costs based on property characteristics.
@@ -90,13 +135,16 @@ def calculate_repair_estimate(
     Args:
         lead: Property lead data
         condition: Override condition (if known)
+        trace: Records this step when given
+        profile: Repair rates to use (default: settings profile)
     
     Returns:
         (repair_estimate, condition_used)
     """
     if not lead.sqft or lead.sqft <= 0:
         # No sqft data - use a default minimum
-        logger.warning(f"No sqft data for {lead.address}, using default estimate")
+        if trace is not None:
+            trace.add("repair", sqft=lead.sqft, estimate=15000.0, condition="unknown")
         return 15000.0, "unknown"
     
     # Determine condition
@@ -104,72 +152,103 @@ def calculate_repair_estimate(
         condition = estimate_property_condition(lead)
     
     # Get cost per sqft based on condition
-    cost_per_sqft_map = {
-        PropertyCondition.EXCELLENT: settings.REPAIR_COST_PER_SQFT_EXCELLENT,
-        PropertyCondition.GOOD: settings.REPAIR_COST_PER_SQFT_GOOD,
-        PropertyCondition.AVERAGE: settings.REPAIR_COST_PER_SQFT_AVERAGE,
-        PropertyCondition.FAIR: settings.REPAIR_COST_PER_SQFT_FAIR,
-        PropertyCondition.POOR: settings.REPAIR_COST_PER_SQFT_POOR,
-    }
-    
-    cost_per_sqft = cost_per_sqft_map.get(
-        condition,
-        settings.REPAIR_COST_DEFAULT_MULTIPLIER
-    )
+    if profile is None:
+        profile = default_scoring_profile()
+    cost_per_sqft = profile.repair_rate(condition)
     
     repair_estimate = lead.sqft * cost_per_sqft
     
     # Add minimum floor (always some holding/transaction costs)
     repair_estimate = max(repair_estimate, 5000.0)
     
-    logger.info(
-        f"Repair estimate for {lead.address}: ${repair_estimate:,.0f} "
-        f"({lead.sqft} sqft × ${cost_per_sqft}/sqft, condition: {condition})"
-    )
+    if trace is not None:
+        trace.add("repair", sqft=lead.sqft, cost_per_sqft=cost_per_sqft, condition=condition, estimate=repair_estimate)
     
     return repair_estimate, condition
 
 
-def calculate_arv(lead: ProviderLead) -> tuple[float, str]:
+def _avm_arv(lead: ProviderLead, trace: Optional[ScoringTrace]) -> Optional[float]:
+    if lead.estimated_value and lead.estimated_value > 0:
+        if trace is not None:
+            trace.add("arv", method="avm", arv=lead.estimated_value)
+        return lead.estimated_value
+    return None
+
+
+def _comps_arv(lead: ProviderLead, trace: Optional[ScoringTrace], comps: Optional["CompsIndex"]) -> Optional[float]:
+    if comps is None:
+        return None
+    est = comps.estimate(lead.latitude, lead.longitude, lead.sqft, exclude_key=lead.address)
+    if est is None:
+        return None
+    if trace is not None:
+        trace.add(
+            "arv",
+            method="comps",
+            comp_count=est.comp_count,
+            price_per_sqft=est.price_per_sqft,
+            radius_miles=est.radius_miles,
+            arv=est.arv,
+        )
+    return est.arv
+
+
+def calculate_arv(
+    lead: ProviderLead,
+    trace: Optional[ScoringTrace] = None,
+    comps: Optional["CompsIndex"] = None,
+    profile: Optional[ScoringProfile] = None,
+) -> tuple[float, str]:
     """
     Calculate After Repair Value (ARV).
     
     Priority order:
     1. Use ATTOM estimated value (AVM) if available
-    2. Use comparable sales data (if available in future)
+    2. Use comparable sales (when a comps index is given and the lead has coordinates)
     3. Use assessed value with market multiplier
     4. Use last sale price with appreciation
+    Steps 1 and 2 swap when the profile has prefer_comps set.
     
     Args:
         lead: Property lead data
+        trace: Records this step when given
+        comps: Past sales to estimate ARV from (see app/services/comps.py)
+        profile: ARV source order (default: settings profile)
     
     Returns:
         (arv, method_used)
     """
-    # Method 1: Use estimated value from provider (AVM)
-    if lead.estimated_value and lead.estimated_value > 0:
-        logger.info(f"ARV from estimated value: ${lead.estimated_value:,.0f}")
-        return lead.estimated_value, "avm"
+    if profile is None:
+        profile = default_scoring_profile()
+
+    # Methods 1 and 2: provider AVM and median $/sqft of nearby comparable sales
+    for method in (("comps", "avm") if profile.prefer_comps else ("avm", "comps")):
+        arv = _avm_arv(lead, trace) if method == "avm" else _comps_arv(lead, trace, comps)
+        if arv is not None:
+            return arv, method
     
-    # Method 2: Use assessed value with multiplier
+    # Method 3: Use assessed value with multiplier
     # (Assessed values are typically 80-90% of market value)
     if lead.assessed_value and lead.assessed_value > 0:
         arv = lead.assessed_value * 1.15  # 15% above assessed
-        logger.info(f"ARV from assessed value: ${arv:,.0f} (assessed: ${lead.assessed_value:,.0f})")
+        if trace is not None:
+            trace.add("arv", method="assessed_value", assessed_value=lead.assessed_value, arv=arv)
         return arv, "assessed_value"
     
-    # Method 3: Use last sale price with appreciation (rough estimate)
+    # Method 4: Use last sale price with appreciation (rough estimate)
     if lead.last_sale_price and lead.last_sale_price > 0:
         # Assume 3% annual appreciation
         # This is very rough - in production, use actual market data
         years_since_sale = 5  # Default assumption
         appreciation = 1.03 ** years_since_sale
         arv = lead.last_sale_price * appreciation
-        logger.info(f"ARV from last sale: ${arv:,.0f} (last sale: ${lead.last_sale_price:,.0f})")
+        if trace is not None:
+            trace.add("arv", method="last_sale", last_sale_price=lead.last_sale_price, arv=arv)
         return arv, "last_sale"
     
     # No data available - cannot calculate
-    logger.warning(f"Cannot calculate ARV for {lead.address} - insufficient data")
+    if trace is not None:
+        trace.add("arv", method="insufficient_data", arv=0.0)
     return 0.0, "insufficient_data"
 
 
@@ -178,6 +257,8 @@ def calculate_mao(
     repair_estimate: float,
     assignment_fee: Optional[float] = None,
     closing_costs: Optional[float] = None,
+    trace: Optional[ScoringTrace] = None,
+    profile: Optional[ScoringProfile] = None,
 ) -> float:
     """
     Calculate Maximum Allowable Offer (MAO).
@@ -189,44 +270,86 @@ def calculate_mao(
     Args:
         arv: After Repair Value
         repair_estimate: Estimated repair costs
-        assignment_fee: Wholesaling assignment fee (default from settings)
-        closing_costs: Closing cost buffer (default from settings)
+        assignment_fee: Wholesaling assignment fee (default from profile)
+        closing_costs: Closing cost buffer (default from profile)
+        trace: Records this step when given
+        profile: MAO multiplier and default fees (default: settings profile)
     
     Returns:
         Maximum Allowable Offer
     """
+    if profile is None:
+        profile = default_scoring_profile()
+
     if assignment_fee is None:
-        assignment_fee = settings.DEFAULT_ASSIGNMENT_FEE
+        assignment_fee = profile.assignment_fee
     
     if closing_costs is None:
-        closing_costs = settings.DEFAULT_CLOSING_COST_BUFFER
+        closing_costs = profile.closing_costs
     
     # Calculate MAO using the configured multiplier
-    mao = (arv * settings.MAO_MULTIPLIER) - repair_estimate - assignment_fee - closing_costs
+    mao = (arv * profile.mao_multiplier) - repair_estimate - assignment_fee - closing_costs
     
     # MAO should never be negative
     mao = max(mao, 0.0)
     
-    logger.info(
-        f"MAO calculation: "
-        f"(${arv:,.0f} × {settings.MAO_MULTIPLIER}) - ${repair_estimate:,.0f} - "
-        f"${assignment_fee:,.0f} - ${closing_costs:,.0f} = ${mao:,.0f}"
-    )
+    if trace is not None:
+        trace.add(
+            "mao",
+            arv=arv,
+            multiplier=profile.mao_multiplier,
+            repair_estimate=repair_estimate,
+            assignment_fee=assignment_fee,
+            closing_costs=closing_costs,
+            mao=mao,
+        )
     
     return mao
 
 
+# Note text per tier, lowest tier first (used when a profile keeps the default tier count)
+_SPREAD_NOTES = (
+    "Negative spread: {pct:.1f}% - overpriced",
+    "Tight spread: {pct:.1f}%",
+    "Fair spread: {pct:.1f}%",
+    "Good spread: {pct:.1f}%",
+    "Strong spread: {pct:.1f}%",
+    "Excellent spread: {pct:.1f}% (${spread:,.0f})",
+)
+_ARV_NOTES = (
+    "Lower value: ${ppsf:.0f}/sqft",
+    "Average value: ${ppsf:.0f}/sqft",
+    "Good value: ${ppsf:.0f}/sqft",
+    "Above average value: ${ppsf:.0f}/sqft",
+    "Premium property: ${ppsf:.0f}/sqft",
+)
+_EQUITY_NOTES = (
+    "Low equity: {equity:.0f}%",
+    "Moderate equity: {equity:.0f}%",
+    "Good equity: {equity:.0f}%",
+    "High equity: {equity:.0f}%",
+)
+
+
+def _tier_note(templates: tuple[str, ...], tier: int, tiers: int, fallback: str, **values) -> str:
+    if len(templates) != tiers:
+        return fallback.format(tier=tier, **values)
+    return templates[tier].format(**values)
+
+
 def calculate_deal_score(
     lead: ProviderLead,
     arv: float,
     mao: float,
     repair_estimate: float,
     asking_price: Optional[float] = None,
+    trace: Optional[ScoringTrace] = None,
+    profile: Optional[ScoringProfile] = None,
 ) -> tuple[float, dict[str, float], list[str]]:
     """
     Calculate overall deal score (0-100) based on multiple factors.
     
-    Scoring components:
+    Scoring components (default weights):
     1. Spread score: How much room between MAO and asking price (50%)
     2. ARV score: ARV relative to neighborhood (30%)
     3. Equity score: Existing equity position (20%)
@@ -237,10 +360,15 @@ def calculate_deal_score(
         mao: Calculated Maximum Allowable Offer
         repair_estimate: Estimated repair costs
         asking_price: Current asking/list price (if available)
+        trace: Records this step when given
+        profile: Tier tables and weights (default: settings profile)
     
     Returns:
         (total_score, score_breakdown, notes)
     """
+    if profile is None:
+        profile = default_scoring_profile()
+
     breakdown = {}
     notes = []
     
@@ -251,24 +379,12 @@ def calculate_deal_score(
         spread_percent = (spread / arv * 100) if arv > 0 else 0
         
         # Score based on spread percentage
-        if spread_percent >= 20:
-            spread_score = 100.0
-            notes.append(f"Excellent spread: {spread_percent:.1f}% (${spread:,.0f})")
-        elif spread_percent >= 15:
-            spread_score = 85.0
-            notes.append(f"Strong spread: {spread_percent:.1f}%")
-        elif spread_percent >= 10:
-            spread_score = 70.0
-            notes.append(f"Good spread: {spread_percent:.1f}%")
-        elif spread_percent >= 5:
-            spread_score = 50.0
-            notes.append(f"Fair spread: {spread_percent:.1f}%")
-        elif spread_percent >= 0:
-            spread_score = 25.0
-            notes.append(f"Tight spread: {spread_percent:.1f}%")
-        else:
-            spread_score = 0.0
-            notes.append(f"Negative spread: {spread_percent:.1f}% - overpriced")
+        tier = profile.spread_tier(spread_percent)
+        spread_score = profile.spread_scores[tier]
+        notes.append(_tier_note(
+            _SPREAD_NOTES, tier, len(profile.spread_scores),
+            "Spread tier {tier}: {pct:.1f}%", pct=spread_percent, spread=spread,
+        ))
     else:
         # No asking price - assume average score
         spread_score = 50.0
@@ -282,21 +398,12 @@ def calculate_deal_score(
     if lead.sqft and lead.sqft > 0:
         price_per_sqft = arv / lead.sqft
         
-        if price_per_sqft >= 200:
-            arv_score = 100.0
-            notes.append(f"Premium property: ${price_per_sqft:.0f}/sqft")
-        elif price_per_sqft >= 150:
-            arv_score = 85.0
-            notes.append(f"Above average value: ${price_per_sqft:.0f}/sqft")
-        elif price_per_sqft >= 100:
-            arv_score = 70.0
-            notes.append(f"Good value: ${price_per_sqft:.0f}/sqft")
-        elif price_per_sqft >= 75:
-            arv_score = 55.0
-            notes.append(f"Average value: ${price_per_sqft:.0f}/sqft")
-        else:
-            arv_score = 40.0
-            notes.append(f"Lower value: ${price_per_sqft:.0f}/sqft")
+        tier = profile.arv_tier(price_per_sqft)
+        arv_score = profile.arv_scores[tier]
+        notes.append(_tier_note(
+            _ARV_NOTES, tier, len(profile.arv_scores),
+            "Value tier {tier}: ${ppsf:.0f}/sqft", ppsf=price_per_sqft,
+        ))
     else:
         arv_score = 60.0
         notes.append("No sqft data for value analysis")
@@ -305,18 +412,12 @@ def calculate_deal_score(
     
     # Component 3: Equity Score
     if lead.equity_percent is not None:
-        if lead.equity_percent >= 50:
-            equity_score = 100.0
-            notes.append(f"High equity: {lead.equity_percent:.0f}%")
-        elif lead.equity_percent >= 30:
-            equity_score = 75.0
-            notes.append(f"Good equity: {lead.equity_percent:.0f}%")
-        elif lead.equity_percent >= 20:
-            equity_score = 50.0
-            notes.append(f"Moderate equity: {lead.equity_percent:.0f}%")
-        else:
-            equity_score = 25.0
-            notes.append(f"Low equity: {lead.equity_percent:.0f}%")
+        tier = profile.equity_tier(lead.equity_percent)
+        equity_score = profile.equity_scores[tier]
+        notes.append(_tier_note(
+            _EQUITY_NOTES, tier, len(profile.equity_scores),
+            "Equity tier {tier}: {equity:.0f}%", equity=lead.equity_percent,
+        ))
     else:
         equity_score = 50.0
         notes.append("No equity data available")
@@ -325,9 +426,9 @@ def calculate_deal_score(
     
     # Calculate weighted total score
     total_score = (
-        spread_score * settings.DEAL_SCORE_SPREAD_WEIGHT +
-        arv_score * settings.DEAL_SCORE_ARV_WEIGHT +
-        equity_score * settings.DEAL_SCORE_EQUITY_WEIGHT
+        spread_score * profile.spread_weight +
+        arv_score * profile.arv_weight +
+        equity_score * profile.equity_weight
     )
     
     # Add bonus points for motivated seller indicators
@@ -338,31 +439,30 @@ def calculate_deal_score(
     # Cap at 100
     total_score = min(total_score, 100.0)
     
-    logger.info(f"Deal score for {lead.address}: {total_score:.1f}/100")
+    if trace is not None:
+        trace.add("score", **breakdown, absentee_bonus=bool(lead.absentee_owner), total=total_score)
     
     return total_score, breakdown, notes
 
 
-def get_recommendation(score: float) -> str:
+def get_recommendation(score: float, profile: Optional[ScoringProfile] = None) -> str:
     """
     Get human-readable recommendation based on deal score.
     """
-    if score >= 80:
-        return "Strong Deal"
-    elif score >= 65:
-        return "Good Deal"
-    elif score >= 50:
-        return "Fair Deal"
-    elif score >= 35:
-        return "Marginal Deal"
-    else:
-        return "Poor Deal"
+    if profile is None:
+        profile = default_scoring_profile()
+    return profile.recommendation(score)
 
 
 def analyze_deal(
     lead: ProviderLead,
     asking_price: Optional[float] = None,
     condition_override: Optional[str] = None,
+    trace: bool = False,
+    profile: Optional[ScoringProfile] = None,
+    comps: Optional["CompsIndex"] = None,
+    arv_override: Optional[float] = None,
+    repair_override: Optional[float] = None,
 ) -> DealAnalysis:
     """
     Perform complete deal analysis on a property lead.
@@ -374,6 +474,13 @@ def analyze_deal(
         lead: Property lead data from provider
         asking_price: Current asking/list price (if known)
         condition_override: Override auto-detected condition
+        trace: Return the structured scoring trace (DealAnalysis.trace, plus
+            "Trace ..." lines at the end of notes)
+        profile: Scoring parameters (default: compiled once from settings)
+        comps: Comparable sales index for the comps ARV method (default: none)
+        arv_override: ARV entered by the user; used instead of calculate_arv when > 0
+        repair_override: Repair estimate entered by the user; used instead of
+            calculate_repair_estimate when not None
     
     Returns:
         DealAnalysis with all calculated metrics
@@ -381,20 +488,39 @@ def analyze_deal(
     Raises:
         ValueError: If insufficient data to perform analysis
     """
+    if profile is None:
+        profile = default_scoring_profile()
+
+    # Trace when asked for, or for a sample of analyses when DEBUG logging is on
+    log_trace = _sample_trace()
+    t = ScoringTrace() if (trace or log_trace) else None
+
     # Calculate ARV
-    arv, arv_method = calculate_arv(lead)
+    if arv_override is not None and arv_override > 0:
+        arv, arv_method = arv_override, "manual"
+        if t is not None:
+            t.add("arv", method="manual", arv=arv)
+    else:
+        arv, arv_method = calculate_arv(lead, trace=t, comps=comps, profile=profile)
     if arv <= 0:
+        if log_trace:
+            logger.debug("Deal scoring trace for %s: %s (insufficient data)", lead.address, t.events)
         raise ValueError(f"Cannot calculate ARV for property: {lead.address}")
     
     # Calculate repair estimate
-    repair_estimate, condition = calculate_repair_estimate(lead, condition_override)
+    if repair_override is not None:
+        repair_estimate, condition = repair_override, "manual"
+        if t is not None:
+            t.add("repair", estimate=repair_estimate, condition="manual")
+    else:
+        repair_estimate, condition = calculate_repair_estimate(lead, condition_override, trace=t, profile=profile)
     
     # Calculate MAO
-    mao = calculate_mao(arv, repair_estimate)
+    mao = calculate_mao(arv, repair_estimate, trace=t, profile=profile)
     
     # Calculate deal score
     deal_score, score_breakdown, notes = calculate_deal_score(
-        lead, arv, mao, repair_estimate, asking_price
+        lead, arv, mao, repair_estimate, asking_price, trace=t, profile=profile
     )
     
     # Calculate spread
@@ -402,11 +528,16 @@ def analyze_deal(
     spread_percent = (spread / arv * 100) if arv > 0 else 0.0
     
     # Get recommendation
-    recommendation = get_recommendation(deal_score)
+    recommendation = get_recommendation(deal_score, profile)
     
     # Add analysis method notes
     notes.insert(0, f"ARV calculated using: {arv_method}")
     notes.insert(1, f"Property condition: {condition}")
+
+    if log_trace:
+        logger.debug("Deal scoring trace for %s: %s", lead.address, t.events)
+    if trace:
+        notes.extend(t.lines())
     
     return DealAnalysis(
         arv=arv,
@@ -419,4 +550,5 @@ def analyze_deal(
         score_breakdown=score_breakdown,
         recommendation=recommendation,
         notes=notes,
+        trace=t.events if trace else None,
     )
@@ -0,0 +1,241 @@
+"""
+Vectorized deal scoring for whole campaigns.
+
+Same rules as app/services/deal_scoring.py, applied to NumPy column arrays
+instead of one ProviderLead at a time. Missing values are NaN. Results match
+analyze_deal() row for row; rows where analyze_deal() would raise (no ARV)
+are flagged in `valid` instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.providers.base import ProviderLead, ProviderLeadBatch
+from app.services.deal_scoring import PropertyCondition
+from app.services.scoring_profile import ScoringProfile, default_scoring_profile
+
+# Inputs analyze_deals_batch reads from each lead
+LEAD_COLUMNS = (
+    "sqft",
+    "year_built",
+    "estimated_value",
+    "assessed_value",
+    "last_sale_price",
+    "equity_percent",
+    "absentee_owner",
+)
+
+_CONDITIONS = np.array(
+    [
+        PropertyCondition.EXCELLENT,
+        PropertyCondition.GOOD,
+        PropertyCondition.AVERAGE,
+        PropertyCondition.FAIR,
+        PropertyCondition.POOR,
+        "unknown",
+    ],
+    dtype=object,
+)
+
+
+@dataclass
+class DealBatchAnalysis:
+    """
+    Column-wise results of analyze_deals_batch (one entry per input row)
+    """
+    arv: np.ndarray
+    arv_method: np.ndarray  # "manual", "avm", "comps", "assessed_value", "last_sale", "insufficient_data"
+    repair_estimate: np.ndarray
+    condition: np.ndarray
+    mao: np.ndarray
+    deal_score: np.ndarray
+
+    estimated_value: np.ndarray  # NaN replaced with 0.0, as in DealAnalysis
+    spread: np.ndarray
+    spread_percent: np.ndarray
+
+    spread_score: np.ndarray
+    arv_score: np.ndarray
+    equity_score: np.ndarray
+    recommendation: np.ndarray
+
+    valid: np.ndarray  # False where ARV could not be calculated
+
+    def __len__(self) -> int:
+        return len(self.arv)
+
+
+def lead_arrays(leads: Iterable[ProviderLead] | ProviderLeadBatch) -> dict[str, np.ndarray]:
+    """Float64 columns for analyze_deals_batch (None -> NaN)."""
+    if isinstance(leads, ProviderLeadBatch):
+        return {name: np.array(leads.column(name), dtype=float) for name in LEAD_COLUMNS}
+
+    leads = list(leads)
+    return {name: np.array([getattr(lead, name) for lead in leads], dtype=float) for name in LEAD_COLUMNS}
+
+
+def _f(values, n: int) -> np.ndarray:
+    if values is None:
+        return np.full(n, np.nan)
+    return np.asarray(values, dtype=float)
+
+
+def _tiers(bounds: tuple[float, ...], scores, values: np.ndarray) -> np.ndarray:
+    """Vectorized ScoringProfile tier lookup (searchsorted 'right' == bisect_right)."""
+    return np.asarray(scores)[np.searchsorted(np.asarray(bounds, dtype=float), values, side="right")]
+
+
+def _truthy(a: np.ndarray) -> np.ndarray:
+    """Python truthiness of an optional number: not None/NaN and not zero."""
+    return ~np.isnan(a) & (a != 0)
+
+
+def analyze_deals_batch(
+    sqft: np.ndarray,
+    year_built: np.ndarray | None = None,
+    estimated_value: np.ndarray | None = None,
+    assessed_value: np.ndarray | None = None,
+    last_sale_price: np.ndarray | None = None,
+    equity_percent: np.ndarray | None = None,
+    absentee_owner: np.ndarray | None = None,
+    asking_price: np.ndarray | None = None,
+    condition_override: Optional[str] = None,
+    profile: Optional[ScoringProfile] = None,
+    comps_arv: np.ndarray | None = None,
+    arv_override: np.ndarray | None = None,
+    repair_override: np.ndarray | None = None,
+) -> DealBatchAnalysis:
+    """
+    Score many properties at once.
+
+    Every argument is a 1-D array of the same length (NaN = missing), e.g.
+    analyze_deals_batch(**lead_arrays(leads), asking_price=prices).
+    condition_override and profile apply to every row, like analyze_deal's.
+    comps_arv is CompsIndex.estimate_many() for the same rows (the comps ARV
+    method); without it rows score as analyze_deal does without comps.
+    arv_override / repair_override are user-entered values (NaN = none), as
+    in analyze_deal.
+    """
+    if profile is None:
+        profile = default_scoring_profile()
+
+    sqft = np.asarray(sqft, dtype=float)
+    n = len(sqft)
+    year_built = _f(year_built, n)
+    estimated_value = _f(estimated_value, n)
+    assessed_value = _f(assessed_value, n)
+    last_sale_price = _f(last_sale_price, n)
+    equity_percent = _f(equity_percent, n)
+    absentee_owner = _truthy(_f(absentee_owner, n))
+    asking_price = _f(asking_price, n)
+    comps_arv = _f(comps_arv, n)
+    arv_override = _f(arv_override, n)
+    repair_override = _f(repair_override, n)
+
+    # ARV (calculate_arv): AVM, comps (swapped with prefer_comps), then assessed * 1.15,
+    # then last sale with 5y at 3%
+    sources = [(estimated_value > 0, estimated_value, "avm"), (comps_arv > 0, comps_arv, "comps")]
+    if profile.prefer_comps:
+        sources.reverse()
+    sources += [
+        (assessed_value > 0, assessed_value * 1.15, "assessed_value"),
+        (last_sale_price > 0, last_sale_price * (1.03 ** 5), "last_sale"),
+    ]
+    conditions = [has for has, _value, _method in sources]
+    arv = np.select(conditions, [value for _has, value, _method in sources], default=0.0)
+    arv_method = np.select(
+        conditions,
+        np.array([method for _has, _value, method in sources], dtype=object),
+        default="insufficient_data",
+    )
+    has_manual_arv = arv_override > 0
+    arv = np.where(has_manual_arv, arv_override, arv)
+    arv_method = np.where(has_manual_arv, "manual", arv_method).astype(object)
+
+    # Condition (estimate_property_condition) as an index into _CONDITIONS
+    has_sqft = sqft > 0
+    if condition_override is None:
+        has_year = _truthy(year_built)
+        age = np.where(has_year, 2024 - np.where(has_year, year_built, 0), 50)
+        cond_idx = np.select([age < 10, age < 30, age < 50], [1, 2, 3], default=4)
+        cond_idx = np.where(~has_year & ~_truthy(last_sale_price), 2, cond_idx)
+        cost_map = np.array([profile.repair_rate(c) for c in _CONDITIONS[:5]])
+        cost_per_sqft = cost_map[cond_idx]
+        condition = _CONDITIONS[np.where(has_sqft, cond_idx, 5)]
+    else:
+        cost_per_sqft = profile.repair_rate(condition_override)
+        condition = np.where(has_sqft, condition_override, "unknown").astype(object)
+
+    # Repairs (calculate_repair_estimate): 15k without sqft, else sqft * rate, floored at 5k
+    repair_estimate = np.where(
+        has_sqft,
+        np.maximum(np.where(has_sqft, sqft, 0) * cost_per_sqft, 5000.0),
+        15000.0,
+    )
+    has_manual_repair = ~np.isnan(repair_override)
+    repair_estimate = np.where(has_manual_repair, repair_override, repair_estimate)
+    condition = np.where(has_manual_repair, "manual", condition).astype(object)
+
+    # MAO (calculate_mao)
+    mao = np.maximum(
+        (arv * profile.mao_multiplier)
+        - repair_estimate
+        - profile.assignment_fee
+        - profile.closing_costs,
+        0.0,
+    )
+
+    valid = arv > 0
+    safe_arv = np.where(valid, arv, 1.0)
+
+    # Spread score (calculate_deal_score component 1)
+    has_asking = asking_price > 0
+    score_spread_pct = np.where(valid, (mao - np.where(has_asking, asking_price, 0)) / safe_arv * 100, 0.0)
+    spread_score = np.where(has_asking, _tiers(profile.spread_bounds, profile.spread_scores, score_spread_pct), 50.0)
+
+    # ARV score (component 2): price per sqft tiers
+    price_per_sqft = arv / np.where(has_sqft, sqft, 1.0)
+    arv_score = np.where(has_sqft, _tiers(profile.arv_bounds, profile.arv_scores, price_per_sqft), 60.0)
+
+    # Equity score (component 3)
+    equity_score = np.where(
+        np.isnan(equity_percent),
+        50.0,
+        _tiers(profile.equity_bounds, profile.equity_scores, equity_percent),
+    )
+
+    deal_score = (
+        spread_score * profile.spread_weight
+        + arv_score * profile.arv_weight
+        + equity_score * profile.equity_weight
+    )
+    deal_score = np.minimum(np.where(absentee_owner, deal_score + 5.0, deal_score), 100.0)
+
+    # Reported spread (analyze_deal): any non-zero asking price counts
+    spread = np.where(_truthy(asking_price), mao - np.nan_to_num(asking_price), 0.0)
+    spread_percent = np.where(valid, spread / safe_arv * 100, 0.0)
+
+    recommendation = _tiers(
+        profile.recommendation_bounds, np.array(profile.recommendations, dtype=object), deal_score
+    )
+
+    return DealBatchAnalysis(
+        arv=arv,
+        arv_method=arv_method,
+        repair_estimate=repair_estimate,
+        condition=condition,
+        mao=mao,
+        deal_score=deal_score,
+        estimated_value=np.nan_to_num(estimated_value),
+        spread=spread,
+        spread_percent=spread_percent,
+        spread_score=spread_score,
+        arv_score=arv_score,
+        equity_score=equity_score,
+        recommendation=recommendation,
+        valid=valid,
+    )
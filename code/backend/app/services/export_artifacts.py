@@ -0,0 +1,251 @@
+"""
+Content-addressed export artifacts.
+
+An export's content depends only on the campaign's name and its lead rows,
+and exported lead columns are never edited in place: leads are only inserted
+or deleted. Campaign.leads_version counts those changes, so
+(campaign, job_type, fingerprint(name, leads_version)) identifies an export's
+content. A finished job with the same key is reused instead of regenerating
+the file, and a request for a key that is already queued or running joins
+that job, whoever requested it: the joining user is subscribed to the job and
+gets their own manifest row for its file when it finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.campaign import Campaign
+from app.models.export_artifact import ExportArtifact
+from app.models.export_job import ExportJob, ExportJobSubscriber
+from app.services.exports import ensure_export_dir, export_variant_dir
+from app.services.periodic_jobs import is_periodic_leader
+from app.utils.file_responses import discard_variants
+
+# Part of every fingerprint: bump when the generated files change format so old artifacts are not reused
+ARTIFACT_FORMAT_VERSION = 1
+
+_HASH_BLOCK = 1 << 20
+
+# Candidate artifacts checked on disk before giving up (older files may have been cleaned up)
+_REUSE_CANDIDATES = 5
+
+logger = logging.getLogger(__name__)
+
+_pruner_task: asyncio.Task | None = None
+
+
+def bump_leads_version(db: Session, campaign_id: int) -> None:
+    """
+    Mark the campaign's lead set as changed. Call in the transaction that
+    inserts or deletes its leads, before the commit.
+    """
+    db.execute(
+        update(Campaign)
+        .where(Campaign.id == campaign_id)
+        .values(leads_version=Campaign.leads_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def campaign_fingerprint(db: Session, campaign_id: int) -> str | None:
+    """Short fingerprint of everything a campaign export contains; None if the campaign is gone."""
+    row = db.query(Campaign.name, Campaign.leads_version).filter(Campaign.id == campaign_id).first()
+    if row is None:
+        return None
+    values = [ARTIFACT_FORMAT_VERSION, campaign_id, row.name, row.leads_version or 0]
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()[:16]
+
+
+def find_artifact(db: Session, campaign_id: int, job_type: str, fingerprint: str | None) -> str | None:
+    """Filename of a finished export with this key that is still on disk."""
+    if fingerprint is None:
+        return None
+    rows = (
+        db.query(ExportJob.result_filename)
+        .filter(
+            ExportJob.campaign_id == campaign_id,
+            ExportJob.job_type == job_type,
+            ExportJob.fingerprint == fingerprint,
+            ExportJob.status == "done",
+            ExportJob.result_filename.isnot(None),
+        )
+        .order_by(ExportJob.id.desc())
+        .limit(_REUSE_CANDIDATES)
+        .all()
+    )
+    export_dir = ensure_export_dir()
+    for (filename,) in rows:
+        if (export_dir / filename).is_file():
+            return filename
+    return None
+
+
+def find_inflight_job(db: Session, campaign_id: int, job_type: str, fingerprint: str | None) -> ExportJob | None:
+    """
+    Any user's queued or running job for this key, if any. The row is locked
+    (PostgreSQL) until the caller commits, so the job cannot finish between
+    the lookup and subscribe_to_job.
+    """
+    if fingerprint is None:
+        return None
+    return (
+        db.query(ExportJob)
+        .filter(
+            ExportJob.campaign_id == campaign_id,
+            ExportJob.job_type == job_type,
+            ExportJob.fingerprint == fingerprint,
+            ExportJob.status.in_(("queued", "running")),
+        )
+        .order_by(ExportJob.id.asc())
+        .with_for_update()
+        .first()
+    )
+
+
+def subscribe_to_job(db: Session, job: ExportJob, user_id: int) -> None:
+    """Have `user_id` (unless they requested it) receive the job's file too (no commit)."""
+    if user_id == job.requested_by_user_id:
+        return
+    exists = (
+        db.query(ExportJobSubscriber.id)
+        .filter(ExportJobSubscriber.job_id == job.id, ExportJobSubscriber.user_id == user_id)
+        .first()
+    )
+    if exists:
+        return
+    try:
+        with db.begin_nested():
+            db.add(ExportJobSubscriber(job_id=job.id, user_id=user_id))
+    except IntegrityError:
+        pass  # subscribed concurrently
+
+
+def job_recipient_ids(db: Session, job: ExportJob) -> list[int]:
+    """The requester, then every subscribed user."""
+    subscribers = (
+        db.query(ExportJobSubscriber.user_id)
+        .filter(ExportJobSubscriber.job_id == job.id)
+        .order_by(ExportJobSubscriber.id.asc())
+        .all()
+    )
+    return [job.requested_by_user_id, *(u for (u,) in subscribers)]
+
+
+def file_checksum(path: Path) -> str:
+    """sha256 hex digest of a file, read in 1 MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def record_export_artifact(
+    db: Session,
+    path: Path,
+    owner_user_id: int,
+    campaign_id: int | None = None,
+    job_type: str | None = None,
+) -> ExportArtifact:
+    """
+    Add the manifest row listing `path` for its owner (no commit). A file that
+    is already recorded (a reused artifact) keeps its size and checksum
+    instead of being read again.
+    """
+    rows = db.query(ExportArtifact).filter(ExportArtifact.filename == path.name).all()
+    for row in rows:
+        if row.owner_user_id == owner_user_id:
+            return row
+
+    if rows:
+        size_bytes, checksum = rows[0].size_bytes, rows[0].checksum
+    else:
+        size_bytes, checksum = path.stat().st_size, file_checksum(path)
+
+    artifact = ExportArtifact(
+        filename=path.name,
+        owner_user_id=owner_user_id,
+        campaign_id=campaign_id,
+        job_type=job_type,
+        size_bytes=size_bytes,
+        checksum=checksum,
+    )
+    try:
+        with db.begin_nested():
+            db.add(artifact)
+    except IntegrityError:
+        # Recorded concurrently by another job reusing the same file
+        return (
+            db.query(ExportArtifact)
+            .filter(ExportArtifact.owner_user_id == owner_user_id, ExportArtifact.filename == path.name)
+            .one()
+        )
+    return artifact
+
+
+def forget_export_file(db: Session, filename: str) -> int:
+    """
+    Delete every manifest row for `filename` (no commit), and its compressed
+    copies. Returns the rows removed.
+    """
+    discard_variants(ensure_export_dir() / filename, export_variant_dir())
+    result = db.execute(delete(ExportArtifact).where(ExportArtifact.filename == filename))
+    return result.rowcount or 0
+
+
+def prune_missing_artifacts(db: Session) -> int:
+    """
+    Remove manifest rows whose file is no longer in EXPORT_DIR (deleted by
+    hand or by a cleanup job), so listings stop offering dead downloads.
+    Returns the rows removed.
+    """
+    export_dir = ensure_export_dir()
+    filenames = [f for (f,) in db.query(ExportArtifact.filename).distinct().all()]
+    removed = 0
+    for filename in filenames:
+        if not (export_dir / filename).is_file():
+            removed += forget_export_file(db, filename)
+    db.commit()
+    if removed:
+        logger.info(f"Pruned {removed} export artifact row(s) for missing files")
+    return removed
+
+
+async def _prune_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.EXPORT_ARTIFACT_PRUNE_SECONDS)
+        if not is_periodic_leader():
+            continue
+        try:
+            await asyncio.to_thread(_prune_once)
+        except Exception:
+            logger.exception("Export artifact pruning failed")
+
+
+def _prune_once() -> None:
+    db = SessionLocal()
+    try:
+        prune_missing_artifacts(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def start_export_artifact_pruner() -> None:
+    """Start the periodic manifest pruning task (once per process; runs while it holds the periodic jobs lease)."""
+    global _pruner_task
+    if _pruner_task is None or _pruner_task.done():
+        _pruner_task = asyncio.get_running_loop().create_task(_prune_loop())
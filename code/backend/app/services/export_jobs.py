@@ -1,14 +1,28 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.db import SessionLocal
 from app.models.export_job import ExportJob
 from app.models.campaign import Campaign
 from app.models.user import User
 from app.services.audit import write_audit_event
-from app.services.exports import export_leads_by_zip
+from app.services.export_artifacts import (
+    campaign_fingerprint,
+    find_artifact,
+    find_inflight_job,
+    job_recipient_ids,
+    record_export_artifact,
+    subscribe_to_job,
+)
+from app.services.exports import ensure_export_dir, export_leads_by_zip
 from app.services.pdf_reports import build_campaign_summary_pdf, build_campaign_leads_pdf
 
 
@@ -18,6 +32,8 @@ JOB_LEADS_PDF = "leads_pdf"
 
 ALLOWED_JOB_TYPES = {JOB_LEADS_BY_ZIP, JOB_SUMMARY_PDF, JOB_LEADS_PDF}
 
+logger = logging.getLogger(__name__)
+
 
 def _actor_info(db: Session, user_id: int):
     u = db.query(User).filter(User.id == user_id).first()
@@ -26,29 +42,221 @@ def _actor_info(db: Session, user_id: int):
     return u.id, getattr(u, "email", None), getattr(u, "role", None)
 
 
+def _stale_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_JOB_STALE_SECONDS)
+
+
+def _stale_running():
+    return (ExportJob.status == "running") & or_(
+        ExportJob.heartbeat_at.is_(None), ExportJob.heartbeat_at < _stale_cutoff()
+    )
+
+
 def create_export_job(db: Session, campaign_id: int, user_id: int, job_type: str) -> ExportJob:
+    """
+    Queue an export, unless its content is already available: a finished
+    artifact with the same fingerprint makes the new job done immediately,
+    and an identical queued/running job (any user's) is joined and returned.
+    Two concurrent first requests can both miss the lookup; the partial
+    unique index uq_export_jobs_inflight rejects the second insert, which
+    then joins the job that won.
+    """
     if job_type not in ALLOWED_JOB_TYPES:
         raise ValueError("Invalid job_type")
 
+    fingerprint = campaign_fingerprint(db, campaign_id)
+    inflight = find_inflight_job(db, campaign_id, job_type, fingerprint)
+    if inflight is not None:
+        subscribe_to_job(db, inflight, user_id)
+        db.commit()
+        return inflight
+
     job = ExportJob(
         campaign_id=campaign_id,
         requested_by_user_id=user_id,
         job_type=job_type,
+        fingerprint=fingerprint,
         status="queued",
         progress_current=0,
         progress_total=0,
     )
+    filename = find_artifact(db, campaign_id, job_type, fingerprint)
+    if filename is not None:
+        now = datetime.now(timezone.utc)
+        job.status = "done"
+        job.result_filename = filename
+        job.progress_current = job.progress_total = 1
+        job.started_at = job.finished_at = now
+        record_export_artifact(db, ensure_export_dir() / filename, user_id, campaign_id, job_type)
     db.add(job)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        inflight = find_inflight_job(db, campaign_id, job_type, fingerprint)
+        if inflight is None:
+            raise
+        subscribe_to_job(db, inflight, user_id)
+        db.commit()
+        return inflight
     db.refresh(job)
     return job
 
 
-def run_export_job(job_id: int) -> None:
+def claim_export_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """
+    Atomically move a queued job to running for `worker_id`, counting the attempt.
+    Returns False if the job is gone or another worker got it first.
+    """
+    now = datetime.now(timezone.utc)
+    result = db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == "queued")
+        .values(
+            status="running",
+            worker_id=worker_id,
+            heartbeat_at=now,
+            started_at=now,
+            error_message=None,
+            attempts=ExportJob.attempts + 1,
+        )
+    )
+    db.commit()
+    return (result.rowcount or 0) == 1
+
+
+def claim_next_export_job(db: Session, worker_id: str) -> int | None:
+    """
+    Claim the oldest queued job for `worker_id`, or return None if the queue is empty.
+
+    On PostgreSQL candidates are read with FOR UPDATE SKIP LOCKED, so parallel
+    workers each lock a different row instead of queueing behind one another.
+    SQLite has no row locks (the clause is dropped); there the conditional
+    UPDATE in claim_export_job is the lock, and a worker that loses the race
+    moves on to the next candidate.
+    """
+    while True:
+        job_id = db.execute(
+            select(ExportJob.id)
+            .where(ExportJob.status == "queued")
+            .order_by(ExportJob.id.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar()
+        if job_id is None:
+            db.commit()
+            return None
+        if claim_export_job(db, job_id, worker_id):
+            return job_id
+
+
+def heartbeat_export_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """Refresh a running job's heartbeat. False means the worker no longer owns it."""
+    result = db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == "running", ExportJob.worker_id == worker_id)
+        .values(heartbeat_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+    return (result.rowcount or 0) == 1
+
+
+def requeue_stale_export_jobs(db: Session) -> list[int]:
+    """
+    Put running jobs whose worker stopped heartbeating (crashed, killed,
+    restarted) back on the queue. A job already claimed EXPORT_JOB_MAX_ATTEMPTS
+    times is failed instead, so one that keeps killing its worker is not
+    retried forever. Returns the requeued job ids.
+    """
+    max_attempts = max(settings.EXPORT_JOB_MAX_ATTEMPTS, 1)
+    rows = db.execute(
+        select(ExportJob.id, ExportJob.attempts, ExportJob.requested_by_user_id, ExportJob.job_type, ExportJob.campaign_id)
+        .where(_stale_running())
+        .with_for_update(skip_locked=True)
+    ).all()
+    requeued = [r.id for r in rows if (r.attempts or 0) < max_attempts]
+    exhausted = [r for r in rows if (r.attempts or 0) >= max_attempts]
+
+    if requeued:
+        db.execute(
+            update(ExportJob)
+            .where(ExportJob.id.in_(requeued), _stale_running())
+            .values(status="queued", worker_id=None, heartbeat_at=None)
+        )
+        logger.warning(f"Requeued {len(requeued)} stale export job(s): {requeued}")
+
+    if exhausted:
+        error = f"Export worker stopped responding on all {max_attempts} attempts"
+        result = db.execute(
+            update(ExportJob)
+            .where(ExportJob.id.in_([r.id for r in exhausted]), _stale_running())
+            .values(status="failed", worker_id=None, heartbeat_at=None, finished_at=datetime.now(timezone.utc), error_message=error)
+        )
+        if result.rowcount:
+            for r in exhausted:
+                actor_user_id, actor_email, actor_role = _actor_info(db, r.requested_by_user_id)
+                write_audit_event(
+                    db,
+                    action="export.job.failed",
+                    status_code=500,
+                    actor_user_id=actor_user_id,
+                    actor_email=actor_email,
+                    actor_role=actor_role,
+                    entity_type="export_job",
+                    entity_id=str(r.id),
+                    meta={"reason": "attempts_exhausted", "attempts": r.attempts, "job_type": r.job_type, "campaign_id": r.campaign_id},
+                )
+        logger.error(f"Failed {len(exhausted)} export job(s) after {max_attempts} attempts: {[r.id for r in exhausted]}")
+    db.commit()
+    return requeued
+
+
+def _record_for_recipients(db: Session, job: ExportJob, path) -> None:
+    """
+    Manifest rows for `path` for the requester and every subscribed user (no
+    commit). Called after _finish_export_job: the job row is then locked, so a
+    user subscribing concurrently is either read here or sees the job done.
+    Recorded even when the job was lost to another worker, as the file is
+    just as valid.
+    """
+    for user_id in job_recipient_ids(db, job):
+        record_export_artifact(db, path, user_id, job.campaign_id, job.job_type)
+
+
+def _finish_export_job(db: Session, job_id: int, worker_id: str, **values) -> bool:
+    """
+    Move the job out of running with `values` (no commit), only while
+    `worker_id` still owns it. False when it was requeued meanwhile (its
+    heartbeat went stale) and possibly claimed by another worker: that
+    worker's result wins and this one is dropped.
+    """
+    result = db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == "running", ExportJob.worker_id == worker_id)
+        .values(finished_at=datetime.now(timezone.utc), **values)
+        .execution_options(synchronize_session=False)
+    )
+    if (result.rowcount or 0) == 1:
+        return True
+    logger.warning(f"Export job {job_id} is no longer owned by {worker_id}; not recording its result")
+    return False
+
+
+def run_export_job(job_id: int, worker_id: str | None = None) -> None:
     """
-    Runs in a background task. Uses its own DB session.
+    Runs in an export worker (or an API background task when EXPORT_JOBS_INLINE
+    is set). Uses its own DB session.
+
+    A worker passes the `worker_id` it claimed the job with; without one the job
+    is claimed here, so a job already taken by a worker is never run twice.
+    The outcome is only written while `worker_id` still owns the job.
     """
     db = SessionLocal()
+    if worker_id is None:
+        worker_id = f"api-{os.getpid()}"
+        if not claim_export_job(db, job_id, worker_id):
+            db.close()
+            return
     try:
         job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
         if not job:
@@ -56,11 +264,6 @@ def run_export_job(job_id: int) -> None:
 
         actor_user_id, actor_email, actor_role = _actor_info(db, job.requested_by_user_id)
 
-        # mark running
-        job.status = "running"
-        job.started_at = datetime.now(timezone.utc)
-        job.error_message = None
-
         write_audit_event(
             db,
             action="export.job.start",
@@ -70,7 +273,7 @@ def run_export_job(job_id: int) -> None:
             actor_role=actor_role,
             entity_type="export_job",
             entity_id=str(job.id),
-            meta={"job_type": job.job_type, "campaign_id": job.campaign_id},
+            meta={"job_type": job.job_type, "campaign_id": job.campaign_id, "attempt": job.attempts},
         )
 
         db.commit()
@@ -78,9 +281,9 @@ def run_export_job(job_id: int) -> None:
         # load campaign
         campaign = db.query(Campaign).filter(Campaign.id == job.campaign_id).first()
         if not campaign:
-            job.status = "failed"
-            job.finished_at = datetime.now(timezone.utc)
-            job.error_message = "Campaign not found"
+            if not _finish_export_job(db, job.id, worker_id, status="failed", error_message="Campaign not found"):
+                db.commit()
+                return
 
             write_audit_event(
                 db,
@@ -97,6 +300,41 @@ def run_export_job(job_id: int) -> None:
             db.commit()
             return
 
+        # Read before any lead data: the artifact then holds at least this version's leads.
+        # An identical job that finished while this one was queued is reused.
+        fingerprint = campaign_fingerprint(db, campaign.id)
+        filename = find_artifact(db, campaign.id, job.job_type, fingerprint)
+        if filename is not None:
+            finished = _finish_export_job(
+                db,
+                job.id,
+                worker_id,
+                status="done",
+                fingerprint=fingerprint,
+                result_filename=filename,
+                progress_current=1,
+                progress_total=1,
+            )
+            _record_for_recipients(db, job, ensure_export_dir() / filename)
+            if not finished:
+                db.commit()
+                return
+
+            write_audit_event(
+                db,
+                action="export.job.done",
+                status_code=200,
+                actor_user_id=actor_user_id,
+                actor_email=actor_email,
+                actor_role=actor_role,
+                entity_type="export_job",
+                entity_id=str(job.id),
+                meta={"job_type": job.job_type, "filename": filename, "campaign_id": campaign.id, "reused": True},
+            )
+
+            db.commit()
+            return
+
         # run
         if job.job_type == JOB_LEADS_BY_ZIP:
             job.progress_total = 1
@@ -104,10 +342,13 @@ def run_export_job(job_id: int) -> None:
 
             zip_path, total = export_leads_by_zip(db=db, campaign_id=campaign.id, campaign_name=campaign.name)
 
-            job.progress_current = 1
-            job.result_filename = zip_path.name
-            job.status = "done"
-            job.finished_at = datetime.now(timezone.utc)
+            finished = _finish_export_job(
+                db, job.id, worker_id, status="done", fingerprint=fingerprint, result_filename=zip_path.name, progress_current=1
+            )
+            _record_for_recipients(db, job, zip_path)
+            if not finished:
+                db.commit()
+                return
 
             write_audit_event(
                 db,
@@ -130,10 +371,13 @@ def run_export_job(job_id: int) -> None:
 
             pdf_path = build_campaign_summary_pdf(db=db, campaign=campaign)
 
-            job.progress_current = 1
-            job.result_filename = pdf_path.name
-            job.status = "done"
-            job.finished_at = datetime.now(timezone.utc)
+            finished = _finish_export_job(
+                db, job.id, worker_id, status="done", fingerprint=fingerprint, result_filename=pdf_path.name, progress_current=1
+            )
+            _record_for_recipients(db, job, pdf_path)
+            if not finished:
+                db.commit()
+                return
 
             write_audit_event(
                 db,
@@ -156,10 +400,13 @@ def run_export_job(job_id: int) -> None:
 
             pdf_path = build_campaign_leads_pdf(db=db, campaign=campaign)
 
-            job.progress_current = 1
-            job.result_filename = pdf_path.name
-            job.status = "done"
-            job.finished_at = datetime.now(timezone.utc)
+            finished = _finish_export_job(
+                db, job.id, worker_id, status="done", fingerprint=fingerprint, result_filename=pdf_path.name, progress_current=1
+            )
+            _record_for_recipients(db, job, pdf_path)
+            if not finished:
+                db.commit()
+                return
 
             write_audit_event(
                 db,
@@ -177,9 +424,9 @@ def run_export_job(job_id: int) -> None:
             return
 
         # should never hit
-        job.status = "failed"
-        job.finished_at = datetime.now(timezone.utc)
-        job.error_message = "Unknown job_type"
+        if not _finish_export_job(db, job.id, worker_id, status="failed", error_message="Unknown job_type"):
+            db.commit()
+            return
 
         write_audit_event(
             db,
@@ -197,14 +444,11 @@ def run_export_job(job_id: int) -> None:
 
     except Exception as e:
         try:
+            db.rollback()
             job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
-            if job:
+            if job and _finish_export_job(db, job.id, worker_id, status="failed", error_message=str(e)):
                 actor_user_id, actor_email, actor_role = _actor_info(db, job.requested_by_user_id)
 
-                job.status = "failed"
-                job.finished_at = datetime.now(timezone.utc)
-                job.error_message = str(e)
-
                 write_audit_event(
                     db,
                     action="export.job.failed",
@@ -1,10 +1,14 @@
 from __future__ import annotations
-import csv, re, zipfile
+import csv, io, re, zipfile
 from datetime import datetime, timezone
+from itertools import groupby
 from pathlib import Path
+from typing import Iterable, Iterator
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models.lead import Lead
+from app.utils.text import sql_strip_blank
 
 SAFE_RE = re.compile(r"[^a-zA-Z0-9._-]+")
 
@@ -18,9 +22,14 @@ def ensure_export_dir() -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
+
+def export_variant_dir() -> Path:
+    """Compressed copies of served exports: a subdirectory, so no download name reaches it."""
+    return ensure_export_dir() / ".encoded"
+
 LEAD_HEADERS = ["id","campaign_id","address","city","state","zip_code","owner_name","phone","created_at"]
 
-def _lead_row(l: Lead) -> list[str]:
+def _lead_row(l) -> list[str]:
     return [
         str(l.id), str(l.campaign_id),
         l.address or "", l.city or "", l.state or "", l.zip_code or "",
@@ -28,30 +37,49 @@ def _lead_row(l: Lead) -> list[str]:
         l.created_at.isoformat() if getattr(l, "created_at", None) else "",
     ]
 
-def _csv_text(rows: list[list[str]]) -> str:
-    from io import StringIO
-    sio = StringIO()
-    writer = csv.writer(sio)
-    writer.writerows(rows)
-    return sio.getvalue()
+# Rows fetched per round trip while streaming an export (memory stays flat per chunk)
+EXPORT_FETCH_CHUNK = 1000
+
+_LEAD_COLUMNS = (Lead.id, Lead.campaign_id, Lead.address, Lead.city, Lead.state, Lead.zip_code, Lead.owner_name, Lead.phone, Lead.created_at)
+
+def _stream_leads(db: Session, campaign_id: int, *order_by, extra=()) -> Iterator:
+    """Lead column rows (plus `extra` columns) in `order_by` order, fetched EXPORT_FETCH_CHUNK at a time."""
+    q = db.query(*_LEAD_COLUMNS, *extra).filter(Lead.campaign_id == campaign_id).order_by(*order_by)
+    return q.execution_options(yield_per=EXPORT_FETCH_CHUNK)
+
+def _write_csv_entry(zf: zipfile.ZipFile, name: str, rows: Iterable) -> int:
+    """Stream rows into a new ZIP entry as CSV; returns the row count (header excluded)."""
+    n = 0
+    with zf.open(name, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LEAD_HEADERS)
+        for l in rows:
+            writer.writerow(_lead_row(l))
+            n += 1
+    return n
 
 def export_leads_by_zip(db: Session, campaign_id: int, campaign_name: str):
+    """
+    Write the campaign's leads as one ZIP: {base}_ALL.csv (by id) plus one CSV per ZIP code.
+
+    Streams in two passes over the leads (by id, then by ZIP group and id), writing
+    rows straight into the archive entries, so memory stays constant however big
+    the campaign is.
+    """
     export_dir = ensure_export_dir()
     ts = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
     base = _safe_name(f"campaign_{campaign_id}_{campaign_name}_{ts}")
     zip_path = export_dir / f"{base}_leads_by_zip.zip"
 
-    leads: list[Lead] = db.query(Lead).filter(Lead.campaign_id == campaign_id).order_by(Lead.id.asc()).all()
-
-    groups: dict[str, list[Lead]] = {}
-    for l in leads:
-        z = (l.zip_code or "").strip() or "unknown"
-        groups.setdefault(z, []).append(l)
+    # Computed once, in SQL, and selected with each row: the ORDER BY and the groupby
+    # key are the same value, so every ZIP arrives as one contiguous, sorted group
+    zip_group = func.coalesce(func.nullif(sql_strip_blank(Lead.zip_code), ""), "unknown").label("zip_group")
 
     total = 0
     with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr(f"{base}_ALL.csv", _csv_text([LEAD_HEADERS] + [_lead_row(l) for l in leads]))
-        for zip_code, items in sorted(groups.items(), key=lambda kv: kv[0]):
-            zf.writestr(_safe_name(f"{base}_ZIP_{zip_code}.csv"), _csv_text([LEAD_HEADERS] + [_lead_row(l) for l in items]))
-            total += len(items)
+        _write_csv_entry(zf, f"{base}_ALL.csv", _stream_leads(db, campaign_id, Lead.id.asc()))
+
+        rows = _stream_leads(db, campaign_id, zip_group.asc(), Lead.id.asc(), extra=(zip_group,))
+        for zip_code, items in groupby(rows, key=lambda l: l.zip_group):
+            total += _write_csv_entry(zf, _safe_name(f"{base}_ZIP_{zip_code}.csv"), items)
     return zip_path, total
@@ -0,0 +1,230 @@
+"""
+Lead table PDF rendering.
+
+The lead report is a fixed-geometry table (LEAD_ROWS_PER_PAGE rows per page),
+so the rows can be cut into page-aligned chunks and rendered independently:
+chunks of PDF_RENDER_CHUNK_PAGES pages go to a process pool as they are read
+from the database, and the chunk PDFs are concatenated in order with pypdf.
+Reports that fit in one chunk render in-process.
+
+The pool is one per process, shared by every caller and capped at
+PDF_RENDER_WORKERS, and each report keeps at most 2 x PDF_RENDER_WORKERS
+chunks in flight, so memory stays bounded by the chunk size however many
+leads (or concurrent reports) there are.
+
+Cells are truncated against measured Helvetica glyph widths (a per-glyph
+table built once from reportlab's font metrics) instead of a character count.
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from pypdf import PdfWriter
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from app.core.config import settings
+
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+ROW_FONT_SIZE = 9
+ELLIPSIS = "…"
+
+# (x, header, column width) in points
+LEAD_COLUMNS = [
+    (72, "Address", 220),
+    (292, "City", 90),
+    (382, "ST", 30),
+    (412, "ZIP", 50),
+    (462, "Owner", 120),
+    (582, "Phone", 110),
+]
+CELL_PADDING = 4
+
+_PAGE_W, _PAGE_H = letter
+_TABLE_TOP = _PAGE_H - 132  # column header baseline
+_FIRST_ROW_Y = _TABLE_TOP - 22
+_ROW_HEIGHT = 12
+_BOTTOM = 72
+
+# Rows drawn at _FIRST_ROW_Y, _FIRST_ROW_Y - 12, ... while y >= _BOTTOM
+LEAD_ROWS_PER_PAGE = int((_FIRST_ROW_Y - _BOTTOM) // _ROW_HEIGHT) + 1
+
+LeadCells = Sequence[str]  # address, city, state, zip, owner, phone
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+@lru_cache
+def _glyph_widths(font: str, size: float) -> tuple[float, ...]:
+    """Advance width of every Latin-1 glyph, measured once per font and size."""
+    return tuple(stringWidth(chr(i), font, size) for i in range(256))
+
+
+def fit_text(s: str, max_width: float, font: str = FONT, size: float = ROW_FONT_SIZE) -> str:
+    """`s` cut (with an ellipsis) to the longest prefix that fits in max_width points."""
+    widths = _glyph_widths(font, size)
+    total = 0.0
+    for i, ch in enumerate(s):
+        o = ord(ch)
+        total += widths[o] if o < 256 else stringWidth(ch, font, size)
+        if total > max_width:
+            break
+    else:
+        return s
+
+    # Doesn't fit: back off until prefix + ellipsis fits
+    budget = max_width - stringWidth(ELLIPSIS, font, size)
+    total = 0.0
+    for i, ch in enumerate(s):
+        o = ord(ch)
+        total += widths[o] if o < 256 else stringWidth(ch, font, size)
+        if total > budget:
+            return s[:i] + ELLIPSIS
+    return s + ELLIPSIS
+
+
+def _page_header(c: canvas.Canvas, title: str, subtitle: str, generated: str) -> None:
+    c.setFont(FONT_BOLD, 14)
+    c.drawString(72, _PAGE_H - 72, title)
+    c.setFont(FONT, 10)
+    c.drawString(72, _PAGE_H - 90, subtitle)
+    c.drawString(72, _PAGE_H - 104, f"Generated: {generated}")
+    c.line(72, _PAGE_H - 112, _PAGE_W - 72, _PAGE_H - 112)
+
+    c.setFont(FONT_BOLD, 9)
+    for x, name, _w in LEAD_COLUMNS:
+        c.drawString(x, _TABLE_TOP, name)
+    c.line(72, _TABLE_TOP - 10, _PAGE_W - 72, _TABLE_TOP - 10)
+
+
+def render_lead_pages(
+    path: str,
+    rows: Sequence[LeadCells],
+    title: str,
+    subtitle: str,
+    generated: str,
+    first_page: bool,
+) -> str:
+    """
+    Render rows as whole table pages into a standalone PDF at `path`.
+    Top-level (picklable) so it can run in a worker process.
+    """
+    c = canvas.Canvas(path, pagesize=letter)
+    cont_title = f"{title} (cont.)"
+    widths = [w - CELL_PADDING for _x, _name, w in LEAD_COLUMNS]
+
+    for start in range(0, max(len(rows), 1), LEAD_ROWS_PER_PAGE):
+        _page_header(c, title if (first_page and start == 0) else cont_title, subtitle, generated)
+        c.setFont(FONT, ROW_FONT_SIZE)
+        y = _FIRST_ROW_Y
+        for cells in rows[start:start + LEAD_ROWS_PER_PAGE]:
+            for (x, _name, _w), width, val in zip(LEAD_COLUMNS, widths, cells):
+                c.drawString(x, y, fit_text(val, width))
+            y -= _ROW_HEIGHT
+        c.showPage()
+
+    c.save()
+    return path
+
+
+def _chunks(rows: Iterable[LeadCells], size: int) -> Iterable[list[LeadCells]]:
+    chunk: list[LeadCells] = []
+    for r in rows:
+        chunk.append(r)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _render_pool() -> tuple[ProcessPoolExecutor, int]:
+    """The process-wide render pool (created on first use), and its size."""
+    global _pool, _pool_workers
+    workers = max(settings.PDF_RENDER_WORKERS, 1)
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn, not fork: the API process has threads (and DB connections) a fork would copy
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool, workers
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next report starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def build_lead_table_pdf(
+    pdf_path: Path,
+    rows: Iterable[LeadCells],
+    title: str,
+    subtitle: str,
+    generated: str,
+) -> Path:
+    """
+    Render a lead table PDF from a (streamed) iterable of row cells.
+
+    The first chunk is held back until a second one exists: a one-chunk report
+    is rendered in this process without touching the pool. Otherwise no more
+    than 2 x PDF_RENDER_WORKERS chunks are in flight: the oldest is waited on
+    before the next one is read from `rows`.
+    """
+    chunk_rows = max(settings.PDF_RENDER_CHUNK_PAGES, 1) * LEAD_ROWS_PER_PAGE
+    chunks = iter(_chunks(rows, chunk_rows))
+    first = next(chunks, [])
+    second = next(chunks, None)
+
+    if second is None:
+        render_lead_pages(str(pdf_path), first, title, subtitle, generated, True)
+        return pdf_path
+
+    pool, workers = _render_pool()
+    max_in_flight = 2 * workers
+
+    with tempfile.TemporaryDirectory(dir=pdf_path.parent, prefix=".render_") as tmp:
+        in_flight: deque[Future] = deque()
+        parts: list[str] = []
+        try:
+            for i, chunk in enumerate(itertools.chain([first, second], chunks)):
+                if len(in_flight) >= max_in_flight:
+                    parts.append(in_flight.popleft().result())
+                in_flight.append(
+                    pool.submit(render_lead_pages, f"{tmp}/{i:06d}.pdf", chunk, title, subtitle, generated, i == 0)
+                )
+            while in_flight:
+                parts.append(in_flight.popleft().result())
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            raise
+        finally:
+            # On failure, stop queued chunks and let running ones finish before tmp is removed
+            for f in in_flight:
+                f.cancel()
+            wait(in_flight)
+
+        writer = PdfWriter()
+        for part in parts:
+            writer.append(part)
+        with open(pdf_path, "wb") as f:
+            writer.write(f)
+    return pdf_path
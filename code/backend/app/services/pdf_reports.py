@@ -1,32 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable
 
 from sqlalchemy.orm import Session
 
 from app.models.campaign import Campaign
 from app.models.lead import Lead
-from app.services.exports import ensure_export_dir, _safe_name
+from app.services.exports import EXPORT_FETCH_CHUNK, ensure_export_dir, _safe_name
+from app.services.pdf_render import build_lead_table_pdf
 
 # PDF generation (pure-python)
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 
 
-@dataclass
-class _Row:
-    address: str
-    city: str
-    state: str
-    zip_code: str
-    owner_name: str
-    phone: str
-
-
 def _now_tag() -> str:
     return datetime.now(tz=timezone.utc).strftime("%Y%m%d_%H%M%S")
 
@@ -86,72 +74,18 @@ def build_campaign_leads_pdf(db: Session, campaign: Campaign) -> Path:
     base = _safe_name(f"campaign_{campaign.id}_{campaign.name}")
     pdf_path = export_dir / f"{base}_LEADS_{_now_tag()}.pdf"
 
-    leads = _campaign_leads(db, campaign.id)
-
-    c = canvas.Canvas(str(pdf_path), pagesize=letter)
-    w, h = letter
-
-    def header(page_title: str):
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(72, h - 72, page_title)
-        c.setFont("Helvetica", 10)
-        c.drawString(72, h - 90, f"Campaign: {campaign.name} (ID: {campaign.id})")
-        c.drawString(72, h - 104, f"Generated: {datetime.now(tz=timezone.utc).isoformat()}")
-        c.line(72, h - 112, w - 72, h - 112)
-
-    header("Passive Pilot — Campaign Leads")
-
-    # Table columns
-    cols = [
-        (72, "Address", 220),
-        (292, "City", 90),
-        (382, "ST", 30),
-        (412, "ZIP", 50),
-        (462, "Owner", 120),
-        (582, "Phone", 110),
-    ]
-
-    y = h - 132
-    c.setFont("Helvetica-Bold", 9)
-    for x, name, _w in cols:
-        c.drawString(x, y, name)
-    y -= 10
-    c.line(72, y, w - 72, y)
-    y -= 12
-
-    c.setFont("Helvetica", 9)
-    for l in leads:
-        row = _Row(
-            address=(l.address or ""),
-            city=(l.city or ""),
-            state=(l.state or ""),
-            zip_code=(l.zip_code or ""),
-            owner_name=(l.owner_name or ""),
-            phone=(l.phone or ""),
-        )
-
-        values = [row.address, row.city, row.state, row.zip_code, row.owner_name, row.phone]
-        # draw with crude truncation
-        for (x, _name, width), val in zip(cols, values):
-            s = str(val)
-            max_chars = max(5, int(width / 5))  # rough
-            if len(s) > max_chars:
-                s = s[: max_chars - 1] + "…"
-            c.drawString(x, y, s)
-
-        y -= 12
-        if y < 72:
-            c.showPage()
-            header("Passive Pilot — Campaign Leads (cont.)")
-            y = h - 132
-            c.setFont("Helvetica-Bold", 9)
-            for x, name, _w in cols:
-                c.drawString(x, y, name)
-            y -= 10
-            c.line(72, y, w - 72, y)
-            y -= 12
-            c.setFont("Helvetica", 9)
-
-    c.showPage()
-    c.save()
-    return pdf_path
+    q = (
+        db.query(Lead.address, Lead.city, Lead.state, Lead.zip_code, Lead.owner_name, Lead.phone)
+        .filter(Lead.campaign_id == campaign.id)
+        .order_by(Lead.id.asc())
+        .execution_options(yield_per=EXPORT_FETCH_CHUNK)
+    )
+    rows = (tuple(str(v or "") for v in r) for r in q)
+
+    return build_lead_table_pdf(
+        pdf_path,
+        rows,
+        title="Passive Pilot — Campaign Leads",
+        subtitle=f"Campaign: {campaign.name} (ID: {campaign.id})",
+        generated=datetime.now(tz=timezone.utc).isoformat(),
+    )
@@ -0,0 +1,73 @@
+"""
+Single-process gate for the periodic jobs.
+
+Every API worker process starts the periodic loops (campaign stats
+reconciler, provider cache purger, export artifact pruner, populate job
+sweeper), but only the process holding the periodic jobs lease does their
+work, so N workers don't repeat it N times and race each other. Each process
+keeps trying to take the lease; when the holder dies, its lease lapses after
+PERIODIC_JOBS_LEASE_SECONDS and another process takes over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.services.app_leases import acquire_lease
+
+logger = logging.getLogger(__name__)
+
+PERIODIC_JOBS_LEASE_KEY = "periodic_jobs_lease"
+
+_owner = f"{os.getpid()}-{uuid4().hex[:12]}"
+# time.monotonic() until which this process holds the lease
+_leader_until = 0.0
+
+# Strong ref so the election task is not garbage collected
+_election_task: asyncio.Task | None = None
+
+
+def is_periodic_leader() -> bool:
+    """True while this process holds the periodic jobs lease."""
+    return time.monotonic() < _leader_until
+
+
+def elect_periodic_leader() -> bool:
+    """Take or renew the lease for this process. True when it holds it."""
+    global _leader_until
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        held = acquire_lease(db, PERIODIC_JOBS_LEASE_KEY, _owner, settings.PERIODIC_JOBS_LEASE_SECONDS)
+    except Exception:
+        db.rollback()
+        held = False
+        logger.exception("Periodic jobs lease election failed")
+    finally:
+        db.close()
+
+    if held and not is_periodic_leader():
+        logger.info(f"Process {_owner} now runs the periodic jobs")
+    # Measured from before the write, so this process gives the lease up before the row expires
+    _leader_until = started + settings.PERIODIC_JOBS_LEASE_SECONDS if held else 0.0
+    return held
+
+
+async def _election_loop() -> None:
+    while True:
+        await asyncio.sleep(max(settings.PERIODIC_JOBS_LEASE_SECONDS / 3, 1))
+        await asyncio.to_thread(elect_periodic_leader)
+
+
+async def start_periodic_leader_election() -> None:
+    """Try for the lease now (before the loops' first tick) and keep renewing it."""
+    global _election_task
+    await asyncio.to_thread(elect_periodic_leader)
+    if _election_task is None or _election_task.done():
+        _election_task = asyncio.get_running_loop().create_task(_election_loop())
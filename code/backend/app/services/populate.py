@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
+from app.core.config import settings
 from app.models.lead import Lead
+from app.providers.merge import merge_provider_leads
 from app.providers.registry import get_provider
 from app.schemas.filters import FilterSpec
+from app.services.campaign_stats import apply_lead_changes, rebuild_campaign_stats
+from app.services.export_artifacts import bump_leads_version
+
+logger = logging.getLogger(__name__)
 
 
 def _norm(s: str | None) -> str:
@@ -17,6 +29,118 @@ def _norm_zip(z: str | None) -> str:
     return (z or "").strip()
 
 
+def _lead_rows(campaign_id: int, leads) -> list[dict]:
+    """Normalize provider leads into insert rows, dropping junk and in-batch duplicates."""
+    rows: list[dict] = []
+    seen: set[tuple[str, str]] = set()
+
+    for pl in leads:
+        address = _norm(getattr(pl, "address", None))
+        zip_code = _norm_zip(getattr(pl, "zip_code", None))
+
+        # Skip empty address (junk)
+        if not address:
+            continue
+
+        key = (address, zip_code)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        rows.append(
+            {
+                "campaign_id": campaign_id,
+                "address": address,
+                "city": _norm(getattr(pl, "city", None)) or None,
+                "state": _norm(getattr(pl, "state", None)) or None,
+                "zip_code": zip_code,  # ✅ store "" not None
+                "owner_name": _norm(getattr(pl, "owner_name", None)) or None,
+                "phone": _norm(getattr(pl, "phone", None)) or None,
+            }
+        )
+    return rows
+
+
+def _existing_keys(db: Session, campaign_id: int, rows: list[dict]) -> set[tuple[str, str]]:
+    """One SELECT for every (address, zip) of this batch already stored in the campaign."""
+    addresses = list({r["address"] for r in rows})
+    if not addresses:
+        return set()
+    found = db.execute(
+        select(Lead.address, Lead.zip_code).where(
+            Lead.campaign_id == campaign_id,
+            Lead.address.in_(addresses),
+        )
+    )
+    return {(a, z or "") for a, z in found}
+
+
+def _store_leads(db: Session, campaign_id: int, leads, commit: bool = True) -> int:
+    """
+    Insert one batch of provider leads with set-based de-dupe. Returns rows created.
+
+    - PostgreSQL: one INSERT ... ON CONFLICT DO NOTHING on uq_leads_campaign_address_zip
+    - SQLite: one prefetch SELECT of existing addresses, then INSERT ... ON CONFLICT DO NOTHING
+    - Other DBs: prefetch, then a plain bulk INSERT
+
+    The created count comes from RETURNING (or rowcount), so rows skipped by a
+    concurrent import are not counted and never roll back the rest of the batch.
+
+    With commit=False the caller commits, e.g. together with a job checkpoint.
+    """
+    rows = _lead_rows(campaign_id, leads)
+    if not rows:
+        return 0
+
+    dialect = db.get_bind().dialect
+
+    if dialect.name != "postgresql":
+        existing = _existing_keys(db, campaign_id, rows)
+        rows = [r for r in rows if (r["address"], r["zip_code"]) not in existing]
+        if not rows:
+            return 0
+
+    if dialect.name == "postgresql":
+        stmt = pg_insert(Lead).on_conflict_do_nothing(index_elements=["campaign_id", "address", "zip_code"])
+    elif dialect.name == "sqlite":
+        stmt = sqlite_insert(Lead).on_conflict_do_nothing()
+    else:
+        stmt = insert(Lead)
+
+    try:
+        if dialect.insert_returning:
+            result = db.execute(stmt.returning(Lead.phone, Lead.owner_name, Lead.zip_code, Lead.status), rows)
+            inserted = result.all()
+            created = len(inserted)
+            apply_lead_changes(db, campaign_id, added=inserted)
+        else:
+            result = db.execute(stmt, rows)
+            created = max(result.rowcount or 0, 0)
+            if created == len(rows):
+                apply_lead_changes(db, campaign_id, added=rows)
+            else:
+                # Can't tell which rows landed; rebuild from the table
+                rebuild_campaign_stats(db, campaign_id)
+        if created:
+            bump_leads_version(db, campaign_id)
+        if commit:
+            db.commit()
+    except IntegrityError:
+        # Only reachable without ON CONFLICT support (race with another import)
+        db.rollback()
+        return 0
+
+    return created
+
+
+async def _fetch_all(provider, zipcode: str | None, limit: int, filters: FilterSpec | None):
+    # Some providers may accept filters; some may not. We try both safely.
+    try:
+        return await provider.fetch_leads(zipcode=zipcode, limit=limit, filters=filters)
+    except TypeError:
+        return await provider.fetch_leads(zipcode=zipcode, limit=limit)
+
+
 async def populate_campaign_from_provider(
     db: Session,
     campaign_id: int,
@@ -30,63 +154,69 @@ async def populate_campaign_from_provider(
     `filters` is our unified filter language (frontend-friendly).
     Provider integrations can optionally use it.
 
-    For now:
-    - Providers are stubbed, but this wiring is correct.
-    - We also add basic de-dupe so imports don't create duplicates.
+    - Paginated providers (iter_pages) are stored page by page, so inserts
+      start while later pages are still in flight.
+    - Each batch is one bulk INSERT ... ON CONFLICT DO NOTHING (see _store_leads).
     - DB UNIQUE index is the final enforcement (handles races).
     """
     provider = get_provider(provider_name)
 
-    # Some providers may accept filters; some may not. We try both safely.
-    try:
-        leads = await provider.fetch_leads(zipcode=zipcode, limit=limit, filters=filters)
-    except TypeError:
-        leads = await provider.fetch_leads(zipcode=zipcode, limit=limit)
+    if hasattr(provider, "iter_pages"):
+        created = 0
+        async for _page, page_leads in provider.iter_pages(zipcode=zipcode, limit=limit, filters=filters):
+            created += _store_leads(db, campaign_id, page_leads)
+        return created
 
-    created = 0
+    leads = await _fetch_all(provider, zipcode, limit, filters)
+    return _store_leads(db, campaign_id, leads)
 
-    for pl in leads:
-        address = _norm(getattr(pl, "address", None))
-        zip_code = _norm_zip(getattr(pl, "zip_code", None))
 
-        # Skip empty address (junk)
-        if not address:
+async def populate_campaign_from_providers(
+    db: Session,
+    campaign_id: int,
+    provider_names: list[str],
+    zipcode: str | None,
+    limit: int,
+    filters: FilterSpec | None = None,
+    deadline_seconds: float | None = None,
+) -> tuple[int, list[str], list[str]]:
+    """
+    Query several providers concurrently and store their merged leads.
+    Returns (created, providers_used, providers_failed).
+
+    - Unconfigured providers are skipped (reported as failed).
+    - Every provider shares one deadline (POPULATE_PROVIDER_DEADLINE_SECONDS); a
+      provider that errors or runs past it is dropped, the rest are still stored.
+    - Leads merge by normalized address + zip, richest field values winning
+      (see providers/merge.py); provider_names order is the tie-break priority.
+    """
+    deadline = settings.POPULATE_PROVIDER_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+
+    providers = []
+    failed: list[str] = []
+    for name in provider_names:
+        provider = get_provider(name)
+        ok, missing = provider.configured()
+        if not ok:
+            logger.warning(f"Skipping {name} provider, not configured. Missing: {missing}")
+            failed.append(name)
             continue
-
-        # Basic de-dupe: same campaign + same address + same zip
-        # (DB UNIQUE index is still required for race conditions)
-        exists = (
-            db.query(Lead)
-            .filter(
-                and_(
-                    Lead.campaign_id == campaign_id,
-                    Lead.address == address,
-                    Lead.zip_code == zip_code,
-                )
-            )
-            .first()
-        )
-        if exists:
+        providers.append((name, provider))
+
+    results = await asyncio.gather(
+        *(asyncio.wait_for(_fetch_all(p, zipcode, limit, filters), timeout=deadline) for _name, p in providers),
+        return_exceptions=True,
+    )
+
+    batches = []
+    used: list[str] = []
+    for (name, _p), result in zip(providers, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"{name} provider dropped from populate: {result!r}")
+            failed.append(name)
             continue
+        used.append(name)
+        batches.append(result)
 
-        db.add(
-            Lead(
-                campaign_id=campaign_id,
-                address=address,
-                city=_norm(getattr(pl, "city", None)) or None,
-                state=_norm(getattr(pl, "state", None)) or None,
-                zip_code=zip_code,  # ✅ store "" not None
-                owner_name=_norm(getattr(pl, "owner_name", None)) or None,
-                phone=_norm(getattr(pl, "phone", None)) or None,
-            )
-        )
-        created += 1
-
-    if created:
-        try:
-            db.commit()
-        except Exception:
-            # If a race condition hits the DB UNIQUE index, rollback safely
-            db.rollback()
-
-    return created
+    leads = merge_provider_leads(batches)[:limit]
+    return _store_leads(db, campaign_id, leads), used, failed
@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.campaign import Campaign
+from app.models.populate_job import PopulateJob
+from app.models.user import User
+from app.providers.registry import get_provider
+from app.schemas.filters import FilterSpec
+from app.services.audit import write_audit_event
+from app.services.filters_store import dump_filter_spec, parse_filter_spec
+from app.services.populate import _store_leads
+from app.services.periodic_jobs import is_periodic_leader
+
+logger = logging.getLogger(__name__)
+
+# Strong refs so scheduled jobs are not garbage collected mid-run, keyed by job
+# id so a job never gets a second task in the same process
+_job_tasks: dict[int, asyncio.Task] = {}
+
+_sweeper_task: asyncio.Task | None = None
+
+
+def _actor_info(db: Session, user_id: int):
+    u = db.query(User).filter(User.id == user_id).first()
+    if not u:
+        return user_id, None, None
+    return u.id, getattr(u, "email", None), getattr(u, "role", None)
+
+
+def _stale_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.POPULATE_JOB_STALE_SECONDS)
+
+
+def is_stale_running(job: PopulateJob) -> bool:
+    """A running job whose worker stopped heartbeating (died or was restarted)."""
+    if job.status != "running":
+        return False
+    heartbeat = job.heartbeat_at
+    if heartbeat is None:
+        return True
+    if heartbeat.tzinfo is None:
+        heartbeat = heartbeat.replace(tzinfo=timezone.utc)
+    return heartbeat < _stale_cutoff()
+
+
+def create_populate_job(
+    db: Session,
+    campaign_id: int,
+    user_id: int,
+    provider: str,
+    zipcode: str | None,
+    limit: int,
+    filters: FilterSpec | None = None,
+) -> PopulateJob:
+    job = PopulateJob(
+        campaign_id=campaign_id,
+        requested_by_user_id=user_id,
+        provider=provider,
+        zipcode=zipcode,
+        lead_limit=limit,
+        filter_spec_json=dump_filter_spec(filters) if filters else None,
+        status="queued",
+        progress_current=0,
+        progress_total=limit,
+        created_leads=0,
+        last_page=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def new_worker_id() -> str:
+    """Token for one run of a job: claims, heartbeats and the outcome are tied to it."""
+    return f"{os.getpid()}-{uuid.uuid4().hex}"
+
+
+def _owned_by(job_id: int, worker_id: str):
+    return (PopulateJob.id == job_id) & (PopulateJob.status == "running") & (PopulateJob.worker_id == worker_id)
+
+
+def claim_populate_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """
+    Atomically move a job to running for `worker_id`. Returns False if another
+    worker owns it.
+
+    Queued jobs can always be claimed; running jobs only once their heartbeat
+    is older than POPULATE_JOB_STALE_SECONDS (the worker that owned them died).
+    started_at keeps the time of the first claim.
+    """
+    now = datetime.now(timezone.utc)
+    result = db.execute(
+        update(PopulateJob)
+        .where(
+            PopulateJob.id == job_id,
+            or_(
+                PopulateJob.status == "queued",
+                (PopulateJob.status == "running")
+                & or_(PopulateJob.heartbeat_at.is_(None), PopulateJob.heartbeat_at < _stale_cutoff()),
+            ),
+        )
+        .values(
+            status="running",
+            worker_id=worker_id,
+            heartbeat_at=now,
+            started_at=func.coalesce(PopulateJob.started_at, now),
+            error_message=None,
+        )
+    )
+    db.commit()
+    return (result.rowcount or 0) == 1
+
+
+def heartbeat_populate_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """Refresh a running job's heartbeat. False means `worker_id` no longer owns it."""
+    result = db.execute(
+        update(PopulateJob).where(_owned_by(job_id, worker_id)).values(heartbeat_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+    return (result.rowcount or 0) == 1
+
+
+def _finish_populate_job(db: Session, job_id: int, worker_id: str, **values) -> bool:
+    """
+    Move the job out of running with `values` (no commit), only while
+    `worker_id` still owns it. False when another worker took it over.
+    """
+    result = db.execute(
+        update(PopulateJob)
+        .where(_owned_by(job_id, worker_id))
+        .values(finished_at=datetime.now(timezone.utc), **values)
+        .execution_options(synchronize_session=False)
+    )
+    if (result.rowcount or 0) == 1:
+        return True
+    logger.warning(f"Populate job {job_id} is no longer owned by {worker_id}; not recording its outcome")
+    return False
+
+
+def _fail(db: Session, job: PopulateJob, worker_id: str, reason: str, error: str) -> None:
+    if not _finish_populate_job(db, job.id, worker_id, status="failed", error_message=error):
+        db.rollback()
+        return
+
+    actor_user_id, actor_email, actor_role = _actor_info(db, job.requested_by_user_id)
+
+    write_audit_event(
+        db,
+        action="populate.job.failed",
+        status_code=500,
+        actor_user_id=actor_user_id,
+        actor_email=actor_email,
+        actor_role=actor_role,
+        entity_type="populate_job",
+        entity_id=str(job.id),
+        meta={"reason": reason, "error": error, "provider": job.provider, "campaign_id": job.campaign_id},
+    )
+
+    db.commit()
+
+
+def _heartbeat_once(job_id: int, worker_id: str) -> bool:
+    db = SessionLocal()
+    try:
+        return heartbeat_populate_job(db, job_id, worker_id)
+    finally:
+        db.close()
+
+
+async def _heartbeat(job_id: int, worker_id: str, lost: asyncio.Event) -> None:
+    """
+    Refresh the job's heartbeat every POPULATE_JOB_HEARTBEAT_SECONDS until
+    cancelled, independently of page progress (one page can take minutes of
+    provider retries). Sets `lost` once another worker has taken the job.
+    """
+    while True:
+        await asyncio.sleep(settings.POPULATE_JOB_HEARTBEAT_SECONDS)
+        try:
+            owned = await asyncio.to_thread(_heartbeat_once, job_id, worker_id)
+        except Exception:
+            logger.exception(f"Heartbeat for populate job {job_id} failed")
+            continue
+        if not owned:
+            lost.set()
+            return
+
+
+def _begin(db: Session, job_id: int, worker_id: str) -> PopulateJob | None:
+    """
+    Claim the job for this run and audit its start. Returns the job detached
+    from the session (its columns stay readable without a query), or None when
+    there is nothing for this run to do.
+    """
+    if not claim_populate_job(db, job_id, worker_id):
+        return None
+
+    job = db.query(PopulateJob).filter(PopulateJob.id == job_id).first()
+    if not job:
+        return None
+
+    actor_user_id, actor_email, actor_role = _actor_info(db, job.requested_by_user_id)
+
+    write_audit_event(
+        db,
+        action="populate.job.start",
+        status_code=200,
+        actor_user_id=actor_user_id,
+        actor_email=actor_email,
+        actor_role=actor_role,
+        entity_type="populate_job",
+        entity_id=str(job.id),
+        meta={"provider": job.provider, "campaign_id": job.campaign_id, "resume_from_page": job.last_page + 1},
+    )
+
+    db.commit()
+
+    campaign = db.query(Campaign).filter(Campaign.id == job.campaign_id).first()
+    if not campaign:
+        _fail(db, job, worker_id, "campaign_not_found", "Campaign not found")
+        return None
+
+    db.refresh(job)
+    db.expunge(job)
+    return job
+
+
+def _store_page(db: Session, job: PopulateJob, worker_id: str, leads, last_page: int, progress_current: int) -> bool:
+    """
+    Store a page of leads and the job's checkpoint in one commit, only while
+    `worker_id` owns the job; otherwise roll both back and return False.
+    """
+    created = _store_leads(db, job.campaign_id, leads, commit=False)
+    result = db.execute(
+        update(PopulateJob)
+        .where(_owned_by(job.id, worker_id))
+        .values(
+            created_leads=PopulateJob.created_leads + created,
+            last_page=last_page,
+            progress_current=progress_current,
+            heartbeat_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if (result.rowcount or 0) != 1:
+        db.rollback()
+        return False
+    db.commit()
+    return True
+
+
+def _complete(db: Session, job: PopulateJob, worker_id: str) -> None:
+    if not _finish_populate_job(db, job.id, worker_id, status="done"):
+        db.rollback()
+        return
+
+    created_leads = db.query(PopulateJob.created_leads).filter(PopulateJob.id == job.id).scalar()
+    actor_user_id, actor_email, actor_role = _actor_info(db, job.requested_by_user_id)
+
+    write_audit_event(
+        db,
+        action="populate.job.done",
+        status_code=200,
+        actor_user_id=actor_user_id,
+        actor_email=actor_email,
+        actor_role=actor_role,
+        entity_type="populate_job",
+        entity_id=str(job.id),
+        meta={"provider": job.provider, "campaign_id": job.campaign_id, "created_leads": created_leads},
+    )
+
+    db.commit()
+
+
+def _fail_after_error(db: Session, job_id: int, worker_id: str, error: str) -> None:
+    db.rollback()
+    job = db.query(PopulateJob).filter(PopulateJob.id == job_id).first()
+    if job:
+        _fail(db, job, worker_id, "exception", error)
+
+
+async def run_populate_job(job_id: int) -> None:
+    """
+    Runs in a background task. Uses its own DB session, and runs every DB
+    step in a worker thread so stores and commits never block the event loop.
+
+    The run claims the job under a fresh worker token and a separate task
+    keeps its heartbeat fresh while pages are fetched. Checkpoints and the
+    final status are only written while that token still owns the job: a run
+    whose job was taken over (after a stall) stops without touching it.
+
+    Each provider page is stored and checkpointed in one commit. `last_page` only
+    advances over a contiguous run of stored pages (pages can finish out of
+    order), so a resume from last_page + 1 never skips a page; pages refetched
+    on resume are de-duped by _store_leads and do not inflate created_leads.
+    A page the provider fails to fetch raises (ProviderError) and fails the job
+    with the checkpoint still before that page.
+    """
+    worker_id = new_worker_id()
+    db = SessionLocal()
+    heartbeat: asyncio.Task | None = None
+    try:
+        job = await asyncio.to_thread(_begin, db, job_id, worker_id)
+        if job is None:
+            return
+
+        lost = asyncio.Event()
+        heartbeat = asyncio.create_task(_heartbeat(job_id, worker_id, lost))
+
+        filters = parse_filter_spec(job.filter_spec_json) if job.filter_spec_json else None
+        provider = get_provider(job.provider)
+
+        if hasattr(provider, "iter_pages"):
+            last_page, progress = job.last_page, job.progress_current or 0
+            # page -> leads received, for pages stored ahead of the checkpoint
+            pending: dict[int, int] = {}
+            async for page, page_leads in provider.iter_pages(
+                zipcode=job.zipcode,
+                limit=job.lead_limit,
+                filters=filters,
+                start_page=job.last_page + 1,
+            ):
+                pending[page] = len(page_leads)
+                while last_page + 1 in pending:
+                    last_page += 1
+                    progress += pending.pop(last_page)
+
+                stored = await asyncio.to_thread(_store_page, db, job, worker_id, page_leads, last_page, progress)
+                if not stored or lost.is_set():
+                    logger.warning(f"Populate job {job_id} was taken over; stopping run {worker_id}")
+                    return
+        else:
+            try:
+                leads = await provider.fetch_leads(zipcode=job.zipcode, limit=job.lead_limit, filters=filters)
+            except TypeError:
+                leads = await provider.fetch_leads(zipcode=job.zipcode, limit=job.lead_limit)
+
+            if not await asyncio.to_thread(_store_page, db, job, worker_id, leads, 1, len(leads)):
+                logger.warning(f"Populate job {job_id} was taken over; stopping run {worker_id}")
+                return
+
+        await asyncio.to_thread(_complete, db, job, worker_id)
+
+    except Exception as e:
+        try:
+            await asyncio.to_thread(_fail_after_error, db, job_id, worker_id, str(e))
+        except Exception:
+            pass
+    finally:
+        if heartbeat is not None:
+            heartbeat.cancel()
+        db.close()
+
+
+def schedule_populate_job(job_id: int) -> asyncio.Task:
+    """
+    Run a populate job on the current event loop without awaiting it.
+    Returns the existing task when this process is already running the job.
+    """
+    task = _job_tasks.get(job_id)
+    if task is not None and not task.done():
+        return task
+    task = asyncio.create_task(run_populate_job(job_id))
+    _job_tasks[job_id] = task
+
+    def _forget(t: asyncio.Task) -> None:
+        if _job_tasks.get(job_id) is t:
+            del _job_tasks[job_id]
+
+    task.add_done_callback(_forget)
+    return task
+
+
+def resumable_populate_job_ids(db: Session) -> list[int]:
+    """Queued jobs, plus running jobs whose worker stopped heartbeating."""
+    rows = (
+        db.query(PopulateJob.id)
+        .filter(
+            or_(
+                PopulateJob.status == "queued",
+                (PopulateJob.status == "running")
+                & or_(PopulateJob.heartbeat_at.is_(None), PopulateJob.heartbeat_at < _stale_cutoff()),
+            )
+        )
+        .order_by(PopulateJob.id.asc())
+        .all()
+    )
+    return [r[0] for r in rows]
+
+
+def _resumable_job_ids() -> list[int]:
+    db = SessionLocal()
+    try:
+        return resumable_populate_job_ids(db)
+    finally:
+        db.close()
+
+
+def _schedule_resumed(job_ids: list[int]) -> list[int]:
+    job_ids = [j for j in job_ids if j not in _job_tasks]
+    for job_id in job_ids:
+        schedule_populate_job(job_id)
+
+    if job_ids:
+        logger.info(f"Resuming {len(job_ids)} populate job(s): {job_ids}")
+    return job_ids
+
+
+def resume_populate_jobs() -> list[int]:
+    """
+    Re-schedule jobs interrupted by a worker restart. Each one continues from
+    its checkpointed page; claim_populate_job keeps two workers from picking
+    up the same job.
+    """
+    return _schedule_resumed(_resumable_job_ids())
+
+
+async def _sweep_loop() -> None:
+    while True:
+        if is_periodic_leader():
+            try:
+                _schedule_resumed(await asyncio.to_thread(_resumable_job_ids))
+            except Exception:
+                logger.exception("Populate job sweep failed")
+        await asyncio.sleep(settings.POPULATE_JOB_SWEEP_SECONDS)
+
+
+def start_populate_job_sweeper() -> None:
+    """
+    Resume interrupted jobs now and keep sweeping: a job whose heartbeat was
+    still fresh at startup is picked up once it goes stale. Only the process
+    holding the periodic jobs lease sweeps.
+    """
+    global _sweeper_task
+    if _sweeper_task is None or _sweeper_task.done():
+        _sweeper_task = asyncio.get_running_loop().create_task(_sweep_loop())
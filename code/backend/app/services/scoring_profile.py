@@ -0,0 +1,139 @@
+"""
+Scoring profiles for the deal scoring engine.
+
+A ScoringProfile is every number analyze_deal depends on (MAO formula, repair
+rates, ARV source order, component weights and tier thresholds), resolved from settings once
+and frozen. Pass one to analyze_deal / analyze_deals_batch to score with
+different assumptions (per user, per market, what-if runs) without touching
+settings; profiles are hashable, so they can be cached and used as dict keys.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field, replace
+from functools import lru_cache
+
+from app.core.settings import get_settings
+
+
+@dataclass(frozen=True, slots=True)
+class ScoringProfile:
+    """
+    Immutable scoring parameters.
+
+    Tier tables are ascending lower bounds plus one score per tier:
+    `*_scores[bisect_right(*_bounds, value)]` is the score for `value`,
+    i.e. a value >= bounds[i] (and < bounds[i + 1]) lands in tier i + 1.
+    """
+    name: str = "default"
+
+    # MAO = ARV * mao_multiplier - repairs - assignment_fee - closing_costs
+    mao_multiplier: float = 0.70
+    assignment_fee: float = 5000.0
+    closing_costs: float = 3000.0
+
+    # Repair $/sqft by condition (excellent, good, average, fair, poor)
+    repair_cost_per_sqft: tuple[tuple[str, float], ...] = (
+        ("excellent", 0.0),
+        ("good", 10.0),
+        ("average", 25.0),
+        ("fair", 40.0),
+        ("poor", 60.0),
+    )
+    repair_cost_default: float = 30.0  # unknown condition override
+
+    # ARV source order: comps before the AVM when set (see calculate_arv)
+    prefer_comps: bool = False
+
+    # Component weights
+    spread_weight: float = 0.5
+    arv_weight: float = 0.3
+    equity_weight: float = 0.2
+
+    # Spread % of ARV (MAO - asking)
+    spread_bounds: tuple[float, ...] = (0.0, 5.0, 10.0, 15.0, 20.0)
+    spread_scores: tuple[float, ...] = (0.0, 25.0, 50.0, 70.0, 85.0, 100.0)
+
+    # ARV per sqft
+    arv_bounds: tuple[float, ...] = (75.0, 100.0, 150.0, 200.0)
+    arv_scores: tuple[float, ...] = (40.0, 55.0, 70.0, 85.0, 100.0)
+
+    # Equity %
+    equity_bounds: tuple[float, ...] = (20.0, 30.0, 50.0)
+    equity_scores: tuple[float, ...] = (25.0, 50.0, 75.0, 100.0)
+
+    # Total score -> recommendation
+    recommendation_bounds: tuple[float, ...] = (35.0, 50.0, 65.0, 80.0)
+    recommendations: tuple[str, ...] = ("Poor Deal", "Marginal Deal", "Fair Deal", "Good Deal", "Strong Deal")
+
+    # Short content hash; changes whenever any parameter does
+    version: str = field(default="", compare=False)
+
+    def __post_init__(self):
+        for bounds, scores in (
+            (self.spread_bounds, self.spread_scores),
+            (self.arv_bounds, self.arv_scores),
+            (self.equity_bounds, self.equity_scores),
+            (self.recommendation_bounds, self.recommendations),
+        ):
+            if list(bounds) != sorted(bounds) or len(scores) != len(bounds) + 1:
+                raise ValueError("Tier bounds must be ascending with one more score than bounds")
+
+        params = asdict(self)
+        params.pop("version")
+        params.pop("name")
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        object.__setattr__(self, "version", digest)
+
+    def repair_rate(self, condition: str) -> float:
+        for name, rate in self.repair_cost_per_sqft:
+            if name == condition:
+                return rate
+        return self.repair_cost_default
+
+    def spread_tier(self, spread_percent: float) -> int:
+        return bisect_right(self.spread_bounds, spread_percent)
+
+    def arv_tier(self, price_per_sqft: float) -> int:
+        return bisect_right(self.arv_bounds, price_per_sqft)
+
+    def equity_tier(self, equity_percent: float) -> int:
+        return bisect_right(self.equity_bounds, equity_percent)
+
+    def recommendation(self, score: float) -> str:
+        return self.recommendations[bisect_right(self.recommendation_bounds, score)]
+
+    def with_overrides(self, **changes) -> "ScoringProfile":
+        """A new profile with some parameters changed (version is recomputed)."""
+        return replace(self, **changes)
+
+
+def profile_from_settings(name: str = "default") -> ScoringProfile:
+    s = get_settings()
+    return ScoringProfile(
+        name=name,
+        mao_multiplier=s.MAO_MULTIPLIER,
+        assignment_fee=s.DEFAULT_ASSIGNMENT_FEE,
+        closing_costs=s.DEFAULT_CLOSING_COST_BUFFER,
+        repair_cost_per_sqft=(
+            ("excellent", s.REPAIR_COST_PER_SQFT_EXCELLENT),
+            ("good", s.REPAIR_COST_PER_SQFT_GOOD),
+            ("average", s.REPAIR_COST_PER_SQFT_AVERAGE),
+            ("fair", s.REPAIR_COST_PER_SQFT_FAIR),
+            ("poor", s.REPAIR_COST_PER_SQFT_POOR),
+        ),
+        repair_cost_default=s.REPAIR_COST_DEFAULT_MULTIPLIER,
+        prefer_comps=s.ARV_PREFER_COMPS,
+        spread_weight=s.DEAL_SCORE_SPREAD_WEIGHT,
+        arv_weight=s.DEAL_SCORE_ARV_WEIGHT,
+        equity_weight=s.DEAL_SCORE_EQUITY_WEIGHT,
+    )
+
+
+@lru_cache
+def default_scoring_profile() -> ScoringProfile:
+    """The settings-derived profile, compiled once per process."""
+    return profile_from_settings()
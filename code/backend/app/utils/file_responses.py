@@ -0,0 +1,248 @@
+"""
+Conditional, resumable file downloads.
+
+Starlette's FileResponse always sends the whole file. `file_response` adds
+the HTTP caching/resume semantics on top of it:
+
+- ETag / If-None-Match -> 304 Not Modified
+- Range (a single byte range) -> 206 Partial Content, 416 when unsatisfiable
+- If-Range -> the range is only honoured while the validator still matches
+
+Bodies go out with the ASGI zero-copy (sendfile) extension when the server
+offers it, and in chunks read off a worker thread otherwise.
+
+`precompressed` keeps gzip (and, when the optional brotli package is
+installed, br) copies of text files in a separate cache directory so they can
+be served with a Content-Encoding without compressing on every request;
+`discard_variants` removes them with their source.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import tempfile
+from email.utils import formatdate
+from pathlib import Path
+from typing import Mapping
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+_BLOCK = 1 << 20
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Inclusive (start, end) of a single "bytes=" range, clamped to the file.
+    None when there is no usable range (absent, other unit, multiple ranges:
+    the whole file is sent). Raises RangeNotSatisfiable for ranges past the end
+    (any range of an empty file).
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            n = int(last)
+            if n <= 0 or size == 0:
+                raise RangeNotSatisfiable
+            return max(size - n, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable
+    if start < 0 or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if if_none_match.strip() == "*":
+        return True
+    return _strip_weak(etag) in {_strip_weak(t) for t in if_none_match.split(",")}
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse that sends only bytes [start, end] of the file."""
+
+    def __init__(self, path: str | os.PathLike[str], start: int, end: int, **kwargs) -> None:
+        super().__init__(path, **kwargs)
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        count = self.end - self.start + 1
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f.fileno(), "offset": self.start, "count": count})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank under us; close the body rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_response(
+    request: Request,
+    path: Path,
+    *,
+    etag: str,
+    media_type: str,
+    filename: str,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """
+    Serve `path` honouring If-None-Match, Range and If-Range. `etag` is the
+    quoted entity tag of the bytes at `path`; only a strong one (no W/ prefix)
+    validates If-Range.
+    """
+    st = path.stat()
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    base_headers = {
+        **(headers or {}),
+        "etag": etag,
+        "last-modified": last_modified,
+        "accept-ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=base_headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or (if_range.strip() == etag and not etag.startswith("W/")) or if_range.strip() == last_modified:
+        try:
+            byte_range = parse_range(request.headers.get("range"), st.st_size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**base_headers, "content-range": f"bytes */{st.st_size}"})
+
+    if byte_range is None:
+        return FileResponse(path, headers=base_headers, media_type=media_type, filename=filename, stat_result=st)
+
+    start, end = byte_range
+    return RangeFileResponse(
+        path,
+        start,
+        end,
+        status_code=206,
+        headers={
+            **base_headers,
+            "content-range": f"bytes {start}-{end}/{st.st_size}",
+            "content-length": str(end - start + 1),
+        },
+        media_type=media_type,
+        filename=filename,
+    )
+
+
+def _accepted_encodings(accept_encoding: str | None) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def _write_variant(src: Path, dst: Path, encoding: str) -> None:
+    # Written to a temp file and renamed so concurrent requests never see a partial copy
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}.")
+    try:
+        with os.fdopen(fd, "wb") as raw, open(src, "rb") as f:
+            if encoding == "br":
+                c = brotli.Compressor(quality=5)
+                for block in iter(lambda: f.read(_BLOCK), b""):
+                    raw.write(c.process(block))
+                raw.write(c.finish())
+            else:
+                # mtime=0, no name: the same input always gives the same bytes (stable ETag)
+                with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz:
+                    shutil.copyfileobj(f, gz, _BLOCK)
+        os.replace(tmp, dst)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def precompressed(path: Path, accept_encoding: str | None, cache_dir: Path) -> tuple[Path, str] | None:
+    """
+    (compressed copy, encoding) of `path` for the best encoding the client
+    accepts (br, then gzip), creating the copy in `cache_dir` on first use;
+    None to send the file as is. Keep `cache_dir` out of the directory files
+    are served from, so the copies are never served (or listed) on their own.
+    """
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for encoding, suffix in _VARIANTS:
+        if (encoding == "br" and brotli is None) or accepted.get(encoding, wildcard) <= 0:
+            continue
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        variant = cache_dir / (path.name + suffix)
+        try:
+            fresh = variant.stat().st_mtime >= path.stat().st_mtime
+        except FileNotFoundError:
+            fresh = False
+        if not fresh:
+            _write_variant(path, variant, encoding)
+        return variant, encoding
+    return None
+
+
+def discard_variants(path: Path, cache_dir: Path) -> None:
+    """Delete the compressed copies of `path` (the source is gone or replaced)."""
+    for _encoding, suffix in _VARIANTS:
+        (cache_dir / (path.name + suffix)).unlink(missing_ok=True)
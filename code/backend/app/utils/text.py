@@ -0,0 +1,25 @@
+"""
+Blank-field normalization shared by Python and SQL.
+
+str.strip() removes any whitespace, SQL TRIM() only spaces. Lead fields are
+stripped of the same characters on both sides, so a score, summary or ZIP
+group computed in SQL matches the one computed in Python for the same row.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import func
+
+# Characters stripped from both ends of a field before it counts as blank
+BLANK_CHARS = " \t\n\r\f\v"
+
+
+def strip_blank(value: Any) -> str:
+    """`value` as a string with BLANK_CHARS trimmed ("" for None)."""
+    return str(value).strip(BLANK_CHARS) if value is not None else ""
+
+
+def sql_strip_blank(col):
+    """SQL strip_blank (NULL stays NULL); TRIM(x, chars) works on SQLite and Postgres."""
+    return func.trim(col, BLANK_CHARS)
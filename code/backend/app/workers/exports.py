@@ -0,0 +1,156 @@
+"""
+Export worker: runs queued export jobs outside the API process.
+
+Usage:
+    python -m app.workers.exports [--workers N] [--once]
+
+Each worker process polls export_jobs, claims the oldest queued row and runs
+it while a heartbeat thread keeps the row's heartbeat_at fresh. A running job
+whose worker stops heartbeating for EXPORT_JOB_STALE_SECONDS is put back on
+the queue by whichever worker polls next. SIGINT/SIGTERM let in-flight jobs
+finish before the processes exit; a worker process that dies is restarted.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+from contextlib import contextmanager
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.services.export_jobs import (
+    claim_next_export_job,
+    heartbeat_export_job,
+    requeue_stale_export_jobs,
+    run_export_job,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _heartbeat(job_id: int, worker_id: str):
+    """Refresh the job's heartbeat every EXPORT_JOB_HEARTBEAT_SECONDS while the block runs."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(settings.EXPORT_JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                if not heartbeat_export_job(db, job_id, worker_id):
+                    logger.warning(f"Export job {job_id} is no longer owned by {worker_id}")
+                    return
+            except Exception:
+                logger.exception(f"Heartbeat for export job {job_id} failed")
+            finally:
+                db.close()
+
+    t = threading.Thread(target=beat, name=f"export-heartbeat-{job_id}", daemon=True)
+    t.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        t.join()
+
+
+def run_next_job(worker_id: str) -> bool:
+    """Requeue stale jobs, then claim and run one queued job. False if the queue was empty."""
+    db = SessionLocal()
+    try:
+        requeue_stale_export_jobs(db)
+        job_id = claim_next_export_job(db, worker_id)
+    finally:
+        db.close()
+
+    if job_id is None:
+        return False
+
+    logger.info(f"{worker_id} running export job {job_id}")
+    with _heartbeat(job_id, worker_id):
+        run_export_job(job_id, worker_id=worker_id)
+    return True
+
+
+def worker_loop(worker_id: str, stop: threading.Event, once: bool = False) -> None:
+    """Run jobs until `stop` is set (or, with `once`, until the queue is empty)."""
+    while not stop.is_set():
+        try:
+            ran = run_next_job(worker_id)
+        except Exception:
+            logger.exception(f"{worker_id} failed to poll the export queue")
+            ran = False
+        if not ran:
+            if once:
+                return
+            stop.wait(settings.EXPORT_WORKER_POLL_SECONDS)
+
+
+def _install_signal_handlers(stop) -> None:
+    def handle(signum, frame):
+        stop.set()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, handle)
+
+
+def _configure_logging() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(name)s: %(message)s")
+
+
+def _worker_process(worker_id: str, stop, once: bool) -> None:
+    _install_signal_handlers(stop)
+    _configure_logging()
+    worker_loop(worker_id, stop, once=once)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run queued export jobs.")
+    parser.add_argument("--workers", type=int, default=settings.EXPORT_WORKERS, help="worker processes to run")
+    parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+    args = parser.parse_args(argv)
+
+    _configure_logging()
+    base_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    # spawn: each worker gets fresh DB connections (and may start its own PDF render pool)
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    _install_signal_handlers(stop)
+
+    n = max(args.workers, 1)
+    if n == 1:
+        worker_loop(f"{base_id}-0", stop, once=args.once)
+        return 0
+
+    def start(i: int):
+        p = ctx.Process(target=_worker_process, args=(f"{base_id}-{i}", stop, args.once), name=f"export-worker-{i}")
+        p.start()
+        return p
+
+    procs = [start(i) for i in range(n)]
+    logger.info(f"Started {n} export workers")
+    try:
+        while not stop.is_set():
+            if args.once and not any(p.is_alive() for p in procs):
+                break
+            for i, p in enumerate(procs):
+                if not args.once and not p.is_alive():
+                    logger.warning(f"{p.name} exited with code {p.exitcode}; restarting")
+                    procs[i] = start(i)
+            stop.wait(1.0)
+    finally:
+        stop.set()
+        for p in procs:
+            p.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Shared fixtures for tests that need a database
+
+`db` is an in-memory SQLite session seeded with user 1 (and campaign 1 when
+the campaigns table exists). A test module picks the tables it needs by
+overriding `db_models`, and adds its own rows or patches by overriding `db`
+on top of this one.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.db import Base
+from app.models.campaign import Campaign
+from app.models.lead import Lead
+from app.models.user import User
+
+
+@pytest.fixture
+def db_models():
+    """Models whose tables `db` creates"""
+    return [User, Campaign, Lead]
+
+
+@pytest.fixture
+def db_engine(db_models):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=[m.__table__ for m in db_models])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session_factory(db_engine):
+    return sessionmaker(bind=db_engine, autoflush=False)
+
+
+@pytest.fixture
+def db(db_session_factory, db_models):
+    session = db_session_factory()
+    session.add(User(id=1, email="owner@test.local", hashed_password="x"))
+    if Campaign in db_models:
+        session.add(Campaign(id=1, name="Test", created_by_user_id=1))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
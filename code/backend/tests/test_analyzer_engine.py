@@ -0,0 +1,141 @@
+"""
+Unit tests for analyzer campaign aggregates and lead scoring
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.campaign import Campaign
+from app.models.lead import Lead
+from app.models.user import User
+from app.routers.analyzer import score_leads
+from app.schemas.analyzer import LeadScoreInput
+from app.services.analyzer_engine import campaign_summary, campaign_zip_breakdown, score_lead, top_scored_leads
+
+
+@pytest.fixture
+def db(db):
+    db.add(Campaign(id=2, name="B", created_by_user_id=1))
+    db.add_all(
+        [
+            Lead(campaign_id=1, address="1 Main St", zip_code="78704", phone="555-0100", owner_name="Ann"),
+            Lead(campaign_id=1, address="2 Main St", zip_code=" 78704 ", phone="  ", owner_name="Bob"),
+            Lead(campaign_id=1, address="3 Main St", zip_code="78701", phone="555-0101"),
+            Lead(campaign_id=1, address="4 Main St", zip_code="", owner_name=""),
+            Lead(campaign_id=1, address="5 Main St"),
+            Lead(campaign_id=2, address="6 Main St", zip_code="10001", phone="555-0102"),
+        ]
+    )
+    db.commit()
+    return db
+
+def test_campaign_summary_counts(db):
+    """Test that the summary counts blank values as missing and trims ZIPs"""
+    assert campaign_summary(db, 1) == {
+        "campaign_id": 1,
+        "total_leads": 5,
+        "leads_with_phone": 2,
+        "leads_missing_phone": 3,
+        "leads_with_owner": 2,
+        "leads_missing_owner": 3,
+        "distinct_zip_codes": 2,
+    }
+
+
+def test_campaign_summary_empty_campaign(db):
+    """Test that a campaign without leads returns zeros"""
+    db.add(Campaign(id=3, name="Empty", created_by_user_id=1))
+    db.commit()
+    summary = campaign_summary(db, 3)
+    assert summary["total_leads"] == 0
+    assert summary["leads_with_phone"] == 0
+    assert summary["distinct_zip_codes"] == 0
+
+
+def test_campaign_zip_breakdown_groups_and_orders(db):
+    """Test that ZIP rows are grouped in SQL, sorted, with unknown ZIPs last"""
+    rows = campaign_zip_breakdown(db, 1)["rows"]
+
+    assert [r["zip_code"] for r in rows] == ["78701", "78704", None]
+    assert rows[1] == {
+        "zip_code": "78704",
+        "total_leads": 2,
+        "leads_with_phone": 1,
+        "leads_missing_phone": 1,
+        "leads_with_owner": 2,
+        "leads_missing_owner": 0,
+    }
+    assert rows[2]["total_leads"] == 2
+
+
+def test_top_scored_leads_matches_python_scoring(db):
+    """Test that SQL scores, reasons and ordering match score_lead"""
+    scored = top_scored_leads(db, Lead.campaign_id == 1, limit=10)
+
+    leads = db.query(Lead).filter(Lead.campaign_id == 1).all()
+    expected = sorted((score_lead(l) for l in leads), key=lambda s: (-s.score, s.lead_id))
+    assert scored == expected
+
+
+def test_sql_and_python_agree_on_whitespace_only_fields(db):
+    """Test that tab/newline-only fields are blank in SQL scoring, summaries and Python alike"""
+    db.add(Campaign(id=3, name="Whitespace", created_by_user_id=1))
+    db.add_all(
+        [
+            Lead(campaign_id=3, address="\t", zip_code="\t78704\n", phone="\n", owner_name=" \r\n"),
+            Lead(campaign_id=3, address="7 Main St", zip_code="78704", phone="555-0103"),
+        ]
+    )
+    db.commit()
+
+    scored = top_scored_leads(db, Lead.campaign_id == 3, limit=10)
+    leads = db.query(Lead).filter(Lead.campaign_id == 3).all()
+    assert scored == sorted((score_lead(l) for l in leads), key=lambda s: (-s.score, s.lead_id))
+    assert scored[-1].score == 5
+
+    summary = campaign_summary(db, 3)
+    assert (summary["leads_with_phone"], summary["leads_with_owner"], summary["distinct_zip_codes"]) == (1, 0, 1)
+    assert [r["zip_code"] for r in campaign_zip_breakdown(db, 3)["rows"]] == ["78704"]
+
+
+def test_score_leads_keyset_pagination(db):
+    """Test that cursor pages cover every lead once, in score order"""
+    user = db.get(User, 1)
+    seen = []
+    cursor = None
+    while True:
+        page = score_leads(LeadScoreInput(campaign_id=1, limit=2, cursor=cursor), current_user=user, db=db)
+        seen.extend((r.score, r.lead_id) for r in page.results)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen, key=lambda t: (-t[0], t[1]))
+
+
+def test_score_leads_by_ids_checks_ownership(db):
+    """Test that lead_ids must exist and belong to the caller's campaigns"""
+    db.add(User(id=2, email="other@test.local", hashed_password="x"))
+    db.commit()
+    ids = [l.id for l in db.query(Lead).filter(Lead.campaign_id == 2)]
+
+    owner = score_leads(LeadScoreInput(lead_ids=ids), current_user=db.get(User, 1), db=db)
+    assert [r.lead_id for r in owner.results] == ids
+
+    with pytest.raises(HTTPException) as e:
+        score_leads(LeadScoreInput(lead_ids=ids), current_user=db.get(User, 2), db=db)
+    assert e.value.status_code == 403
+
+    with pytest.raises(HTTPException) as e:
+        score_leads(LeadScoreInput(lead_ids=ids + [999]), current_user=db.get(User, 1), db=db)
+    assert e.value.status_code == 404
+
+
+def test_score_leads_by_ids_returns_every_id(db):
+    """Test that explicit lead_ids are all scored, whatever the page limit"""
+    ids = [l.id for l in db.query(Lead).filter(Lead.campaign_id == 1)]
+
+    page = score_leads(LeadScoreInput(lead_ids=ids, limit=2), current_user=db.get(User, 1), db=db)
+    assert sorted(r.lead_id for r in page.results) == sorted(ids)
+    assert page.next_cursor is None
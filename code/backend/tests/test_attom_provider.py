@@ -2,6 +2,7 @@
 Unit tests for ATTOM provider
 """
 
+import httpx
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
 from app.providers.attom import (
@@ -11,6 +12,7 @@ from app.providers.attom import (
     _safe_int,
     _safe_float,
 )
+from app.providers.base import ProviderError
 from app.schemas.filters import FilterSpec
 
 
@@ -324,9 +326,7 @@ async def test_attom_provider_fetch_leads_success():
         provider = AttomProvider()
         
         # Mock the HTTP response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = httpx.Response(200, json={
             "property": [
                 {
                     "address": {
@@ -344,10 +344,10 @@ async def test_attom_provider_fetch_leads_success():
                     },
                 }
             ]
-        }
+        })
         
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+        with patch("app.providers.attom.get_provider_client") as mock_client:
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -395,18 +395,19 @@ async def test_attom_provider_fetch_leads_api_error():
         mock_response.status_code = 401
         mock_response.text = "Unauthorized"
         
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+        with patch("app.providers.attom.get_provider_client") as mock_client:
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
-            leads = await provider.fetch_leads(
-                zipcode="78704",
-                limit=10,
-                filters=None,
-            )
-            
-            assert len(leads) == 0
+            with pytest.raises(ProviderError) as e:
+                await provider.fetch_leads(
+                    zipcode="78704",
+                    limit=10,
+                    filters=None,
+                )
+
+            assert e.value.status_code == 401
 
 
 @pytest.mark.asyncio
@@ -422,16 +423,87 @@ async def test_attom_provider_fetch_leads_rate_limit():
         mock_response = Mock()
         mock_response.status_code = 429
         mock_response.text = "Rate limit exceeded"
+        mock_response.headers = {"Retry-After": "1"}
         
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+        with patch("app.providers.attom.get_provider_client") as mock_client, \
+                patch("app.providers.scheduler._sleep", new=AsyncMock()), \
+                patch.dict("app.providers.scheduler._schedulers", clear=True):
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
-            leads = await provider.fetch_leads(
-                zipcode="78704",
-                limit=10,
-                filters=None,
-            )
-            
-            assert len(leads) == 0
+            with pytest.raises(ProviderError) as e:
+                await provider.fetch_leads(
+                    zipcode="78704",
+                    limit=10,
+                    filters=None,
+                )
+
+            assert e.value.status_code == 429
+            # Retried before giving up
+            assert mock_client.return_value.get.await_count > 1
+
+
+@pytest.mark.asyncio
+async def test_attom_provider_iter_pages_walks_all_pages():
+    """Test paginated fetch walks every page up to the limit"""
+    with patch("app.providers.attom.settings") as mock_settings:
+        mock_settings.ATTOM_API_KEY = "test-key"
+        mock_settings.ATTOM_BASE_URL = "https://api.test.com"
+        mock_settings.ATTOM_PAGE_CONCURRENCY = 2
+
+        provider = AttomProvider()
+
+        def _page_response(url, headers=None, params=None, timeout=None):
+            page = params["page"]
+            size = params["pageSize"]
+            return httpx.Response(200, json={
+                "status": {"total": 1100, "page": page, "pagesize": size},
+                "property": [
+                    {"address": {"oneLine": f"{page}-{i} Main St", "postal1": "78704"}}
+                    for i in range(min(size, 1100 - (page - 1) * size))
+                ],
+            })
+
+        with patch("app.providers.attom.get_provider_client") as mock_client:
+            mock_client.return_value.get = AsyncMock(side_effect=_page_response)
+
+            pages = []
+            async for page, leads in provider.iter_pages(zipcode="78704", limit=1200, filters=None):
+                pages.append((page, len(leads)))
+
+            assert sorted(pages) == [(1, 500), (2, 500), (3, 100)]
+
+            leads = await provider.fetch_leads(zipcode="78704", limit=700, filters=None)
+            assert len(leads) == 700
+
+
+@pytest.mark.asyncio
+async def test_attom_provider_failed_page_raises():
+    """Test a page that fails for good raises instead of being yielded as empty"""
+    with patch("app.providers.attom.settings") as mock_settings:
+        mock_settings.ATTOM_API_KEY = "test-key"
+        mock_settings.ATTOM_BASE_URL = "https://api.test.com"
+        mock_settings.ATTOM_PAGE_CONCURRENCY = 1
+
+        provider = AttomProvider()
+
+        def _page_response(url, headers=None, params=None, timeout=None):
+            if params["page"] == 2:
+                return httpx.Response(500, text="boom")
+            return httpx.Response(200, json={
+                "status": {"total": 1500},
+                "property": [{"address": {"oneLine": f"{params['page']}-{i} Main St"}} for i in range(500)],
+            })
+
+        with patch("app.providers.attom.get_provider_client") as mock_client, \
+                patch("app.providers.scheduler._sleep", new=AsyncMock()), \
+                patch.dict("app.providers.scheduler._schedulers", clear=True):
+            mock_client.return_value.get = AsyncMock(side_effect=_page_response)
+
+            pages = []
+            with pytest.raises(ProviderError):
+                async for page, leads in provider.iter_pages(zipcode="78704", limit=1500, filters=None):
+                    pages.append(page)
+
+            assert 2 not in pages
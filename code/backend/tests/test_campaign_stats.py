@@ -0,0 +1,84 @@
+"""
+Unit tests for incrementally maintained campaign stats
+"""
+
+import pytest
+
+from app.models.campaign import Campaign
+from app.models.campaign_stats import CampaignStats
+from app.models.lead import Lead
+from app.models.user import User
+from app.providers.base import ProviderLead
+from app.routers.leads import create_lead, delete_lead, update_lead
+from app.schemas.leads import LeadCreate, LeadPatch
+from app.services.analyzer_engine import campaign_summary
+from app.services.campaign_stats import cached_campaign_summary, reconcile_campaign_stats
+from app.services.populate import _store_leads
+
+
+@pytest.fixture
+def db_models():
+    return [User, Campaign, Lead, CampaignStats]
+
+def _matches_table(db) -> bool:
+    cached = cached_campaign_summary(db, 1)
+    cached.pop("status_counts")
+    return cached == campaign_summary(db, 1)
+
+
+def test_summary_built_on_first_read(db):
+    """Test that a missing stats row is built from the leads table"""
+    db.add_all([Lead(campaign_id=1, address="1 Main St", zip_code="78704", phone="555-0100")])
+    db.commit()
+
+    summary = cached_campaign_summary(db, 1)
+    assert summary["total_leads"] == 1
+    assert summary["status_counts"] == {"new": 1}
+    assert db.get(CampaignStats, 1) is not None
+
+
+def test_populate_updates_stats_incrementally(db):
+    """Test that bulk populate inserts apply deltas, skipping de-duped rows"""
+    cached_campaign_summary(db, 1)
+    leads = [
+        ProviderLead(address="1 Main St", zip_code="78704", phone="555-0100", owner_name="Ann"),
+        ProviderLead(address="2 Main St", zip_code="78701"),
+    ]
+    assert _store_leads(db, 1, leads) == 2
+    assert _store_leads(db, 1, leads + [ProviderLead(address="3 Main St", zip_code="78701")]) == 1
+
+    summary = cached_campaign_summary(db, 1)
+    assert summary["total_leads"] == 3
+    assert summary["leads_with_phone"] == 1
+    assert summary["distinct_zip_codes"] == 2
+    assert _matches_table(db)
+
+
+def test_lead_router_changes_keep_stats_in_sync(db):
+    """Test that create, status update and delete adjust the cached counters"""
+    user = db.get(User, 1)
+    cached_campaign_summary(db, 1)
+
+    a = create_lead(1, LeadCreate(address="1 Main St", zip_code="78704", phone="555-0100"), current_user=user, db=db)
+    b = create_lead(1, LeadCreate(address="2 Main St", zip_code="78701", owner_name="Bob"), current_user=user, db=db)
+    update_lead(1, a.id, LeadPatch(status="contacted"), current_user=user, db=db)
+    assert cached_campaign_summary(db, 1)["status_counts"] == {"contacted": 1, "new": 1}
+
+    delete_lead(1, b.id, current_user=user, db=db)
+    summary = cached_campaign_summary(db, 1)
+    assert summary["total_leads"] == 1
+    assert summary["distinct_zip_codes"] == 1
+    assert summary["status_counts"] == {"contacted": 1}
+    assert _matches_table(db)
+
+
+def test_reconcile_fixes_drift(db):
+    """Test that reconciliation rebuilds rows changed behind the hooks' back"""
+    cached_campaign_summary(db, 1)
+    db.execute(Lead.__table__.insert().values(campaign_id=1, address="9 Main St", zip_code="10001"))
+    db.commit()
+    assert cached_campaign_summary(db, 1)["total_leads"] == 0
+
+    assert reconcile_campaign_stats(db) == 1
+    assert cached_campaign_summary(db, 1)["total_leads"] == 1
+    assert reconcile_campaign_stats(db) == 0
@@ -0,0 +1,152 @@
+"""
+Unit tests for the comparable-sales ARV index
+"""
+
+import time
+
+import numpy as np
+from unittest.mock import patch
+
+from app.models.deal import Deal
+from app.providers.base import ProviderLead
+from app.services.comps import CompSale, CompsIndex, load_comp_sales_csv
+from app.services.deal_scores import _rescore_batch, deal_lead, score_deal
+from app.services.deal_scoring import analyze_deal
+from app.services.deal_scoring_batch import analyze_deals_batch, lead_arrays
+from app.services.scoring_profile import default_scoring_profile
+
+LAT, LON = 30.25, -97.75
+MILE_LAT = 1 / 69.0
+
+
+def _sales():
+    # Five nearby 1500 sqft sales at $200-$240/sqft, one far away, one much larger
+    sales = [
+        CompSale(latitude=LAT + i * 0.1 * MILE_LAT, longitude=LON, price=1500 * (200 + 10 * i), sqft=1500, key=f"{i} Oak St")
+        for i in range(5)
+    ]
+    sales.append(CompSale(latitude=LAT + 5 * MILE_LAT, longitude=LON, price=900000, sqft=1500, key="far"))
+    sales.append(CompSale(latitude=LAT, longitude=LON + 0.05 * MILE_LAT, price=2000000, sqft=6000, key="mansion"))
+    return sales
+
+
+def test_nearest_respects_radius_size_band_and_k():
+    """Test that k-nearest returns in-radius, in-band sales ordered by distance"""
+    index = CompsIndex(_sales(), k=3, min_comps=3, radius_miles=1.0, size_band=0.25)
+
+    idx, dist = index.nearest(LAT, LON, sqft=1500)
+    assert [index.keys[i] for i in idx] == ["0 Oak St", "1 Oak St", "2 Oak St"]
+    assert list(dist) == sorted(dist)
+
+    idx, _ = index.nearest(LAT, LON, sqft=1500, exclude_key="0 Oak St")
+    assert "0 Oak St" not in [index.keys[i] for i in idx]
+
+
+def test_estimate_uses_median_price_per_sqft():
+    """Test that the comps ARV is the median $/sqft times the subject size"""
+    index = CompsIndex(_sales(), k=5, min_comps=3, radius_miles=1.0, size_band=0.25)
+
+    est = index.estimate(LAT, LON, sqft=1000)
+    assert est is None  # 1500 sqft comps are outside +/-25% of 1000
+
+    est = index.estimate(LAT, LON, sqft=1400)
+    assert est.comp_count == 5
+    assert est.price_per_sqft == 220.0
+    assert est.arv == 220.0 * 1400
+
+    assert index.estimate(LAT + 2, LON, sqft=1400) is None
+    assert index.estimate(None, None, sqft=1400) is None
+
+
+def test_comps_arv_in_analyze_deal_and_batch():
+    """Test that scalar and batch scoring use the comps ARV after the AVM"""
+    index = CompsIndex(_sales(), k=5, min_comps=3, radius_miles=1.0, size_band=0.25)
+    leads = [
+        ProviderLead(address="9 Elm St", latitude=LAT, longitude=LON, sqft=1500, assessed_value=100000),
+        ProviderLead(address="8 Elm St", latitude=LAT, longitude=LON, sqft=1500, estimated_value=500000),
+        ProviderLead(address="7 Elm St", sqft=1500, assessed_value=100000),
+    ]
+
+    scalar = [analyze_deal(lead, asking_price=200000, comps=index) for lead in leads]
+    assert scalar[0].arv == 220.0 * 1500
+    assert scalar[0].notes[0] == "ARV calculated using: comps"
+    assert scalar[1].arv == 500000
+    assert scalar[2].arv == 100000 * 1.15
+
+    lat = np.array([lead.latitude for lead in leads], dtype=float)
+    lon = np.array([lead.longitude for lead in leads], dtype=float)
+    comps_arv = index.estimate_many(lat, lon, np.array([lead.sqft for lead in leads], dtype=float))
+    batch = analyze_deals_batch(
+        **lead_arrays(leads), asking_price=np.full(3, 200000.0), comps_arv=comps_arv
+    )
+    assert list(batch.arv_method) == ["comps", "avm", "assessed_value"]
+    assert list(batch.deal_score) == [a.deal_score for a in scalar]
+
+
+def test_sales_from_csv(tmp_path):
+    """Test loading sales from an imported CSV"""
+    path = tmp_path / "sales.csv"
+    path.write_text(
+        "address,latitude,longitude,sale_price,sqft,sale_date\n"
+        "1 Oak St,30.25,-97.75,300000,1500,2024-05-01\n"
+        "2 Oak St,,,250000,1200,\n"
+    )
+    sales = load_comp_sales_csv(path)
+    assert len(sales) == 1
+    assert sales[0].sqft == 1500 and sales[0].sale_date == "2024-05-01"
+
+
+def test_query_speed():
+    """Test that a query against a large index stays well under a millisecond"""
+    rng = np.random.default_rng(7)
+    n = 50000
+    lats = LAT + rng.uniform(-0.5, 0.5, n)
+    lons = LON + rng.uniform(-0.5, 0.5, n)
+    sales = [
+        CompSale(latitude=float(a), longitude=float(b), price=300000.0, sqft=int(s))
+        for a, b, s in zip(lats, lons, rng.integers(900, 3000, n))
+    ]
+    index = CompsIndex(sales, k=6, min_comps=3, radius_miles=1.0, size_band=0.25)
+
+    queries = 500
+    start = time.perf_counter()
+    for i in range(queries):
+        index.estimate(float(lats[i]), float(lons[i]), sqft=1800)
+    per_query = (time.perf_counter() - start) / queries
+    assert per_query < 0.001
+
+
+def test_prefer_comps_puts_comps_ahead_of_the_avm():
+    """Test that a prefer_comps profile uses the comps ARV even when an AVM exists"""
+    index = CompsIndex(_sales(), k=5, min_comps=3, radius_miles=1.0, size_band=0.25)
+    lead = ProviderLead(address="8 Elm St", latitude=LAT, longitude=LON, sqft=1500, estimated_value=500000)
+    profile = default_scoring_profile().with_overrides(prefer_comps=True)
+
+    assert analyze_deal(lead, comps=index).arv == 500000
+    scalar = analyze_deal(lead, comps=index, profile=profile)
+    assert scalar.arv == 220.0 * 1500
+
+    comps_arv = index.estimate_many(np.array([LAT]), np.array([LON]), np.array([1500.0]))
+    batch = analyze_deals_batch(**lead_arrays([lead]), comps_arv=comps_arv, profile=profile)
+    assert list(batch.arv_method) == ["comps"]
+    assert batch.deal_score[0] == scalar.deal_score
+
+
+def test_stored_scores_use_the_comps_index():
+    """Test that score_deal and the batch rescore value deals like /deals/analyze does"""
+    index = CompsIndex(_sales(), k=5, min_comps=3, radius_miles=1.0, size_band=0.25)
+    deals = [
+        Deal(created_by_user_id=1, address="9 Elm St", latitude=LAT, longitude=LON, sqft=1500, assessed_value=100000),
+        Deal(created_by_user_id=1, address="7 Elm St", sqft=1500, assessed_value=100000),
+    ]
+
+    with patch("app.services.deal_scores.get_comps_index", return_value=index):
+        for d in deals:
+            score_deal(d)
+        scored = [(d.scored_arv, d.deal_score) for d in deals]
+        _rescore_batch(deals, default_scoring_profile())
+
+    expected = [analyze_deal(deal_lead(d), comps=index) for d in deals]
+    assert scored == [(a.arv, a.deal_score) for a in expected]
+    assert [(d.scored_arv, d.deal_score) for d in deals] == scored
+    assert deals[0].scored_arv == 220.0 * 1500
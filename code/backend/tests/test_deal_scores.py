@@ -0,0 +1,213 @@
+"""
+Unit tests for materialized deal scores
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.models.app_control import AppControl
+from app.models.campaign import Campaign
+from app.models.deal import Deal
+from app.models.deal_event import DealEvent
+from app.models.user import User
+from app.routers.deals import create_deal, list_deals, update_deal
+from app.schemas.deals import DealCreate, DealUpdate
+from app.services.deal_scores import (
+    RESCORE_CONTROL_KEY,
+    RESCORE_LEASE_KEY,
+    claim_startup_rescore,
+    complete_startup_rescore,
+    deal_lead,
+    needs_rescore,
+    rescore_deals,
+    run_startup_rescore,
+    score_deal,
+    scoring_version,
+)
+from app.services.deal_scoring import analyze_deal
+from app.services.scoring_profile import default_scoring_profile
+
+
+@pytest.fixture
+def db_models():
+    return [User, Campaign, Deal, DealEvent, AppControl]
+
+
+def _user(db) -> User:
+    return db.get(User, 1)
+
+
+def test_create_deal_stores_analysis(db):
+    """Test that creating a deal fills the scored arv, repairs, mao and score from analyze_deal"""
+    payload = DealCreate(address="1 Main St", sqft=1500, year_built=2000, estimated_value=300000, list_price=180000)
+    out = create_deal(payload, current_user=_user(db), db=db)
+
+    expected = analyze_deal(lead=deal_lead(db.get(Deal, out.id)), asking_price=180000)
+    assert out.arv is None
+    assert out.scored_arv == expected.arv
+    assert out.scored_repair_estimate == expected.repair_estimate
+    assert out.mao == expected.mao
+    assert out.deal_score == expected.deal_score
+    assert out.scored_at is not None
+    assert db.get(Deal, out.id).score_profile_version == default_scoring_profile().version
+
+
+def test_update_deal_rescores(db):
+    """Test that editing a scoring input updates the stored score"""
+    out = create_deal(DealCreate(address="1 Main St", sqft=1500, estimated_value=300000), current_user=_user(db), db=db)
+    updated = update_deal(out.id, DealUpdate(list_price=150000), current_user=_user(db), db=db)
+
+    assert updated.deal_score != out.deal_score
+    assert updated.deal_score == analyze_deal(lead=deal_lead(db.get(Deal, out.id)), asking_price=150000).deal_score
+
+
+def test_unscoreable_deal_gets_no_score(db):
+    """Test that a deal without value data or an entered ARV gets no score"""
+    out = create_deal(DealCreate(address="1 Main St", repair_estimate=20000), current_user=_user(db), db=db)
+
+    assert out.repair_estimate == 20000
+    assert out.scored_arv is None
+    assert out.mao is None
+    assert out.deal_score is None
+
+
+def test_entered_arv_and_repairs_are_kept_and_used(db):
+    """Test that scoring never overwrites the user's ARV / repairs and scores with them"""
+    user = _user(db)
+    out = create_deal(
+        DealCreate(address="1 Main St", sqft=1500, estimated_value=300000, arv=350000, repair_estimate=20000),
+        current_user=user,
+        db=db,
+    )
+    expected = analyze_deal(lead=deal_lead(db.get(Deal, out.id)), arv_override=350000, repair_override=20000)
+    assert (out.arv, out.repair_estimate) == (350000, 20000)
+    assert (out.scored_arv, out.scored_repair_estimate) == (350000, 20000)
+    assert out.mao == expected.mao
+
+    # An unrelated edit and a batch rescore keep them too
+    updated = update_deal(out.id, DealUpdate(list_price=150000), current_user=user, db=db)
+    assert (updated.arv, updated.repair_estimate) == (350000, 20000)
+
+    d = db.get(Deal, out.id)
+    d.score_profile_version = None
+    db.commit()
+    assert rescore_deals(db, user_id=1) == 1
+    assert (d.arv, d.repair_estimate, d.scored_arv) == (350000, 20000, 350000)
+    assert d.mao == analyze_deal(
+        lead=deal_lead(d), asking_price=150000, arv_override=350000, repair_override=20000
+    ).mao
+
+
+def test_explicit_null_clears_entered_arv(db):
+    """Test that sending arv/repair_estimate as null goes back to computed scoring"""
+    user = _user(db)
+    out = create_deal(
+        DealCreate(address="1 Main St", sqft=1500, estimated_value=300000, arv=350000, repair_estimate=20000),
+        current_user=user,
+        db=db,
+    )
+
+    updated = update_deal(out.id, DealUpdate(arv=None, repair_estimate=None), current_user=user, db=db)
+
+    expected = analyze_deal(lead=deal_lead(db.get(Deal, out.id)))
+    assert (updated.arv, updated.repair_estimate) == (None, None)
+    assert updated.scored_arv == expected.arv
+    assert updated.mao == expected.mao
+    assert updated.address == "1 Main St"  # fields not sent are untouched
+
+
+def test_rescore_only_touches_stale_deals(db):
+    """Test that rescore recomputes unscored deals and profile changes, nothing else"""
+    fresh = Deal(created_by_user_id=1, address="1 Main St", sqft=1500, estimated_value=300000)
+    score_deal(fresh)
+    never = Deal(created_by_user_id=1, address="2 Main St", sqft=1500, estimated_value=200000)
+    db.add_all([fresh, never])
+    db.commit()
+
+    profile = default_scoring_profile()
+    assert rescore_deals(db, user_id=1, profile=profile) == 1
+    assert never.deal_score == analyze_deal(lead=deal_lead(never)).deal_score
+    assert not any(needs_rescore(d, profile) for d in (fresh, never))
+
+    changed = profile.with_overrides(mao_multiplier=0.65)
+    assert rescore_deals(db, user_id=1, profile=changed) == 2
+    assert fresh.score_profile_version == changed.version
+    assert fresh.mao == analyze_deal(lead=deal_lead(fresh), profile=changed).mao
+
+
+def test_list_deals_order_by_score(db):
+    """Test that order=score sorts by stored score, unscored deals last"""
+    user = _user(db)
+    low = create_deal(DealCreate(address="1 Main St", sqft=1500, estimated_value=100000, list_price=95000), current_user=user, db=db)
+    none = create_deal(DealCreate(address="2 Main St"), current_user=user, db=db)
+    high = create_deal(DealCreate(address="3 Main St", sqft=1500, estimated_value=400000, list_price=150000), current_user=user, db=db)
+
+    ids = [d.id for d in list_deals(order="score", current_user=user, db=db)]
+    assert ids == [high.id, low.id, none.id]
+
+
+def test_rescore_detects_input_changes_by_fingerprint(db):
+    """Test that only deals whose scoring inputs changed are rescored, in batches"""
+    deals = [Deal(created_by_user_id=1, address=f"{i} Main St", sqft=1500, estimated_value=200000 + i) for i in range(5)]
+    for d in deals:
+        score_deal(d)
+    db.add_all(deals)
+    db.commit()
+
+    # Out-of-band edits: one scoring input, one non-input field
+    db.execute(Deal.__table__.update().where(Deal.id == deals[1].id).values(estimated_value=400000))
+    db.execute(Deal.__table__.update().where(Deal.id == deals[3].id).values(notes="called owner"))
+    db.commit()
+    db.expire_all()
+
+    assert rescore_deals(db, user_id=1, batch_size=2) == 1
+    assert deals[1].scored_arv == 400000
+    assert rescore_deals(db, user_id=1, batch_size=2) == 0
+
+
+def test_startup_rescore_runs_once_per_scoring_version(db):
+    """Test only one process holds the rescore lease, and a completed version is not run again"""
+    profile = default_scoring_profile()
+    version = scoring_version(profile)
+
+    assert claim_startup_rescore(db, version, "a") is True
+    assert claim_startup_rescore(db, version, "b") is False  # a's lease is live
+    complete_startup_rescore(db, version, "a")
+    assert claim_startup_rescore(db, version, "b") is False  # done
+
+    changed = scoring_version(profile.with_overrides(mao_multiplier=0.65))
+    assert changed != version
+    assert claim_startup_rescore(db, changed, "b") is True
+    assert claim_startup_rescore(db, changed, "c") is False
+
+
+def test_crashed_startup_rescore_is_retried(db):
+    """Test a version is only recorded after a successful rescore, and a dead holder's lease expires"""
+    version = scoring_version(default_scoring_profile())
+
+    with patch("app.services.deal_scores.SessionLocal", return_value=db), patch(
+        "app.services.deal_scores.rescore_deals", side_effect=RuntimeError("boom")
+    ), patch.object(db, "close"):
+        run_startup_rescore()
+    assert db.query(AppControl).filter(AppControl.key == RESCORE_CONTROL_KEY).first() is None
+    assert claim_startup_rescore(db, version, "b") is True  # the failed run released its lease
+
+    # b dies without releasing: c waits for the lease to expire
+    assert claim_startup_rescore(db, version, "c") is False
+    lease = db.query(AppControl).filter(AppControl.key == RESCORE_LEASE_KEY).one()
+    lease.value = "2000-01-01T00:00:00+00:00 b"
+    db.commit()
+    assert claim_startup_rescore(db, version, "c") is True
+
+
+def test_new_comps_data_makes_scores_stale(db):
+    """Test stored scores and the startup version change with the comps data fingerprint"""
+    d = Deal(created_by_user_id=1, address="1 Main St", sqft=1500, estimated_value=300000)
+    score_deal(d)
+    profile = default_scoring_profile()
+    version = scoring_version(profile)
+    assert not needs_rescore(d, profile)
+
+    with patch("app.services.deal_scores.comps_fingerprint", return_value="0123456789abcdef"):
+        assert needs_rescore(d, profile)
+        assert scoring_version(profile) != version
@@ -291,3 +291,59 @@ def test_analyze_deal_poor_condition():
     
     # Poor condition should have high repair costs
     assert analysis.repair_estimate >= 60000.0  # 2000 sqft * $60/sqft
+
+
+def test_analyze_deal_trace_on_request():
+    """Test the scoring trace is returned (and added to notes) only when requested"""
+    lead = ProviderLead(
+        address="123 Main St",
+        sqft=2000,
+        year_built=1990,
+        estimated_value=400000.0,
+    )
+
+    plain = analyze_deal(lead, asking_price=250000.0)
+    traced = analyze_deal(lead, asking_price=250000.0, trace=True)
+
+    assert plain.trace is None
+    assert [e["step"] for e in traced.trace] == ["arv", "repair", "mao", "score"]
+    assert traced.trace[2]["mao"] == traced.mao
+    assert traced.notes[: len(plain.notes)] == plain.notes
+    assert traced.notes[len(plain.notes):] == [
+        line for line in traced.notes if line.startswith("Trace ")
+    ]
+    assert traced.deal_score == plain.deal_score
+
+
+def test_analyze_deal_does_not_format_logs_when_debug_off(caplog):
+    """Test no scoring log records are produced at INFO"""
+    lead = ProviderLead(address="123 Main St", sqft=2000, estimated_value=400000.0)
+
+    with caplog.at_level("INFO", logger="app.services.deal_scoring"):
+        analyze_deal(lead, asking_price=250000.0)
+
+    assert caplog.records == []
+
+
+def test_scoring_profile_is_immutable_and_versioned():
+    """Test profiles are frozen, hashable and re-versioned on override"""
+    import dataclasses
+
+    from app.services.scoring_profile import ScoringProfile, default_scoring_profile
+
+    base = default_scoring_profile()
+    assert base is default_scoring_profile()
+    assert base == ScoringProfile()  # settings defaults match the built-in tables
+
+    tweaked = base.with_overrides(mao_multiplier=0.65)
+    assert tweaked.version != base.version
+    assert base.with_overrides(name="austin").version == base.version
+    assert len({base, tweaked}) == 2
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        base.mao_multiplier = 0.5
+    with pytest.raises(ValueError):
+        ScoringProfile(arv_bounds=(100.0, 75.0))
+
+    lead = ProviderLead(address="123 Main St", sqft=2000, estimated_value=400000.0)
+    assert analyze_deal(lead, profile=tweaked).mao < analyze_deal(lead, profile=base).mao
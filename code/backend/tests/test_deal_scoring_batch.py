@@ -0,0 +1,107 @@
+"""
+Unit tests for vectorized batch deal scoring
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.providers.base import ProviderLead, ProviderLeadBatch
+from app.services.deal_scoring import PropertyCondition, analyze_deal
+from app.services.deal_scoring_batch import analyze_deals_batch, lead_arrays
+
+
+def _random_leads(n: int, seed: int = 7) -> tuple[list[ProviderLead], list[float | None]]:
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return value if rng.random() > 0.25 else rng.choice([None, 0])
+
+    leads = [
+        ProviderLead(
+            address=f"{i} Main St",
+            sqft=maybe(rng.randint(400, 5000)),
+            year_built=maybe(rng.randint(1900, 2023)),
+            estimated_value=maybe(rng.uniform(50_000, 900_000)),
+            assessed_value=maybe(rng.uniform(40_000, 700_000)),
+            last_sale_price=maybe(rng.uniform(30_000, 800_000)),
+            equity_percent=rng.choice([None, rng.uniform(-20, 100)]),
+            absentee_owner=rng.choice([None, True, False]),
+        )
+        for i in range(n)
+    ]
+    asking = [rng.choice([None, 0.0, rng.uniform(20_000, 900_000)]) for _ in range(n)]
+    return leads, asking
+
+
+def _assert_matches_scalar(leads, asking, result, condition_override=None):
+    for i, (lead, price) in enumerate(zip(leads, asking)):
+        try:
+            expected = analyze_deal(lead, asking_price=price, condition_override=condition_override)
+        except ValueError:
+            assert not result.valid[i]
+            continue
+
+        assert result.valid[i]
+        assert result.arv[i] == expected.arv
+        assert result.repair_estimate[i] == expected.repair_estimate
+        assert result.mao[i] == expected.mao
+        assert result.deal_score[i] == expected.deal_score
+        assert result.estimated_value[i] == expected.estimated_value
+        assert result.spread[i] == expected.spread
+        assert result.spread_percent[i] == expected.spread_percent
+        assert result.spread_score[i] == expected.score_breakdown["spread"]
+        assert result.arv_score[i] == expected.score_breakdown["arv"]
+        assert result.equity_score[i] == expected.score_breakdown["equity"]
+        assert result.recommendation[i] == expected.recommendation
+        assert f"Property condition: {result.condition[i]}" in expected.notes
+        assert f"ARV calculated using: {result.arv_method[i]}" in expected.notes
+
+
+def test_batch_matches_scalar_path():
+    """Test every output column equals analyze_deal row for row"""
+    leads, asking = _random_leads(500)
+
+    result = analyze_deals_batch(**lead_arrays(leads), asking_price=np.array(asking, dtype=float))
+
+    assert len(result) == 500
+    _assert_matches_scalar(leads, asking, result)
+
+
+@pytest.mark.parametrize("condition", [PropertyCondition.EXCELLENT, PropertyCondition.POOR, "bogus"])
+def test_batch_matches_scalar_with_condition_override(condition):
+    """Test a condition override applies to every row exactly like the scalar path"""
+    leads, asking = _random_leads(100, seed=11)
+
+    result = analyze_deals_batch(
+        **lead_arrays(ProviderLeadBatch(leads)),
+        asking_price=np.array(asking, dtype=float),
+        condition_override=condition,
+    )
+
+    _assert_matches_scalar(leads, asking, result, condition_override=condition)
+
+
+def test_batch_matches_scalar_with_custom_profile():
+    """Test a what-if profile gives the same results through both paths"""
+    from app.services.scoring_profile import default_scoring_profile
+
+    profile = default_scoring_profile().with_overrides(
+        mao_multiplier=0.75,
+        spread_bounds=(0.0, 10.0, 25.0),
+        spread_scores=(0.0, 40.0, 80.0, 100.0),
+        equity_weight=0.3,
+        arv_weight=0.2,
+    )
+    leads, asking = _random_leads(200, seed=3)
+
+    result = analyze_deals_batch(**lead_arrays(leads), asking_price=np.array(asking, dtype=float), profile=profile)
+
+    for i, (lead, price) in enumerate(zip(leads, asking)):
+        if not result.valid[i]:
+            continue
+        expected = analyze_deal(lead, asking_price=price, profile=profile)
+        assert result.mao[i] == expected.mao
+        assert result.deal_score[i] == expected.deal_score
+        assert result.recommendation[i] == expected.recommendation
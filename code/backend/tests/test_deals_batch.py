@@ -0,0 +1,49 @@
+"""
+Tests for batch deal analysis (NDJSON streaming)
+"""
+
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers.deals import ANALYZE_BATCH_MAX, _analyze_batch_lines, analyze_property_deals_batch
+from app.schemas.deals import DealAnalysisBatchIn
+
+
+def test_analyze_batch_lines_isolate_bad_rows():
+    """Test every row gets a line in order, and bad rows don't fail the batch"""
+    rows = [
+        {"address": "1 Main St", "sqft": 1800, "year_built": 1985, "estimated_value": 350000, "asking_price": 200000},
+        {"address": "2 Main St"},  # no value data -> cannot score
+        {"sqft": "lots"},  # invalid row
+        {"address": "4 Main St", "assessed_value": 200000},
+    ]
+
+    body = "".join(_analyze_batch_lines(rows))
+    lines = [json.loads(line) for line in body.splitlines()]
+
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert [line["ok"] for line in lines] == [True, False, False, True]
+    assert lines[0]["result"]["arv"] == 350000
+    assert "Cannot calculate ARV" in lines[1]["error"]
+    assert lines[2]["error"].startswith("Invalid property")
+
+
+def test_analyze_batch_lines_are_chunked():
+    """Test rows are flushed in chunks rather than one write per row"""
+    rows = [{"address": f"{i} Main St", "estimated_value": 300000} for i in range(250)]
+
+    chunks = list(_analyze_batch_lines(rows))
+
+    assert len(chunks) == 3
+    assert sum(c.count("\n") for c in chunks) == 250
+
+
+def test_analyze_batch_rejects_oversized_batch():
+    """Test batches above ANALYZE_BATCH_MAX are refused up front"""
+    payload = DealAnalysisBatchIn(properties=[{"address": "x"}] * (ANALYZE_BATCH_MAX + 1))
+
+    with pytest.raises(HTTPException) as exc:
+        analyze_property_deals_batch(payload, current_user=None)
+    assert exc.value.status_code == 400
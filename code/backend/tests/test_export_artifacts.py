@@ -0,0 +1,163 @@
+"""
+Unit tests for content-addressed export artifact reuse
+"""
+
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from app.models.audit_event import AuditEvent
+from app.models.campaign import Campaign
+from app.models.campaign_stats import CampaignStats
+from app.models.export_artifact import ExportArtifact
+from app.models.export_job import ExportJob, ExportJobSubscriber
+from app.models.lead import Lead
+from app.models.user import User
+from app.routers.exports import list_exports, list_jobs
+from app.routers.leads import create_lead, delete_lead, update_lead
+from app.schemas.leads import LeadCreate, LeadPatch
+from app.services.export_artifacts import campaign_fingerprint, file_checksum
+from app.services.export_jobs import create_export_job
+from app.workers.exports import worker_loop
+
+
+@pytest.fixture
+def db_models():
+    return [User, Campaign, Lead, CampaignStats, ExportJob, ExportJobSubscriber, ExportArtifact, AuditEvent]
+
+
+@pytest.fixture
+def db(db, db_session_factory, tmp_path):
+    db.add(Lead(campaign_id=1, address="1 Main St", zip_code="78704"))
+    db.commit()
+    with patch("app.services.export_jobs.SessionLocal", db_session_factory), patch(
+        "app.workers.exports.SessionLocal", db_session_factory
+    ), patch("app.services.exports.settings.EXPORT_DIR", str(tmp_path)):
+        yield db
+
+def _run_queue(db):
+    worker_loop("w1", threading.Event(), once=True)
+    db.expire_all()
+
+
+def test_fingerprint_tracks_exported_content(db):
+    """Test inserts, deletes and renames change the fingerprint; status updates do not"""
+    user = db.get(User, 1)
+    seen = {campaign_fingerprint(db, 1)}
+
+    lead = create_lead(1, LeadCreate(address="2 Main St", zip_code="78704"), current_user=user, db=db)
+    seen.add(campaign_fingerprint(db, 1))
+
+    before = campaign_fingerprint(db, 1)
+    update_lead(1, lead.id, LeadPatch(status="contacted"), current_user=user, db=db)
+    assert campaign_fingerprint(db, 1) == before
+
+    delete_lead(1, lead.id, current_user=user, db=db)
+    seen.add(campaign_fingerprint(db, 1))
+
+    db.get(Campaign, 1).name = "Renamed"
+    db.commit()
+    seen.add(campaign_fingerprint(db, 1))
+
+    assert len(seen) == 4
+    assert campaign_fingerprint(db, 999) is None
+
+
+def test_repeat_export_reuses_artifact(db, tmp_path):
+    """Test an unchanged campaign's repeat export completes immediately with the same file"""
+    first = create_export_job(db, 1, 1, "leads_by_zip")
+    _run_queue(db)
+    assert first.status == "done"
+
+    again = create_export_job(db, 1, 1, "leads_by_zip")
+    assert again.id != first.id
+    assert (again.status, again.result_filename) == ("done", first.result_filename)
+    assert len(list(tmp_path.glob("*.zip"))) == 1
+
+    # A different job type, a lead change or a missing file means a fresh export
+    assert create_export_job(db, 1, 1, "summary_pdf").status == "queued"
+    (tmp_path / first.result_filename).unlink()
+    assert create_export_job(db, 1, 1, "leads_by_zip").status == "queued"
+
+
+def test_lead_change_invalidates_artifact(db):
+    """Test an export after a lead insert is regenerated"""
+    first = create_export_job(db, 1, 1, "leads_by_zip")
+    _run_queue(db)
+
+    create_lead(1, LeadCreate(address="2 Main St"), current_user=db.get(User, 1), db=db)
+    again = create_export_job(db, 1, 1, "leads_by_zip")
+    assert again.status == "queued"
+    assert again.fingerprint != first.fingerprint
+
+
+def test_identical_inflight_requests_coalesce(db):
+    """Test a repeat request joins the queued job, and queued duplicates reuse its result"""
+    first = create_export_job(db, 1, 1, "leads_pdf")
+    assert create_export_job(db, 1, 1, "leads_pdf").id == first.id
+
+    # A duplicate without a fingerprint (queued before they existed) reuses the first job's file when it runs
+    dup = ExportJob(campaign_id=1, requested_by_user_id=1, job_type="leads_pdf", status="queued")
+    db.add(dup)
+    db.commit()
+    _run_queue(db)
+
+    assert first.status == dup.status == "done"
+    assert dup.result_filename == first.result_filename
+
+
+def test_other_users_request_joins_inflight_job(db):
+    """Test another user's identical request joins the running job and gets its file in their manifest"""
+    db.add(User(id=2, email="other@test.local", hashed_password="x"))
+    db.commit()
+
+    first = create_export_job(db, 1, 1, "leads_by_zip")
+    joined = create_export_job(db, 1, 2, "leads_by_zip")
+    assert joined.id == first.id
+    assert [j.id for j in list_jobs(current_user=db.get(User, 2), db=db)] == [first.id]
+
+    _run_queue(db)
+
+    assert first.status == "done"
+    assert db.query(ExportJob).count() == 1
+    owners = {a.owner_user_id for a in db.query(ExportArtifact).filter(ExportArtifact.filename == first.result_filename)}
+    assert owners == {1, 2}
+    assert [i.filename for i in list_exports(limit=50, offset=0, current_user=db.get(User, 2), db=db)] == [first.result_filename]
+
+
+def test_concurrent_first_requests_share_one_job(db):
+    """Test a request that missed the in-flight lookup joins the job the unique index kept"""
+    db.add(User(id=2, email="other@test.local", hashed_password="x"))
+    db.commit()
+    first = create_export_job(db, 1, 1, "summary_pdf")
+
+    # Both requests looked before either job was inserted
+    with patch("app.services.export_jobs.find_inflight_job", side_effect=[None, first]):
+        joined = create_export_job(db, 1, 2, "summary_pdf")
+
+    assert joined.id == first.id
+    assert db.query(ExportJob).count() == 1
+    assert [s.user_id for s in db.query(ExportJobSubscriber)] == [2]
+
+
+def test_list_exports_reads_owner_manifest(db, tmp_path):
+    """Test listing returns the caller's artifacts newest first, paginated, with checksums"""
+    db.add(User(id=2, email="other@test.local", hashed_password="x"))
+    db.add(Campaign(id=2, name="Other", created_by_user_id=2))
+    db.commit()
+
+    create_export_job(db, 1, 1, "leads_by_zip")
+    create_export_job(db, 1, 1, "summary_pdf")
+    create_export_job(db, 2, 2, "summary_pdf")
+    _run_queue(db)
+    create_export_job(db, 1, 1, "leads_by_zip")  # reused: no second manifest row
+
+    user = db.get(User, 1)
+    items = list_exports(limit=50, offset=0, current_user=user, db=db)
+    assert [i.job_type for i in items] == ["summary_pdf", "leads_by_zip"]
+    assert items[1].checksum == file_checksum(tmp_path / items[1].filename)
+    assert items[1].size_bytes == (tmp_path / items[1].filename).stat().st_size
+
+    page = list_exports(limit=1, offset=1, current_user=user, db=db)
+    assert [i.filename for i in page] == [items[1].filename]
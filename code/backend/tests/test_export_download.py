@@ -0,0 +1,140 @@
+"""
+Unit tests for conditional, ranged and precompressed export downloads
+"""
+
+import gzip
+
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.db import get_db
+from app.core.deps import require_active_subscription
+from app.models.audit_event import AuditEvent
+from app.models.export_artifact import ExportArtifact
+from app.models.user import User
+from app.routers.exports import router
+from app.services.export_artifacts import prune_missing_artifacts, record_export_artifact
+from app.utils.file_responses import RangeNotSatisfiable, parse_range
+
+BODY = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.fixture
+def db_models():
+    return [User, ExportArtifact, AuditEvent]
+
+
+@pytest.fixture
+def client(db, tmp_path):
+    user = db.get(User, 1)
+    (tmp_path / "report.zip").write_bytes(BODY)
+    (tmp_path / "leads.csv").write_text("id,address\n" + "".join(f"{i},{i} Main St\n" for i in range(500)))
+    with patch("app.services.exports.settings.EXPORT_DIR", str(tmp_path)):
+        record_export_artifact(db, tmp_path / "report.zip", 1)
+        record_export_artifact(db, tmp_path / "leads.csv", 1)
+        db.commit()
+
+        app = FastAPI()
+        app.include_router(router, prefix="/exports")
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[require_active_subscription] = lambda: user
+        with TestClient(app) as c:
+            c.db = db
+            yield c
+
+def _downloads(db) -> int:
+    return db.query(AuditEvent).filter(AuditEvent.action == "export.download").count()
+
+
+def test_parse_range():
+    """Test single byte ranges are parsed and clamped; others fall back to the full file"""
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-2000", 1000) == (990, 999)
+    assert parse_range("bytes=0-1,5-6", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=1000-", 1000)
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=-100", 0)
+
+
+def test_etag_and_conditional_get(client):
+    """Test the ETag is the artifact checksum and a matching If-None-Match gets a 304"""
+    r = client.get("/exports/report.zip")
+    assert r.status_code == 200
+    assert r.content == BODY
+    checksum = client.db.query(ExportArtifact.checksum).filter(ExportArtifact.filename == "report.zip").scalar()
+    assert r.headers["etag"] == f'"{checksum}"'
+    assert r.headers["accept-ranges"] == "bytes"
+
+    r = client.get("/exports/report.zip", headers={"If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert _downloads(client.db) == 1
+
+
+def test_range_resume(client):
+    """Test a range request returns only those bytes, guarded by If-Range"""
+    etag = client.get("/exports/report.zip").headers["etag"]
+
+    r = client.get("/exports/report.zip", headers={"Range": "bytes=1000-1999", "If-Range": etag})
+    assert r.status_code == 206
+    assert r.content == BODY[1000:2000]
+    assert r.headers["content-range"] == f"bytes 1000-1999/{len(BODY)}"
+    assert _downloads(client.db) == 1  # resumed range is not a new download
+
+    r = client.get("/exports/report.zip", headers={"Range": "bytes=1000-1999", "If-Range": '"stale"'})
+    assert r.status_code == 200
+    assert r.content == BODY
+
+    r = client.get("/exports/report.zip", headers={"Range": f"bytes={len(BODY)}-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(BODY)}"
+
+
+def test_download_requires_ownership(client, tmp_path):
+    """Test a file that is not in the caller's manifest is a 404, even when it exists"""
+    client.db.add(User(id=2, email="other@test.local", hashed_password="x"))
+    (tmp_path / "theirs.zip").write_bytes(BODY)
+    record_export_artifact(client.db, tmp_path / "theirs.zip", 2)
+    (tmp_path / "untracked.zip").write_bytes(BODY)
+    client.db.commit()
+
+    assert client.get("/exports/theirs.zip").status_code == 404
+    assert client.get("/exports/untracked.zip").status_code == 404
+    assert _downloads(client.db) == 0
+
+
+def test_missing_files_are_pruned_from_manifest(client, tmp_path):
+    """Test manifest rows for deleted files are dropped, on download and by the periodic prune"""
+    (tmp_path / "report.zip").unlink()
+    assert client.get("/exports/report.zip").status_code == 404
+    assert client.db.query(ExportArtifact).filter(ExportArtifact.filename == "report.zip").count() == 0
+
+    (tmp_path / "leads.csv").unlink()
+    with patch("app.services.exports.settings.EXPORT_DIR", str(tmp_path)):
+        assert prune_missing_artifacts(client.db) == 1
+    assert client.db.query(ExportArtifact).count() == 0
+
+
+def test_csv_served_precompressed(client, tmp_path):
+    """Test CSVs are sent gzip-encoded from a cached copy when the client accepts it"""
+    plain = client.get("/exports/leads.csv", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    r = client.get("/exports/leads.csv", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert r.content == plain.content  # decoded by the client
+    assert gzip.decompress((tmp_path / ".encoded" / "leads.csv.gz").read_bytes()) == plain.content
+    assert not list(tmp_path.glob("leads.csv.*"))
+
+    # The copy goes with its source
+    (tmp_path / "leads.csv").unlink()
+    assert client.get("/exports/leads.csv", headers={"Accept-Encoding": "gzip"}).status_code == 404
+    assert not list((tmp_path / ".encoded").iterdir())
@@ -0,0 +1,125 @@
+"""
+Unit tests for the export job queue and worker
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+from unittest.mock import patch
+
+from app.models.audit_event import AuditEvent
+from app.models.campaign import Campaign
+from app.models.export_artifact import ExportArtifact
+from app.models.export_job import ExportJob, ExportJobSubscriber
+from app.models.lead import Lead
+from app.models.user import User
+from app.services.export_jobs import (
+    claim_next_export_job,
+    heartbeat_export_job,
+    requeue_stale_export_jobs,
+    run_export_job,
+)
+from app.workers.exports import worker_loop
+
+
+@pytest.fixture
+def db_models():
+    return [User, Campaign, Lead, ExportJob, ExportJobSubscriber, ExportArtifact, AuditEvent]
+
+
+@pytest.fixture
+def db(db, db_session_factory, tmp_path):
+    db.add_all([Lead(campaign_id=1, address=f"{i} Main St", zip_code="78704") for i in range(3)])
+    db.commit()
+    with patch("app.services.export_jobs.SessionLocal", db_session_factory), patch(
+        "app.workers.exports.SessionLocal", db_session_factory
+    ), patch("app.services.exports.settings.EXPORT_DIR", str(tmp_path)):
+        yield db
+
+def _job(db, **kw) -> ExportJob:
+    job = ExportJob(campaign_id=1, requested_by_user_id=1, job_type="leads_by_zip", **kw)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_claim_next_is_ordered_and_exclusive(db):
+    """Test each claim takes the oldest queued job and no job is claimed twice"""
+    a, b = _job(db, status="queued"), _job(db, status="queued")
+
+    assert claim_next_export_job(db, "w1") == a.id
+    assert claim_next_export_job(db, "w2") == b.id
+    assert claim_next_export_job(db, "w3") is None
+
+    db.refresh(a)
+    assert (a.status, a.worker_id) == ("running", "w1")
+    assert a.started_at is not None and a.heartbeat_at is not None
+
+
+def test_requeue_stale_running_jobs(db):
+    """Test only jobs without a recent heartbeat are requeued, and their old worker loses them"""
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    stale = _job(db, status="running", worker_id="dead", heartbeat_at=old)
+    live = _job(db, status="running", worker_id="alive", heartbeat_at=datetime.now(timezone.utc))
+
+    assert requeue_stale_export_jobs(db) == [stale.id]
+    assert heartbeat_export_job(db, stale.id, "dead") is False
+    assert heartbeat_export_job(db, live.id, "alive") is True
+    assert claim_next_export_job(db, "w1") == stale.id
+
+
+def test_stale_job_fails_after_max_attempts(db):
+    """Test a job whose worker keeps dying is failed once it has used its attempts"""
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    job = _job(db, status="queued")
+
+    with patch("app.services.export_jobs.settings.EXPORT_JOB_MAX_ATTEMPTS", 2):
+        for expected in ([job.id], []):
+            assert claim_next_export_job(db, "w1") == job.id
+            db.execute(update(ExportJob).where(ExportJob.id == job.id).values(heartbeat_at=old))
+            db.commit()
+            assert requeue_stale_export_jobs(db) == expected
+
+    db.refresh(job)
+    assert (job.status, job.attempts, job.worker_id) == ("failed", 2, None)
+    assert job.finished_at is not None and "2 attempts" in job.error_message
+    assert claim_next_export_job(db, "w1") is None
+
+
+def test_result_is_dropped_when_job_was_reclaimed(db, tmp_path):
+    """Test a worker that lost its job (requeued and claimed elsewhere) does not overwrite it"""
+    job = _job(db, status="queued")
+    claim_next_export_job(db, "w1")
+    db.execute(update(ExportJob).where(ExportJob.id == job.id).values(worker_id="w2"))
+    db.commit()
+
+    run_export_job(job.id, worker_id="w1")
+
+    db.refresh(job)
+    assert (job.status, job.worker_id, job.result_filename, job.finished_at) == ("running", "w2", None, None)
+
+
+def test_worker_runs_queued_jobs(db, tmp_path):
+    """Test the worker loop drains the queue and records results"""
+    job = _job(db, status="queued")
+
+    worker_loop("w1", threading.Event(), once=True)
+
+    db.refresh(job)
+    assert job.status == "done"
+    assert job.worker_id == "w1"
+    assert job.attempts == 1
+    assert (tmp_path / job.result_filename).is_file()
+
+
+def test_inline_run_skips_job_owned_by_worker(db):
+    """Test an inline run does not execute a job a worker already claimed"""
+    job = _job(db, status="queued")
+    claim_next_export_job(db, "w1")
+
+    run_export_job(job.id)
+
+    db.refresh(job)
+    assert (job.status, job.worker_id, job.result_filename) == ("running", "w1", None)
@@ -0,0 +1,88 @@
+"""
+Unit tests for streaming lead exports
+"""
+
+import csv
+import io
+import zipfile
+
+import pytest
+from unittest.mock import patch
+
+from app.models.campaign import Campaign
+from app.models.lead import Lead
+from app.services.exports import export_leads_by_zip
+
+ZIPS = ["78704", "78701", "", None, " 78701 "]
+
+
+@pytest.fixture
+def db(db, tmp_path):
+    db.add_all(
+        [Lead(campaign_id=1, address=f"{i} Main St", zip_code=ZIPS[i % len(ZIPS)], phone='555 "x", 1') for i in range(53)]
+    )
+    db.commit()
+    with patch("app.services.exports.settings.EXPORT_DIR", str(tmp_path)):
+        yield db
+
+
+def _read(zf: zipfile.ZipFile, name: str) -> list[list[str]]:
+    return list(csv.reader(io.StringIO(zf.read(name).decode("utf-8"))))
+
+
+def test_export_leads_by_zip_groups_and_orders(db):
+    """Test the ALL file is in id order and each ZIP group gets its own sorted entry"""
+    with patch("app.services.exports.EXPORT_FETCH_CHUNK", 7):
+        zip_path, total = export_leads_by_zip(db, 1, "Test")
+
+    assert total == 53
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+        assert names[0].endswith("_ALL.csv")
+        assert [n.rsplit("_ZIP_", 1)[1] for n in names[1:]] == ["78701.csv", "78704.csv", "unknown.csv"]
+
+        all_rows = _read(zf, names[0])
+        assert all_rows[0][0] == "id"
+        assert [int(r[0]) for r in all_rows[1:]] == sorted(int(r[0]) for r in all_rows[1:])
+        assert all_rows[1][7] == '555 "x", 1'
+
+        per_zip = {n: _read(zf, n)[1:] for n in names[1:]}
+        assert sum(len(rows) for rows in per_zip.values()) == 53
+        unknown = per_zip[names[-1]]
+        assert {r[5] for r in unknown} == {""}
+
+
+def test_export_empty_campaign(db):
+    """Test an empty campaign still produces an archive with the ALL header"""
+    db.add(Campaign(id=2, name="Empty", created_by_user_id=1))
+    db.commit()
+
+    zip_path, total = export_leads_by_zip(db, 2, "Empty")
+    assert total == 0
+    with zipfile.ZipFile(zip_path) as zf:
+        assert len(zf.namelist()) == 1
+        assert _read(zf, zf.namelist()[0]) == [
+            ["id", "campaign_id", "address", "city", "state", "zip_code", "owner_name", "phone", "created_at"]
+        ]
+
+
+def test_export_groups_zip_codes_with_tabs_and_newlines_once(db):
+    """Test ZIPs padded with tabs/newlines land in one ZIP entry (no duplicate archive names)"""
+    db.add(Campaign(id=2, name="Whitespace", created_by_user_id=1))
+    db.add_all(
+        [
+            Lead(campaign_id=2, address="1 Main St", zip_code="78704"),
+            Lead(campaign_id=2, address="2 Main St", zip_code="\t78704\n"),
+            Lead(campaign_id=2, address="3 Main St", zip_code="78701"),
+            Lead(campaign_id=2, address="4 Main St", zip_code="78704 "),
+        ]
+    )
+    db.commit()
+
+    zip_path, total = export_leads_by_zip(db, 2, "Whitespace")
+    assert total == 4
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+        assert len(names) == len(set(names))
+        assert [n.rsplit("_ZIP_", 1)[1] for n in names[1:]] == ["78701.csv", "78704.csv"]
+        assert len(_read(zf, names[2])) == 4
@@ -0,0 +1,50 @@
+"""
+Unit tests for provider payload decoding
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.providers import json_codec
+from app.providers.attom import _parse_attom_properties
+
+
+@pytest.mark.asyncio
+async def test_decode_response_offloads_large_bodies():
+    """Test small bodies decode inline and large ones in a worker thread"""
+    response = httpx.Response(200, json={"property": [{"address": {"oneLine": "1 Main St"}}]})
+
+    with patch.object(json_codec.settings, "PROVIDER_JSON_OFFLOAD_BYTES", 10**9), \
+            patch("app.providers.json_codec.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        data = await json_codec.decode_response(response)
+    assert data["property"][0]["address"]["oneLine"] == "1 Main St"
+    to_thread.assert_not_called()
+
+    with patch.object(json_codec.settings, "PROVIDER_JSON_OFFLOAD_BYTES", 1), \
+            patch("app.providers.json_codec.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        assert await json_codec.decode_response(response) == data
+    to_thread.assert_called_once_with(json_codec.loads, response.content)
+
+
+def test_decode_rejects_invalid_json():
+    """Test invalid payloads raise ValueError with or without orjson"""
+    with pytest.raises(ValueError):
+        json_codec.loads(b"{not json")
+
+
+@pytest.mark.asyncio
+async def test_parse_rows_tolerates_null_nested_objects():
+    """Test ATTOM rows with null sub-objects still parse, inline or offloaded"""
+    rows = [{"address": {"oneLine": "1 Main St"}, "avm": {"amount": None}, "owner": {"owner1": None}}]
+
+    with patch.object(json_codec.settings, "PROVIDER_PARSE_OFFLOAD_ROWS", 1), \
+            patch("app.providers.json_codec.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        leads = await json_codec.parse_rows(_parse_attom_properties, rows)
+    to_thread.assert_called_once()
+
+    assert len(leads) == 1
+    assert leads[0].address == "1 Main St"
+    assert leads[0].estimated_value is None
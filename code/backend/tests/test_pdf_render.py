@@ -0,0 +1,106 @@
+"""
+Unit tests for lead table PDF rendering
+"""
+
+import pytest
+from concurrent.futures import Future
+from unittest.mock import patch
+from pypdf import PdfReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from app.models.campaign import Campaign
+from app.models.lead import Lead
+from app.services.pdf_reports import build_campaign_leads_pdf
+from app.services.pdf_render import LEAD_ROWS_PER_PAGE, build_lead_table_pdf, fit_text
+
+
+@pytest.fixture
+def db(db, tmp_path):
+    with patch("app.services.exports.settings.EXPORT_DIR", str(tmp_path)):
+        yield db
+
+def _rows(n):
+    return [(f"{i} Main St", "Austin", "TX", "78704", "Owner", "555-0100") for i in range(n)]
+
+
+def _pages(path) -> list[str]:
+    return [p.extract_text() for p in PdfReader(str(path)).pages]
+
+
+def test_fit_text_uses_glyph_widths():
+    """Test that truncation is by measured width, not character count"""
+    assert fit_text("iiiiiiiiii", 30) == "iiiiiiiiii"
+
+    cut = fit_text("WWWWWWWWWW", 30)
+    assert cut.endswith("…")
+    assert stringWidth(cut, "Helvetica", 9) <= 30
+    assert stringWidth(cut[:-1] + "W…", "Helvetica", 9) > 30
+
+
+@pytest.mark.parametrize("n, pages", [(0, 1), (1, 1), (LEAD_ROWS_PER_PAGE, 1), (LEAD_ROWS_PER_PAGE + 1, 2)])
+def test_page_count(tmp_path, n, pages):
+    """Test rows fill whole pages and an empty table still gets a header page"""
+    path = build_lead_table_pdf(tmp_path / "out.pdf", iter(_rows(n)), "Leads", "Campaign: x", "now")
+    assert len(_pages(path)) == pages
+
+
+def test_chunked_render_matches_single_process(tmp_path):
+    """Test that pool-rendered, merged chunks read the same as an in-process render"""
+    rows = _rows(LEAD_ROWS_PER_PAGE * 3 + 5)
+    single = build_lead_table_pdf(tmp_path / "single.pdf", iter(rows), "Leads", "Campaign: x", "now")
+    with patch("app.services.pdf_render.settings.PDF_RENDER_CHUNK_PAGES", 1), patch(
+        "app.services.pdf_render.settings.PDF_RENDER_WORKERS", 2
+    ):
+        merged = build_lead_table_pdf(tmp_path / "merged.pdf", iter(rows), "Leads", "Campaign: x", "now")
+
+    assert _pages(merged) == _pages(single)
+    assert len(_pages(merged)) == 4
+    assert not list(tmp_path.glob(".render_*"))
+
+
+class _CountingPool:
+    """Runs chunks inline and tracks how many results are still unread"""
+
+    def __init__(self):
+        self.pending = 0
+        self.peak = 0
+
+    def submit(self, fn, *args):
+        pool = self
+        pool.pending += 1
+        pool.peak = max(pool.peak, pool.pending)
+
+        class _Done(Future):
+            def result(self, timeout=None):
+                pool.pending -= 1
+                return super().result(timeout)
+
+        f = _Done()
+        f.set_result(fn(*args))
+        return f
+
+
+def test_in_flight_chunks_are_bounded(tmp_path):
+    """Test that no more than 2 x workers chunks are submitted ahead of the merge"""
+    pool = _CountingPool()
+    rows = _rows(LEAD_ROWS_PER_PAGE * 9)
+    with patch("app.services.pdf_render.settings.PDF_RENDER_CHUNK_PAGES", 1), patch(
+        "app.services.pdf_render._render_pool", return_value=(pool, 2)
+    ):
+        path = build_lead_table_pdf(tmp_path / "out.pdf", iter(rows), "Leads", "Campaign: x", "now")
+
+    assert len(_pages(path)) == 9
+    assert pool.peak == 4
+    assert pool.pending == 0
+
+
+def test_campaign_leads_pdf(db):
+    """Test the campaign report streams leads in id order with a continuation title"""
+    db.add_all([Lead(campaign_id=1, address=f"{i} Main St", zip_code="78704") for i in range(LEAD_ROWS_PER_PAGE + 2)])
+    db.commit()
+
+    pages = _pages(build_campaign_leads_pdf(db, db.get(Campaign, 1)))
+    assert len(pages) == 2
+    assert "Campaign Leads (cont.)" in pages[1]
+    assert pages[0].index("0 Main St") < pages[0].index("1 Main St")
+    assert f"{LEAD_ROWS_PER_PAGE + 1} Main St" in pages[1]
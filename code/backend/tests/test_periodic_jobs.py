@@ -0,0 +1,49 @@
+"""
+Unit tests for the single-process periodic jobs lease
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import update
+
+from app.models.app_control import AppControl
+from app.models.user import User
+from app.services import periodic_jobs
+from app.services.app_leases import acquire_lease, release_lease, renew_lease
+from app.services.periodic_jobs import PERIODIC_JOBS_LEASE_KEY, elect_periodic_leader, is_periodic_leader
+
+
+@pytest.fixture
+def db_models():
+    return [User, AppControl]
+
+
+def test_lease_has_one_holder_until_it_lapses(db):
+    """Test that a live lease keeps other owners out until it expires or is released"""
+    assert acquire_lease(db, "k", "a", 60)
+    assert not acquire_lease(db, "k", "b", 60)
+    assert acquire_lease(db, "k", "a", 60)
+    assert not renew_lease(db, "k", "b", 60)
+
+    # The holder crashed: its lease lapses and another owner takes over
+    db.execute(update(AppControl).where(AppControl.key == "k").values(value="2000-01-01T00:00:00+00:00 a"))
+    db.commit()
+    assert acquire_lease(db, "k", "b", 60)
+    assert not renew_lease(db, "k", "a", 60)
+
+    release_lease(db, "k", "b")
+    assert acquire_lease(db, "k", "c", 60)
+
+
+def test_only_one_process_is_periodic_leader(db_session_factory, db):
+    """Test that a second process's election fails while the first holds the lease"""
+    with patch("app.services.periodic_jobs.SessionLocal", db_session_factory), patch.object(
+        periodic_jobs, "_leader_until", 0.0
+    ):
+        with patch.object(periodic_jobs, "_owner", "proc-1"):
+            assert elect_periodic_leader() and is_periodic_leader()
+        with patch.object(periodic_jobs, "_owner", "proc-2"):
+            assert not elect_periodic_leader() and not is_periodic_leader()
+
+    assert db.query(AppControl.value).filter(AppControl.key == PERIODIC_JOBS_LEASE_KEY).scalar().endswith(" proc-1")
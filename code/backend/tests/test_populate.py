@@ -0,0 +1,121 @@
+"""
+Unit tests for campaign populate (bulk insert + dedupe)
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+
+from app.models.campaign import Campaign
+from app.models.campaign_stats import CampaignStats
+from app.models.lead import Lead
+from app.models.user import User
+from app.providers.base import ProviderLead
+from app.providers.merge import merge_provider_leads
+from app.services.populate import _store_leads, populate_campaign_from_providers
+
+
+@pytest.fixture
+def db_models():
+    return [User, Campaign, Lead, CampaignStats]
+
+
+@pytest.fixture
+def db(db, db_engine):
+    db.info["statements"] = statements = []
+
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    return db
+
+def test_store_leads_bulk_insert_counts_created(db):
+    """Test a batch is stored with set-based statements and an exact count"""
+    leads = [ProviderLead(address=f"{i} Main St", zip_code="78704") for i in range(500)]
+
+    created = _store_leads(db, 1, leads)
+    statements = list(db.info["statements"])
+
+    assert created == 500
+    # One prefetch SELECT + one bulk INSERT + one campaign_stats lookup (not one round trip per lead)
+    assert statements.count("INSERT") == 1
+    assert statements.count("SELECT") == 2
+    assert db.query(Lead).filter(Lead.campaign_id == 1).count() == 500
+
+
+def test_store_leads_skips_existing_and_in_batch_duplicates(db):
+    """Test duplicates (existing rows and repeats inside the batch) are skipped"""
+    _store_leads(db, 1, [ProviderLead(address="1 Main St", zip_code="78704")])
+
+    created = _store_leads(
+        db,
+        1,
+        [
+            ProviderLead(address=" 1 Main St ", zip_code="78704"),  # existing after trim
+            ProviderLead(address="2 Main St", zip_code=None),
+            ProviderLead(address="2 Main St", zip_code=""),  # same as above
+            ProviderLead(address="2 Main St", zip_code="78705"),  # different zip
+            ProviderLead(address="   "),  # junk
+        ],
+    )
+
+    assert created == 2
+    assert db.query(Lead).filter(Lead.campaign_id == 1).count() == 3
+
+
+class FakeProvider:
+    def __init__(self, leads=None, delay=0.0, error=None, configured=True):
+        self.leads = leads or []
+        self.delay = delay
+        self.error = error
+        self._configured = configured
+
+    def configured(self):
+        return (self._configured, [] if self._configured else ["API_KEY"])
+
+    async def fetch_leads(self, zipcode, limit, filters=None):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.leads
+
+
+def test_merge_prefers_richest_values():
+    """Test leads merge on normalized address + zip and keep the richest fields"""
+    attom = [ProviderLead(address="1 Main St", zip_code="78704", bedrooms=3, owner_name="J Smith")]
+    repliers = [
+        ProviderLead(address=" 1  MAIN st ", zip_code="78704-1234", owner_name="John Smith", phone="555"),
+        ProviderLead(address="2 Main St", zip_code="78704"),
+    ]
+
+    merged = merge_provider_leads([attom, repliers])
+
+    assert len(merged) == 2
+    first = merged[0]
+    assert first.address == "1 Main St"
+    assert first.owner_name == "John Smith"
+    assert first.phone == "555"
+    assert first.bedrooms == 3
+
+
+@pytest.mark.asyncio
+async def test_populate_from_providers_drops_slow_and_failing(db):
+    """Test a failing or slow provider does not block the others"""
+    providers = {
+        "attom": FakeProvider([ProviderLead(address="1 Main St", zip_code="78704")]),
+        "repliers": FakeProvider(delay=5),
+        "broken": FakeProvider(error=RuntimeError("boom")),
+        "unset": FakeProvider(configured=False),
+    }
+
+    with patch("app.services.populate.get_provider", side_effect=providers.__getitem__):
+        created, used, failed = await populate_campaign_from_providers(
+            db, 1, ["attom", "repliers", "broken", "unset"], None, 50, deadline_seconds=0.1
+        )
+
+    assert created == 1
+    assert used == ["attom"]
+    assert sorted(failed) == ["broken", "repliers", "unset"]
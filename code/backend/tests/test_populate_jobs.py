@@ -0,0 +1,269 @@
+"""
+Unit tests for background populate jobs (checkpointing + resume)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from unittest.mock import patch
+
+from app.models.audit_event import AuditEvent
+from app.models.campaign import Campaign
+from app.models.campaign_stats import CampaignStats
+from app.models.lead import Lead
+from app.models.populate_job import PopulateJob
+from app.models.user import User
+from app.providers.base import ProviderError, ProviderLead
+from app.routers.campaign_populate import create_populate_job_endpoint, resume_populate_job
+from app.schemas.providers import PopulateIn
+from app.services.populate_jobs import (
+    claim_populate_job,
+    create_populate_job,
+    heartbeat_populate_job,
+    new_worker_id,
+    resumable_populate_job_ids,
+    run_populate_job,
+)
+
+
+class FakePagedProvider:
+    """Yields pages in the given order, optionally failing after some of them"""
+
+    def __init__(self, order, fail_after=None, error=None):
+        self.order = order
+        self.fail_after = fail_after
+        self.error = error or RuntimeError("worker died")
+        self.start_pages = []
+
+    async def iter_pages(self, zipcode, limit, filters=None, start_page=1):
+        self.start_pages.append(start_page)
+        for i, page in enumerate(p for p in self.order if p >= start_page):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise self.error
+            yield page, [ProviderLead(address=f"{page}-{n} Main St", zip_code="78704") for n in range(10)]
+
+
+@pytest.fixture
+def db_models():
+    return [User, Campaign, Lead, CampaignStats, PopulateJob, AuditEvent]
+
+
+@pytest.fixture
+def session_factory(db, db_session_factory):
+    with patch("app.services.populate_jobs.SessionLocal", db_session_factory):
+        yield db_session_factory
+
+
+def _new_job(factory) -> int:
+    db = factory()
+    try:
+        return create_populate_job(db, campaign_id=1, user_id=1, provider="attom", zipcode="78704", limit=40).id
+    finally:
+        db.close()
+
+
+def _load(factory, job_id) -> PopulateJob:
+    db = factory()
+    try:
+        return db.query(PopulateJob).filter(PopulateJob.id == job_id).first()
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_job_runs_to_done_with_progress(session_factory):
+    """Test out-of-order pages are all stored and the checkpoint ends on the last page"""
+    job_id = _new_job(session_factory)
+    provider = FakePagedProvider(order=[1, 3, 2, 4])
+
+    with patch("app.services.populate_jobs.get_provider", return_value=provider):
+        await run_populate_job(job_id)
+
+    job = _load(session_factory, job_id)
+    assert job.status == "done"
+    assert job.last_page == 4
+    assert job.progress_current == job.progress_total == 40
+    assert job.created_leads == 40
+
+
+@pytest.mark.asyncio
+async def test_job_resumes_from_contiguous_checkpoint(session_factory):
+    """Test a failed run resumes after the last contiguous page without double counting"""
+    job_id = _new_job(session_factory)
+
+    # Pages 1 and 3 stored before the failure; page 2 never arrived
+    first = FakePagedProvider(order=[1, 3, 2, 4], fail_after=2)
+    with patch("app.services.populate_jobs.get_provider", return_value=first):
+        await run_populate_job(job_id)
+
+    job = _load(session_factory, job_id)
+    assert job.status == "failed"
+    assert job.last_page == 1
+    assert job.progress_current == 10
+    assert job.created_leads == 20
+
+    db = session_factory()
+    db.query(PopulateJob).filter(PopulateJob.id == job_id).update({"status": "queued"})
+    db.commit()
+    db.close()
+
+    second = FakePagedProvider(order=[2, 3, 4])
+    with patch("app.services.populate_jobs.get_provider", return_value=second):
+        await run_populate_job(job_id)
+
+    job = _load(session_factory, job_id)
+    assert second.start_pages == [2]
+    assert job.status == "done"
+    assert job.last_page == 4
+    assert job.progress_current == 40
+    assert job.created_leads == 40
+
+
+def test_claim_only_takes_queued_or_stale_jobs(session_factory):
+    """Test a live running job cannot be claimed twice, but a stale one is resumable"""
+    job_id = _new_job(session_factory)
+    db = session_factory()
+
+    assert resumable_populate_job_ids(db) == [job_id]
+    assert claim_populate_job(db, job_id, new_worker_id()) is True
+    assert claim_populate_job(db, job_id, new_worker_id()) is False
+    assert resumable_populate_job_ids(db) == []
+
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.query(PopulateJob).filter(PopulateJob.id == job_id).update({"heartbeat_at": stale})
+    db.commit()
+
+    assert resumable_populate_job_ids(db) == [job_id]
+    assert claim_populate_job(db, job_id, new_worker_id()) is True
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_page_stops_the_checkpoint(session_factory):
+    """Test a page the provider fails to fetch fails the job before that page"""
+    job_id = _new_job(session_factory)
+    provider = FakePagedProvider(order=[1, 2, 3, 4], fail_after=1, error=ProviderError("attom", "HTTP 500", 500))
+
+    with patch("app.services.populate_jobs.get_provider", return_value=provider):
+        await run_populate_job(job_id)
+
+    job = _load(session_factory, job_id)
+    assert job.status == "failed"
+    assert job.last_page == 1
+    assert "HTTP 500" in job.error_message
+
+
+def test_reclaim_keeps_started_at(session_factory):
+    """Test re-claiming a stale job does not reset when it first started"""
+    job_id = _new_job(session_factory)
+    db = session_factory()
+    assert claim_populate_job(db, job_id, new_worker_id()) is True
+    started = _load(session_factory, job_id).started_at
+
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.query(PopulateJob).filter(PopulateJob.id == job_id).update({"heartbeat_at": stale})
+    db.commit()
+
+    assert claim_populate_job(db, job_id, new_worker_id()) is True
+    assert _load(session_factory, job_id).started_at == started
+    db.close()
+
+
+class TakeoverProvider(FakePagedProvider):
+    """Another worker claims the job while page 2 is being fetched"""
+
+    def __init__(self, session_factory, job_id):
+        super().__init__(order=[1, 2, 3, 4])
+        self.session_factory = session_factory
+        self.job_id = job_id
+
+    async def iter_pages(self, zipcode, limit, filters=None, start_page=1):
+        async for page, leads in super().iter_pages(zipcode, limit, filters, start_page):
+            if page == 2:
+                db = self.session_factory()
+                db.query(PopulateJob).filter(PopulateJob.id == self.job_id).update({"worker_id": "other-run"})
+                db.commit()
+                db.close()
+            yield page, leads
+
+
+@pytest.mark.asyncio
+async def test_run_stops_once_job_is_taken_over(session_factory):
+    """Test a run whose job was claimed by another worker neither checkpoints nor finishes it"""
+    job_id = _new_job(session_factory)
+
+    with patch("app.services.populate_jobs.get_provider", return_value=TakeoverProvider(session_factory, job_id)):
+        await run_populate_job(job_id)
+
+    job = _load(session_factory, job_id)
+    assert (job.status, job.worker_id, job.finished_at) == ("running", "other-run", None)
+    assert job.last_page == 1
+    assert job.created_leads == 10
+
+
+class SlowPageProvider(FakePagedProvider):
+    """The first page takes several heartbeat intervals to arrive"""
+
+    async def iter_pages(self, zipcode, limit, filters=None, start_page=1):
+        await asyncio.sleep(0.3)
+        async for item in super().iter_pages(zipcode, limit, filters, start_page):
+            yield item
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_is_refreshed_during_a_slow_page(session_factory):
+    """Test the heartbeat advances while a page is still being fetched"""
+    job_id = _new_job(session_factory)
+    beats = []
+
+    def recording_heartbeat(db, jid, worker_id):
+        beats.append(worker_id)
+        return heartbeat_populate_job(db, jid, worker_id)
+
+    with patch("app.services.populate_jobs.settings.POPULATE_JOB_HEARTBEAT_SECONDS", 0.05), patch(
+        "app.services.populate_jobs.heartbeat_populate_job", side_effect=recording_heartbeat
+    ), patch("app.services.populate_jobs.get_provider", return_value=SlowPageProvider(order=[1, 2])):
+        await run_populate_job(job_id)
+
+    assert len(beats) >= 3
+    assert len(set(beats)) == 1
+    assert _load(session_factory, job_id).status == "done"
+
+
+@pytest.mark.asyncio
+async def test_resume_endpoint_takes_over_stale_running_job(db, session_factory):
+    """Test a running job is resumable once its heartbeat is stale, not before"""
+    job_id = _new_job(session_factory)
+    assert claim_populate_job(db, job_id, new_worker_id()) is True
+    user = db.get(User, 1)
+
+    with pytest.raises(HTTPException) as e:
+        await resume_populate_job(job_id, current_user=user, db=db)
+    assert e.value.status_code == 409
+
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.query(PopulateJob).filter(PopulateJob.id == job_id).update({"heartbeat_at": stale})
+    db.commit()
+
+    with patch("app.routers.campaign_populate.schedule_populate_job") as schedule:
+        await resume_populate_job(job_id, current_user=user, db=db)
+    schedule.assert_called_once_with(job_id)
+
+    with patch("app.services.populate_jobs.get_provider", return_value=FakePagedProvider(order=[1, 2, 3, 4])):
+        await run_populate_job(job_id)
+    assert _load(session_factory, job_id).status == "done"
+
+
+@pytest.mark.asyncio
+async def test_create_job_rejects_multi_provider(db, session_factory):
+    """Test a multi-provider request is refused instead of running one provider"""
+    payload = PopulateIn(providers=["attom", "repliers"], zipcode="78704")
+
+    with pytest.raises(HTTPException) as e:
+        await create_populate_job_endpoint(1, payload, request=None, current_user=db.get(User, 1), db=db)
+
+    assert e.value.status_code == 400
+    assert db.query(PopulateJob).count() == 0
@@ -0,0 +1,127 @@
+"""
+Unit tests for the provider response cache
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.providers import cache as cache_module
+from app.providers.cache import ProviderResponseCache, _ByteLRU, cache_key
+from app.schemas.filters import FilterSpec
+
+
+@pytest.fixture
+def memory_only_cache():
+    """Cache with the DB tier switched off and an empty LRU"""
+    with patch.object(ProviderResponseCache, "_db_get", return_value=None), \
+            patch.object(ProviderResponseCache, "_db_put"), \
+            patch("app.providers.cache._lru", _ByteLRU()):
+        yield ProviderResponseCache("attom", ttl_seconds=60, stale_seconds=600, lru_bytes=1 << 20)
+
+
+def test_cache_key_normalizes_filters():
+    """Test equivalent FilterSpecs produce the same key"""
+    a = FilterSpec(zip_codes=["78705", "78704"], city="Austin ", property_types=["Condo", "SFR"])
+    b = FilterSpec(zip_codes=["78705"], city="austin", property_types=["sfr", "condo"])
+
+    assert cache_key("attom", a, None, 1, 500) == cache_key("attom", b, "78704", 1, 500)
+    assert cache_key("attom", a, None, 1, 500) != cache_key("attom", a, None, 2, 500)
+    assert cache_key("attom", a, None, 1, 500) != cache_key("repliers", a, None, 1, 500)
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_fresh_hit(memory_only_cache):
+    """Test a fresh entry is served without calling the provider"""
+    fetch = AsyncMock(return_value={"property": [1]})
+
+    first = await memory_only_cache.get_or_fetch("k", fetch)
+    second = await memory_only_cache.get_or_fetch("k", fetch)
+
+    assert first == second == {"property": [1]}
+    assert fetch.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_does_not_store_failures(memory_only_cache):
+    """Test a failed fetch (None) is retried next time"""
+    fetch = AsyncMock(side_effect=[None, {"property": []}])
+
+    assert await memory_only_cache.get_or_fetch("k", fetch) is None
+    assert await memory_only_cache.get_or_fetch("k", fetch) == {"property": []}
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_stale_and_revalidates(memory_only_cache):
+    """Test a stale entry is returned immediately and refreshed in the background"""
+    old = datetime.now(timezone.utc) - timedelta(seconds=120)
+    memory_only_cache._lru_put("k", '{"v":"old"}', old)
+    fetch = AsyncMock(return_value={"v": "new"})
+
+    assert await memory_only_cache.get_or_fetch("k", fetch) == {"v": "old"}
+
+    # Let the background refresh run
+    for task in list(cache_module._refresh_tasks):
+        await task
+
+    assert fetch.await_count == 1
+    assert await memory_only_cache.get_or_fetch("k", fetch) == {"v": "new"}
+    assert fetch.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(memory_only_cache):
+    """Test parallel requests for the same uncached page call the provider once"""
+    release = asyncio.Event()
+
+    async def slow_fetch():
+        await release.wait()
+        return {"property": [1]}
+
+    fetch = AsyncMock(side_effect=slow_fetch)
+    callers = [asyncio.create_task(memory_only_cache.get_or_fetch("k", fetch)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await asyncio.gather(*callers) == [{"property": [1]}] * 3
+    assert fetch.await_count == 1
+    assert not cache_module._inflight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_a_failure(memory_only_cache):
+    """Test a failed shared fetch fails every waiter and is not cached"""
+    release = asyncio.Event()
+
+    async def failing_fetch():
+        await release.wait()
+        raise RuntimeError("provider down")
+
+    callers = [asyncio.create_task(memory_only_cache.get_or_fetch("k", failing_fetch)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert memory_only_cache.get("k") is None
+
+
+def test_lru_is_bounded_by_compressed_bytes(memory_only_cache):
+    """Test the LRU keeps compressed bodies and evicts the oldest past its byte budget"""
+    lru = cache_module._lru
+    page = {"property": [{"id": i, "address": {"line1": f"{i} Main St"}} for i in range(500)]}
+    memory_only_cache.put("a", page)
+    one_page = lru.nbytes
+    assert one_page < len(json.dumps(page)) / 3
+
+    memory_only_cache.lru_bytes = one_page * 2
+    memory_only_cache.put("b", page)
+    memory_only_cache.put("c", page)
+
+    assert list(lru.entries) == ["b", "c"]
+    assert lru.nbytes == 2 * one_page
+    assert memory_only_cache.get("c") == (page, lru.entries["c"][1])
@@ -0,0 +1,75 @@
+"""
+Unit tests for the shared provider HTTP client
+"""
+
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from app.providers.http import (
+    close_provider_client,
+    get_provider_client,
+    provider_timeout,
+)
+
+
+@pytest.mark.asyncio
+async def test_provider_client_is_shared():
+    """Test the same pooled client is reused within an event loop"""
+    client = get_provider_client()
+    try:
+        assert get_provider_client() is client
+    finally:
+        await close_provider_client()
+
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_provider_client_rebuilt_after_close():
+    """Test a fresh client is built after shutdown"""
+    first = get_provider_client()
+    await close_provider_client()
+
+    second = get_provider_client()
+    try:
+        assert second is not first
+        assert not second.is_closed
+    finally:
+        await close_provider_client()
+
+
+async def _client_on_loop():
+    return get_provider_client()
+
+
+@pytest.mark.asyncio
+async def test_clients_of_other_loops_are_closed_on_their_loop():
+    """Test each loop gets its own client and shutdown closes another loop's client on that loop"""
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        theirs = asyncio.run_coroutine_threadsafe(_client_on_loop(), other).result()
+        ours = get_provider_client()
+        assert ours is not theirs
+
+        await close_provider_client()
+        assert ours.is_closed and theirs.is_closed
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join()
+        other.close()
+
+
+def test_provider_timeout_per_provider():
+    """Test per-provider timeout overrides the global default"""
+    with patch("app.providers.http.settings") as mock_settings:
+        mock_settings.PROVIDER_TIMEOUT_SECONDS = 30.0
+        mock_settings.ATTOM_TIMEOUT_SECONDS = 12.5
+        mock_settings.REPLIERS_TIMEOUT_SECONDS = None
+
+        assert provider_timeout("attom").read == 12.5
+        assert provider_timeout("repliers").read == 30.0
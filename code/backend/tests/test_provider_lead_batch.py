@@ -0,0 +1,34 @@
+"""
+Unit tests for the columnar ProviderLead batch
+"""
+
+from app.providers.base import ProviderLead, ProviderLeadBatch
+
+
+def test_batch_round_trips_leads():
+    """Test leads come back unchanged, including missing values"""
+    leads = [
+        ProviderLead(address="1 Main St", zip_code="78704", bedrooms=3, bathrooms=2.5, owner_occupied=True),
+        ProviderLead(address="2 Main St", sqft=0, equity_percent=0.0, absentee_owner=False),
+        ProviderLead(),
+    ]
+
+    batch = ProviderLeadBatch(leads, keep_raw=False)
+
+    assert len(batch) == 3
+    assert list(batch) == leads
+    assert batch[-1] == leads[-1]
+    assert batch[1:] == leads[1:]
+    assert batch.column("bedrooms") == [3, None, None]
+    assert batch.column("absentee_owner") == [None, False, None]
+
+
+def test_batch_raw_data_is_opt_in():
+    """Test raw payloads are dropped by default and compressed when kept"""
+    lead = ProviderLead(address="1 Main St", raw_data={"identifier": {"Id": 7}})
+
+    assert ProviderLeadBatch([lead], keep_raw=False)[0].raw_data is None
+
+    kept = ProviderLeadBatch([lead], keep_raw=True)
+    assert kept.raw_data(0) == {"identifier": {"Id": 7}}
+    assert kept[0] == lead
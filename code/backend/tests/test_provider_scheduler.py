@@ -0,0 +1,116 @@
+"""
+Unit tests for the provider request scheduler
+"""
+
+import time
+
+import pytest
+import httpx
+from unittest.mock import AsyncMock, patch
+
+from app.providers.scheduler import (
+    ProviderRequestScheduler,
+    TokenBucket,
+    _parse_retry_after,
+)
+
+
+def _scheduler(**overrides) -> ProviderRequestScheduler:
+    opts = dict(
+        name="test",
+        rate_per_second=1000.0,
+        burst=100,
+        max_concurrency=4,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_max=30.0,
+    )
+    opts.update(overrides)
+    return ProviderRequestScheduler(**opts)
+
+
+def test_parse_retry_after():
+    """Test Retry-After seconds and invalid values"""
+    assert _parse_retry_after("5") == 5.0
+    assert _parse_retry_after("0") == 0.0
+    assert _parse_retry_after("") is None
+    assert _parse_retry_after(None) is None
+    assert _parse_retry_after("not a date") is None
+    # HTTP-date in the past clamps to zero
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_429_then_succeeds():
+    """Test 429 responses are retried and Retry-After is honored"""
+    scheduler = _scheduler()
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"ok": True}),
+    ]
+    send = AsyncMock(side_effect=responses)
+
+    with patch("app.providers.scheduler._sleep", new=AsyncMock()) as sleep:
+        response = await scheduler.run(send, api_key="k")
+
+    assert response.status_code == 200
+    assert send.await_count == 3
+    # First wait comes from Retry-After (plus jitter below backoff_base)
+    first_delay = sleep.await_args_list[0].args[0]
+    assert 2.0 <= first_delay <= 2.5
+
+
+@pytest.mark.asyncio
+async def test_scheduler_returns_last_response_when_retries_exhausted():
+    """Test the final 429 is returned to the caller after max_retries"""
+    scheduler = _scheduler(max_retries=2)
+    send = AsyncMock(return_value=httpx.Response(429))
+
+    with patch("app.providers.scheduler._sleep", new=AsyncMock()):
+        response = await scheduler.run(send, api_key="k")
+
+    assert response.status_code == 429
+    assert send.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduler_reraises_transport_errors():
+    """Test transport errors are retried, then re-raised"""
+    scheduler = _scheduler(max_retries=1)
+    send = AsyncMock(side_effect=httpx.ConnectError("boom"))
+
+    with patch("app.providers.scheduler._sleep", new=AsyncMock()):
+        with pytest.raises(httpx.ConnectError):
+            await scheduler.run(send, api_key="k")
+
+    assert send.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_when_empty():
+    """Test the bucket makes callers wait once its burst is spent"""
+    bucket = TokenBucket(rate=10.0, capacity=2)
+
+    with patch("app.providers.scheduler._sleep", new=AsyncMock()) as sleep:
+        await bucket.acquire()
+        await bucket.acquire()
+        sleep.assert_not_awaited()
+
+        await bucket.acquire()
+        await bucket.acquire()
+
+    waits = [c.args[0] for c in sleep.await_args_list]
+    assert len(waits) == 2
+    # Reservations queue up: second waiter waits roughly twice as long
+    assert waits[0] == pytest.approx(0.1, abs=0.02)
+    assert waits[1] == pytest.approx(0.2, abs=0.02)
+
+
+def test_token_bucket_pause_defers_refill():
+    """Test a Retry-After pause empties the bucket until it expires"""
+    bucket = TokenBucket(rate=10.0, capacity=5)
+    bucket.pause(3.0)
+
+    assert bucket.tokens == 0.0
+    assert bucket.updated > time.monotonic() + 2.5